@@ -6,7 +6,7 @@ from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
 from alembic import context
 from app.core.config import settings
 from app.db.base import Base
-from app.models import User, Prediction  # Import all models
+from app.models import User, Review, Prediction, PredictionStat  # Import all models
 
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
@@ -0,0 +1,51 @@
+"""prediction listing and search indexes
+
+Revision ID: 3f2a9c1d7b80
+Revises:
+Create Date: 2026-10-18 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import context, op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f2a9c1d7b80'
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Mirrors Prediction.__table_args__, which create_all uses on new databases
+INDEXES = {
+    "ix_predictions_user_id_created_at":
+        "ON predictions (user_id, created_at DESC, id DESC)",
+    "ix_predictions_created_at":
+        "ON predictions (created_at DESC, id DESC)",
+    "ix_predictions_category_created_at":
+        "ON predictions (category, created_at DESC, id DESC)",
+    "ix_predictions_result_created_at":
+        "ON predictions (prediction_result, created_at DESC, id DESC)",
+    "ix_predictions_review_text_tsv":
+        "ON predictions USING gin (to_tsvector('english'::regconfig, review_text))",
+}
+
+
+def upgrade() -> None:
+    if not context.is_offline_mode() and not sa.inspect(op.get_bind()).has_table("predictions"):
+        # Fresh database: the app's create_all builds the table with these indexes
+        return
+    # CONCURRENTLY keeps predictions writable while a large table is indexed,
+    # but cannot run inside a transaction. IF NOT EXISTS covers indexes that
+    # create_all already made; an interrupted build leaves an INVALID index
+    # that has to be dropped by hand before re-running.
+    with op.get_context().autocommit_block():
+        for name, definition in INDEXES.items():
+            op.execute(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} {definition}")
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name in reversed(list(INDEXES)):
+            op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
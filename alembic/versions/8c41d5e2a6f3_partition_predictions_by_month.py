@@ -0,0 +1,146 @@
+"""partition predictions by month of created_at
+
+Revision ID: 8c41d5e2a6f3
+Revises: 3f2a9c1d7b80
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import context, op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8c41d5e2a6f3'
+down_revision: Union[str, None] = '3f2a9c1d7b80'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+COLUMNS = (
+    "id, user_id, review_text, rating, verified_purchase, category, "
+    "prediction_result, confidence_score, model_version"
+)
+
+# Mirrors Prediction.__table_args__; created after the copy, which is faster
+# than maintaining them row by row. ix_predictions_id is gone: the primary
+# key (id, created_at) serves lookups by id.
+INDEXES = {
+    "ix_predictions_user_id_created_at":
+        "ON predictions (user_id, created_at DESC, id DESC)",
+    "ix_predictions_created_at":
+        "ON predictions (created_at DESC, id DESC)",
+    "ix_predictions_category_created_at":
+        "ON predictions (category, created_at DESC, id DESC)",
+    "ix_predictions_result_created_at":
+        "ON predictions (prediction_result, created_at DESC, id DESC)",
+    "ix_predictions_review_text_tsv":
+        "ON predictions USING gin (to_tsvector('english'::regconfig, review_text))",
+}
+
+# One partition per month holding data, through two months ahead; names match
+# app.db.partitions.partition_name, which creates later months at runtime
+CREATE_PARTITIONS = """
+DO $$
+DECLARE
+    first_month timestamp;
+    last_month timestamp;
+BEGIN
+    SELECT date_trunc('month', coalesce(min(created_at), now() AT TIME ZONE 'UTC')),
+           date_trunc('month', greatest(max(created_at), now() AT TIME ZONE 'UTC'))
+               + interval '2 months'
+      INTO first_month, last_month
+      FROM predictions_unpartitioned;
+    WHILE first_month <= last_month LOOP
+        EXECUTE format(
+            'CREATE TABLE %I PARTITION OF predictions FOR VALUES FROM (%L) TO (%L)',
+            'predictions_y' || to_char(first_month, 'YYYY"m"MM'),
+            first_month,
+            first_month + interval '1 month'
+        );
+        first_month := first_month + interval '1 month';
+    END LOOP;
+END $$
+"""
+
+
+def _is_partitioned() -> bool:
+    relkind = op.get_bind().execute(
+        sa.text("SELECT relkind FROM pg_class WHERE oid = to_regclass('predictions')")
+    ).scalar()
+    return relkind == "p"
+
+
+def upgrade() -> None:
+    if not context.is_offline_mode():
+        if not sa.inspect(op.get_bind()).has_table("predictions"):
+            # Fresh database: the app's create_all builds the partitioned table
+            return
+        if _is_partitioned():
+            return
+
+    # Rewrites the whole table in one transaction: stop writers first and
+    # expect roughly the time of a full copy plus an index build
+    op.execute("ALTER TABLE predictions RENAME TO predictions_unpartitioned")
+    op.execute(
+        "ALTER TABLE predictions_unpartitioned "
+        "RENAME CONSTRAINT predictions_pkey TO predictions_unpartitioned_pkey"
+    )
+    op.create_table(
+        "predictions",
+        sa.Column("id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("user_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("users.id"), nullable=True),
+        sa.Column("review_text", sa.Text(), nullable=False),
+        sa.Column("rating", sa.Integer(), nullable=False),
+        sa.Column("verified_purchase", sa.Boolean(), nullable=False),
+        sa.Column("category", sa.String(length=100), nullable=False),
+        sa.Column("prediction_result", sa.String(length=10), nullable=False),
+        sa.Column("confidence_score", sa.Float(), nullable=True),
+        sa.Column("model_version", sa.String(length=50), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint("id", "created_at", name="predictions_pkey"),
+        postgresql_partition_by="RANGE (created_at)",
+    )
+    op.execute(CREATE_PARTITIONS)
+    op.execute(
+        f"INSERT INTO predictions ({COLUMNS}, created_at) "
+        f"SELECT {COLUMNS}, coalesce(created_at, now() AT TIME ZONE 'UTC') "
+        f"FROM predictions_unpartitioned"
+    )
+    op.execute("DROP TABLE predictions_unpartitioned")
+    for name, definition in INDEXES.items():
+        op.execute(f"CREATE INDEX {name} {definition}")
+
+
+def downgrade() -> None:
+    if not context.is_offline_mode() and not _is_partitioned():
+        return
+
+    op.execute("ALTER TABLE predictions RENAME TO predictions_partitioned")
+    op.execute(
+        "ALTER TABLE predictions_partitioned "
+        "RENAME CONSTRAINT predictions_pkey TO predictions_partitioned_pkey"
+    )
+    op.create_table(
+        "predictions",
+        sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column("user_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("users.id"), nullable=True),
+        sa.Column("review_text", sa.Text(), nullable=False),
+        sa.Column("rating", sa.Integer(), nullable=False),
+        sa.Column("verified_purchase", sa.Boolean(), nullable=False),
+        sa.Column("category", sa.String(length=100), nullable=False),
+        sa.Column("prediction_result", sa.String(length=10), nullable=False),
+        sa.Column("confidence_score", sa.Float(), nullable=True),
+        sa.Column("model_version", sa.String(length=50), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=True),
+    )
+    op.execute(
+        f"INSERT INTO predictions ({COLUMNS}, created_at) "
+        f"SELECT {COLUMNS}, created_at FROM predictions_partitioned"
+    )
+    # Drops every attached partition with it
+    op.execute("DROP TABLE predictions_partitioned")
+    op.execute("CREATE INDEX ix_predictions_id ON predictions (id)")
+    for name, definition in INDEXES.items():
+        op.execute(f"CREATE INDEX {name} {definition}")
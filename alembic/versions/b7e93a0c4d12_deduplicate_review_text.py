@@ -0,0 +1,70 @@
+"""store each distinct review text once in reviews
+
+Revision ID: b7e93a0c4d12
+Revises: 8c41d5e2a6f3
+Create Date: 2026-10-18 15:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import context, op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7e93a0c4d12'
+down_revision: Union[str, None] = '8c41d5e2a6f3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Must match app.models.review.review_hash
+HASH = "sha256(convert_to(review_text, 'UTF8'))"
+SEARCH_INDEX = "USING gin (to_tsvector('english'::regconfig, review_text))"
+
+
+def upgrade() -> None:
+    if not context.is_offline_mode():
+        inspector = sa.inspect(op.get_bind())
+        if not inspector.has_table("predictions"):
+            # Fresh database: the app's create_all builds both tables
+            return
+        if "review_hash" in {column["name"] for column in inspector.get_columns("predictions")}:
+            return
+
+    # One pass over predictions plus a rewrite of every row: stop writers
+    # first. The space freed by dropping review_text is only returned to
+    # the OS once each partition is rewritten (VACUUM FULL or pg_repack).
+    op.create_table(
+        "reviews",
+        sa.Column("hash", sa.LargeBinary(length=32), primary_key=True),
+        sa.Column("review_text", sa.Text(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+    )
+    op.execute(
+        f"INSERT INTO reviews (hash, review_text, created_at) "
+        f"SELECT {HASH}, review_text, min(created_at) FROM predictions GROUP BY review_text"
+    )
+    op.add_column("predictions", sa.Column("review_hash", sa.LargeBinary(length=32)))
+    op.execute(f"UPDATE predictions SET review_hash = {HASH}")
+    op.alter_column("predictions", "review_hash", nullable=False)
+    op.create_foreign_key(
+        "predictions_review_hash_fkey", "predictions", "reviews", ["review_hash"], ["hash"]
+    )
+    op.execute("CREATE INDEX ix_predictions_review_hash ON predictions (review_hash)")
+    op.execute("DROP INDEX IF EXISTS ix_predictions_review_text_tsv")
+    op.drop_column("predictions", "review_text")
+    op.execute(f"CREATE INDEX ix_reviews_review_text_tsv ON reviews {SEARCH_INDEX}")
+
+
+def downgrade() -> None:
+    op.add_column("predictions", sa.Column("review_text", sa.Text()))
+    op.execute(
+        "UPDATE predictions SET review_text = reviews.review_text "
+        "FROM reviews WHERE reviews.hash = predictions.review_hash"
+    )
+    op.alter_column("predictions", "review_text", nullable=False)
+    op.drop_index("ix_predictions_review_hash", table_name="predictions")
+    op.drop_constraint("predictions_review_hash_fkey", "predictions", type_="foreignkey")
+    op.drop_column("predictions", "review_hash")
+    op.drop_table("reviews")
+    op.execute(f"CREATE INDEX ix_predictions_review_text_tsv ON predictions {SEARCH_INDEX}")
@@ -0,0 +1,80 @@
+"""prediction_stats rollup, backfilled from predictions
+
+Revision ID: d5f1a7c3e9b2
+Revises: b7e93a0c4d12
+Create Date: 2026-10-18 18:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import context, op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd5f1a7c3e9b2'
+down_revision: Union[str, None] = 'b7e93a0c4d12'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Must match app.models.prediction_stat.ANONYMOUS_USER_ID
+ANONYMOUS_USER_ID = "00000000-0000-0000-0000-000000000000"
+
+
+def upgrade() -> None:
+    has_stats = False
+    if not context.is_offline_mode():
+        inspector = sa.inspect(op.get_bind())
+        if not inspector.has_table("predictions"):
+            # Fresh database: the app's create_all builds every table
+            return
+        # The app's create_all may already have added it, partly filled
+        has_stats = inspector.has_table("prediction_stats")
+
+    if not has_stats:
+        op.create_table(
+            "prediction_stats",
+            sa.Column("user_id", postgresql.UUID(as_uuid=True), primary_key=True),
+            sa.Column("day", sa.Date(), primary_key=True),
+            sa.Column("category", sa.String(length=100), primary_key=True),
+            sa.Column("model_version", sa.String(length=50), primary_key=True),
+            sa.Column("total", sa.BigInteger(), nullable=False),
+            sa.Column("real_count", sa.BigInteger(), nullable=False),
+            sa.Column("fake_count", sa.BigInteger(), nullable=False),
+            sa.Column("confidence_sum", sa.Float(), nullable=False),
+            sa.Column("confidence_count", sa.BigInteger(), nullable=False),
+        )
+
+    # Same as `python -m app.cli rebuild-stats`: replace every day still in
+    # predictions, keeping totals for months already removed by retention.
+    # One pass over predictions; stop writers first.
+    op.execute("LOCK TABLE prediction_stats IN EXCLUSIVE MODE")
+    op.execute(
+        "DELETE FROM prediction_stats "
+        "WHERE day >= (SELECT min(created_at)::date FROM predictions)"
+    )
+    op.execute(
+        f"""
+        INSERT INTO prediction_stats (
+            user_id, day, category, model_version, total,
+            real_count, fake_count, confidence_sum, confidence_count
+        )
+        SELECT
+            coalesce(user_id, '{ANONYMOUS_USER_ID}'::uuid),
+            created_at::date,
+            category,
+            coalesce(model_version, ''),
+            count(*),
+            count(*) FILTER (WHERE prediction_result = 'real'),
+            count(*) FILTER (WHERE prediction_result = 'fake'),
+            coalesce(sum(confidence_score), 0.0),
+            count(confidence_score)
+        FROM predictions
+        GROUP BY 1, 2, 3, 4
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("prediction_stats")
@@ -0,0 +1,5 @@
+import time
+
+# Runs before any other app module; app.main reports the time from here to
+# the end of its own imports as startup_timings["import"]
+IMPORT_STARTED = time.perf_counter()
@@ -1,19 +1,42 @@
 from typing import Optional
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.config import settings
+from app.core.metrics import LOGIN_REJECTED
+from app.core.rate_limit import ConcurrencyLimiter, TooManyConcurrent
 from app.core.security import verify_token
+from app.crud import user as crud_user
 from app.db.session import get_db as get_database_session
 
 security = HTTPBearer(auto_error=False)
 
+# Password hashing is slow by design; cap it per client so one burst
+# cannot take every hashing thread
+login_limiter = ConcurrencyLimiter(settings.LOGIN_MAX_CONCURRENT_PER_IP)
+
 
 async def get_db() -> AsyncSession:
     async for session in get_database_session():
         yield session
 
 
+async def login_slot(request: Request):
+    """Hold one of the client IP's concurrent login/register slots for the request."""
+    client = request.client.host if request.client else None
+    try:
+        with login_limiter.slot(client):
+            yield
+    except TooManyConcurrent:
+        LOGIN_REJECTED.inc()
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many concurrent login attempts",
+            headers={"Retry-After": "1"},
+        )
+
+
 async def get_current_user_email(
     credentials: Optional[HTTPAuthorizationCredentials] = Depends(security),
 ) -> Optional[str]:
@@ -44,3 +67,22 @@ async def get_current_active_user(
             detail="Not authenticated",
         )
     return current_user_email
+
+
+async def get_current_active_superuser(
+    db: AsyncSession = Depends(get_db),
+    current_user_email: str = Depends(get_current_active_user),
+):
+    """Get current user, requiring superuser privileges."""
+    user = await crud_user.get_identity_by_email(db, email=current_user_email)
+    if not user or not user.is_active:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Not authenticated",
+        )
+    if not user.is_superuser:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not enough permissions",
+        )
+    return user
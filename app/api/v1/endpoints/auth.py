@@ -8,11 +8,12 @@ from app.core import security
 from app.core.config import settings
 from app.crud import user as crud_user
 from app.api.v1.schemas.auth import Token
+from app.api.v1.schemas.user import UserCreate
 
 router = APIRouter()
 
 
-@router.post("/register", response_model=dict)
+@router.post("/register", response_model=dict, dependencies=[Depends(deps.login_slot)])
 async def register(
     *,
     db: AsyncSession = Depends(deps.get_db),
@@ -27,13 +28,13 @@ async def register(
             detail="Email already registered",
         )
     
-    user_in = {"email": email, "password": password}
+    user_in = UserCreate(email=email, password=password)
     user = await crud_user.create(db, obj_in=user_in)
     
     return {"message": "User created successfully", "user_id": str(user.id)}
 
 
-@router.post("/login", response_model=Token)
+@router.post("/login", response_model=Token, dependencies=[Depends(deps.login_slot)])
 async def login(
     db: AsyncSession = Depends(deps.get_db),
     form_data: OAuth2PasswordRequestForm = Depends()
@@ -1,9 +1,9 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import text
 
 from app.api import deps
-from app.services.ml_service import ml_service
+from app.services.model_registry import model_registry
 
 router = APIRouter()
 
@@ -13,10 +13,17 @@ async def health_check(
     db: AsyncSession = Depends(deps.get_db),
 ) -> dict:
     """Health check endpoint."""
+    ml_service = model_registry.active
     health_status = {
         "status": "healthy",
         "database": "connected",
-        "model": "loaded" if ml_service.health_check() else "failed",
+        "model": (
+            "loaded" if ml_service.health_check()
+            else "failed" if ml_service.load_error
+            else "loading"
+        ),
+        "model_version": ml_service.model_version,
+        "lemma_cache": ml_service.lemma_cache_stats(),
     }
     
     # Test database connection
@@ -31,6 +38,7 @@ async def health_check(
 
 @router.get("/ready")
 async def readiness_check(
+    response: Response,
     db: AsyncSession = Depends(deps.get_db),
 ) -> dict:
     """Readiness check for Kubernetes."""
@@ -47,11 +55,15 @@ async def readiness_check(
         pass
     
     # Check model
+    ml_service = model_registry.active
     checks["model"] = ml_service.health_check()
     
     ready = all(checks.values())
+    if not ready:
+        response.status_code = status.HTTP_503_SERVICE_UNAVAILABLE
     
     return {
         "ready": ready,
         "checks": checks,
+        "startup_timings": ml_service.startup_timings,
     }
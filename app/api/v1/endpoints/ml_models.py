@@ -0,0 +1,79 @@
+from typing import List
+from fastapi import APIRouter, Depends, HTTPException
+
+from app.api import deps
+from app.api.v1.schemas.ml_model import ModelVersionLoad, ModelVersionResponse
+from app.services.model_registry import InvalidModelName, model_registry
+
+router = APIRouter()
+
+
+def _version_response(version: str) -> ModelVersionResponse:
+    for info in model_registry.versions():
+        if info["version"] == version:
+            return ModelVersionResponse(**info)
+    raise HTTPException(status_code=404, detail="Model version not found")
+
+
+@router.get("/", response_model=List[ModelVersionResponse])
+async def list_model_versions(
+    current_user=Depends(deps.get_current_active_superuser),
+) -> List[ModelVersionResponse]:
+    """List loaded model versions."""
+    return [ModelVersionResponse(**info) for info in model_registry.versions()]
+
+
+@router.post("/", response_model=ModelVersionResponse)
+async def load_model_version(
+    *,
+    model_in: ModelVersionLoad,
+    current_user=Depends(deps.get_current_active_superuser),
+) -> ModelVersionResponse:
+    """Load and warm up a model version, optionally swapping it in."""
+    try:
+        await model_registry.load(
+            model_in.version,
+            model_in.model_name,
+            activate=model_in.activate,
+            model_format=model_in.model_format,
+        )
+    except InvalidModelName as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+    return _version_response(model_in.version)
+
+
+@router.post("/{version}/activate", response_model=ModelVersionResponse)
+async def activate_model_version(
+    version: str,
+    current_user=Depends(deps.get_current_active_superuser),
+) -> ModelVersionResponse:
+    """Atomically switch new predictions to a loaded model version."""
+    try:
+        await model_registry.activate(version)
+    except KeyError:
+        raise HTTPException(status_code=404, detail="Model version not found")
+
+    return _version_response(version)
+
+
+@router.delete("/{version}", response_model=dict)
+async def unload_model_version(
+    version: str,
+    current_user=Depends(deps.get_current_active_superuser),
+) -> dict:
+    """Unload an inactive model version."""
+    try:
+        await model_registry.unload(version)
+    except KeyError:
+        raise HTTPException(status_code=404, detail="Model version not found")
+    except ValueError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+    return {"message": f"Model version {version} unloaded"}
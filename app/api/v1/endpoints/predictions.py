@@ -1,21 +1,81 @@
-from typing import Optional
-from fastapi import APIRouter, Depends, HTTPException, Query
+import asyncio
+import json
+from datetime import date
+from typing import Any, List, Optional, Tuple
+from uuid import UUID
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, WebSocket, WebSocketDisconnect
+from fastapi.responses import StreamingResponse
+from pydantic import ValidationError
 from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.requests import ClientDisconnect
 
 from app.api import deps
+from app.core.config import settings
 from app.core.security import verify_token
 from app.crud import prediction as crud_prediction
+from app.crud.base import decode_cursor, encode_cursor
+from app.db.session import AsyncSessionLocal
 from app.api.v1.schemas.prediction import (
     PredictionCreate,
+    PredictionBatchCreate,
     PredictionResponse,
+    PredictionBatchResponse,
     PredictionList,
     PredictionStats,
 )
-from app.services.ml_service import ml_service
+from app.services.inference import InferenceQueueFull
+from app.services.ml_service import ModelNotReady
+from app.services.near_duplicates import near_duplicate_index
+from app.services.prediction_writer import prediction_writer
+from app.services.scoring import score_review, score_reviews
 
 router = APIRouter()
 
 
+async def _clusters(ids: List[UUID], review_texts: List[str]) -> List[dict]:
+    """Index new predictions for near-duplicate detection"""
+    if not settings.NEAR_DUPLICATE_ENABLED:
+        return [{} for _ in ids]
+    return [
+        {"near_duplicate_of": near_duplicate_of, "cluster_size": cluster_size}
+        for near_duplicate_of, cluster_size in await near_duplicate_index.add_many(ids, review_texts)
+    ]
+
+
+async def _store_batch(
+    db: AsyncSession,
+    items: List[PredictionCreate],
+    results: List[tuple],
+    user_id: Optional[str],
+) -> List[PredictionResponse]:
+    """Persist scored reviews (directly or write-behind) and build their responses"""
+    if prediction_writer.running:
+        rows = [
+            crud_prediction.build_row(
+                item,
+                user_id=user_id,
+                prediction_result=result,
+                confidence_score=confidence,
+                model_version=model_version,
+            )
+            for item, (result, confidence, model_version) in zip(items, results)
+        ]
+        prediction_writer.submit(rows)
+    else:
+        rows = await crud_prediction.create_many_with_user(
+            db,
+            objs_in=items,
+            results=results,
+            user_id=user_id,
+        )
+
+    clusters = await _clusters(
+        [row["id"] for row in rows], [row["review_text"] for row in rows]
+    )
+    return [PredictionResponse(**row, **cluster) for row, cluster in zip(rows, clusters)]
+
+
 @router.post("/", response_model=PredictionResponse)
 async def create_prediction(
     *,
@@ -26,20 +86,37 @@ async def create_prediction(
     """Create a new prediction."""
     try:
         # Make prediction using ML service
-        result, confidence = ml_service.predict(
+        result, confidence, model_version = await score_review(
             review_text=prediction_in.review_text,
             rating=prediction_in.rating,
             verified_purchase=prediction_in.verified_purchase,
             category=prediction_in.category,
         )
         
+        if prediction_writer.running:
+            # Respond now; the record is inserted with the next batch
+            row = crud_prediction.build_row(
+                prediction_in,
+                user_id=current_user_email,
+                prediction_result=result,
+                confidence_score=confidence,
+                model_version=model_version,
+            )
+            prediction_writer.submit([row])
+            cluster = (await _clusters([row["id"]], [row["review_text"]]))[0]
+            return PredictionResponse(**row, **cluster)
+
         # Create prediction record
         prediction = await crud_prediction.create_with_user(
             db,
             obj_in=prediction_in,
             user_id=current_user_email,
+            prediction_result=result,
+            confidence_score=confidence,
+            model_version=model_version,
         )
         
+        cluster = (await _clusters([prediction.id], [prediction.review_text]))[0]
         return PredictionResponse(
             id=prediction.id,
             user_id=prediction.user_id,
@@ -51,32 +128,263 @@ async def create_prediction(
             confidence_score=confidence,
             model_version=prediction.model_version,
             created_at=prediction.created_at,
+            **cluster,
         )
         
+    except (InferenceQueueFull, ModelNotReady) as e:
+        raise HTTPException(
+            status_code=503, detail=str(e), headers={"Retry-After": "1"}
+        )
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.post("/batch", response_model=PredictionBatchResponse)
+async def create_predictions_batch(
+    *,
+    db: AsyncSession = Depends(deps.get_db),
+    batch_in: PredictionBatchCreate,
+    current_user_email: Optional[str] = Depends(verify_token),
+) -> PredictionBatchResponse:
+    """Score many reviews in one classifier call and store them in one insert."""
+    try:
+        results = await score_reviews(
+            [item.model_dump() for item in batch_in.items]
+        )
+
+        items = await _store_batch(db, batch_in.items, results, current_user_email)
+        return PredictionBatchResponse(items=items, size=len(items))
+
+    except (InferenceQueueFull, ModelNotReady) as e:
+        raise HTTPException(
+            status_code=503, detail=str(e), headers={"Retry-After": "1"}
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+class NDJSONStreamingResponse(StreamingResponse):
+    """StreamingResponse that leaves the request body to the generator.
+
+    Starlette's StreamingResponse listens for a client disconnect while
+    it streams, which consumes ``receive`` and so swallows any request
+    body that has not been read yet. Here the body is read incrementally
+    by the generator itself, which also surfaces a disconnect.
+    """
+
+    media_type = "application/x-ndjson"
+
+    async def __call__(self, scope, receive, send):
+        await self.stream_response(send)
+        if self.background is not None:
+            await self.background()
+
+
+async def _score_with_backoff(reviews: List[dict]) -> List[tuple]:
+    # A stream can wait for capacity instead of failing like a single request
+    for _ in range(250):
+        try:
+            return await score_reviews(reviews)
+        except InferenceQueueFull:
+            await asyncio.sleep(0.02)
+    return await score_reviews(reviews)
+
+
+async def _score_entries(
+    db: AsyncSession,
+    entries: List[Tuple[int, Any]],
+    user_id: Optional[str],
+    key: str,
+) -> List[str]:
+    """Validate, score and store (position, payload) entries; one JSON string each"""
+    messages = {}
+    valid = []
+    for position, payload in entries:
+        if isinstance(payload, Exception):
+            messages[position] = {key: position, "error": str(payload)}
+            continue
+        try:
+            valid.append((position, PredictionCreate.model_validate(payload)))
+        except ValidationError as e:
+            messages[position] = {
+                key: position,
+                "error": "; ".join(
+                    f"{'.'.join(map(str, error['loc']))}: {error['msg']}" for error in e.errors()
+                ),
+            }
+
+    if valid:
+        items = [item for _, item in valid]
+        try:
+            results = await _score_with_backoff([item.model_dump() for item in items])
+            responses = await _store_batch(db, items, results, user_id)
+            for (position, _), response in zip(valid, responses):
+                messages[position] = {key: position, **response.model_dump(mode="json")}
+        except Exception as e:
+            # The stream reuses one session; leave it usable for the next batch
+            await db.rollback()
+            for position, _ in valid:
+                messages[position] = {key: position, "error": str(e)}
+
+    return [json.dumps(messages[position]) for position, _ in entries]
+
+
+async def _ndjson_predictions(request: Request, user_id: Optional[str]):
+    batch_size = settings.PREDICTION_STREAM_BATCH_SIZE
+    max_line = settings.PREDICTION_STREAM_MAX_LINE_BYTES
+    buffer = b""
+    line_number = 0
+    entries: List[Tuple[int, Any]] = []
+
+    def parse(line: bytes):
+        nonlocal line_number
+        line_number += 1
+        if line.strip():
+            try:
+                entries.append((line_number, json.loads(line)))
+            except ValueError as e:
+                entries.append((line_number, e))
+
+    async with AsyncSessionLocal() as db:
+        try:
+            # The next chunk is only read once the previous batch has been
+            # written out, so a slow client or model pushes back on the upload
+            async for chunk in request.stream():
+                *lines, buffer = (buffer + chunk).split(b"\n")
+                too_long = len(buffer) > max_line
+                for line in lines:
+                    if len(line) > max_line:
+                        too_long = True
+                        break
+                    parse(line)
+                while len(entries) >= batch_size or (too_long and entries):
+                    batch, entries[:] = entries[:batch_size], entries[batch_size:]
+                    for message in await _score_entries(db, batch, user_id, "line"):
+                        yield message + "\n"
+                if too_long:
+                    # Every line before it has been answered; nothing after it is read
+                    yield json.dumps({
+                        "line": line_number + 1,
+                        "error": f"Line longer than {max_line} bytes",
+                    }) + "\n"
+                    return
+            parse(buffer)
+            if entries:
+                for message in await _score_entries(db, entries, user_id, "line"):
+                    yield message + "\n"
+        except ClientDisconnect:
+            return
+
+
+@router.post("/stream")
+async def create_predictions_stream(
+    request: Request,
+    current_user_email: Optional[str] = Depends(verify_token),
+) -> NDJSONStreamingResponse:
+    """Score an NDJSON upload of reviews, streaming one result line per input line.
+
+    Each output line carries ``line`` (1-based input line number) and either
+    the stored prediction or an ``error``.
+    """
+    return NDJSONStreamingResponse(_ndjson_predictions(request, current_user_email))
+
+
+@router.websocket("/ws")
+async def predictions_websocket(
+    websocket: WebSocket,
+    token: Optional[str] = Query(None),
+):
+    """Score reviews sent as JSON messages (one object or a list) over a WebSocket.
+
+    Every review gets one reply carrying ``seq``, its 0-based position in
+    the stream, and either the stored prediction or an ``error``.
+    """
+    user_id = verify_token(token) if token else None
+    batch_size = settings.PREDICTION_STREAM_BATCH_SIZE
+    await websocket.accept()
+    # Bounded: once two batches are waiting we stop reading the socket
+    queue: asyncio.Queue = asyncio.Queue(maxsize=2 * batch_size)
+
+    async def receive():
+        seq = 0
+        try:
+            while True:
+                text = await websocket.receive_text()
+                try:
+                    payload = json.loads(text)
+                except ValueError as e:
+                    payload = e
+                for item in payload if isinstance(payload, list) else [payload]:
+                    await queue.put((seq, item))
+                    seq += 1
+        except WebSocketDisconnect:
+            pass
+        finally:
+            await queue.put(None)
+
+    receiver = asyncio.create_task(receive())
+    try:
+        async with AsyncSessionLocal() as db:
+            done = False
+            while not done:
+                entry = await queue.get()
+                if entry is None:
+                    break
+                batch = [entry]
+                while len(batch) < batch_size and not queue.empty():
+                    entry = queue.get_nowait()
+                    if entry is None:
+                        done = True
+                        break
+                    batch.append(entry)
+                for message in await _score_entries(db, batch, user_id, "seq"):
+                    await websocket.send_text(message)
+        await websocket.close()
+    except (WebSocketDisconnect, RuntimeError):
+        pass
+    finally:
+        receiver.cancel()
+
+
 @router.get("/", response_model=PredictionList)
 async def read_predictions(
     db: AsyncSession = Depends(deps.get_db),
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=100),
+    cursor: Optional[str] = Query(
+        None, description="next_cursor of the previous page; skip is ignored when set"
+    ),
+    count: str = Query(
+        "exact",
+        pattern="^(exact|estimate|none)$",
+        description="How to compute total: exact count, planner estimate, or not at all",
+    ),
     current_user_email: Optional[str] = Depends(verify_token),
 ) -> PredictionList:
     """Get predictions for the current user."""
+    after = None
+    if cursor:
+        try:
+            after = decode_cursor(cursor)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
     if not current_user_email:
         # Return anonymous predictions
         predictions = await crud_prediction.get_multi(
-            db, skip=skip, limit=limit
+            db, skip=skip, limit=limit, after=after
         )
-        total = await crud_prediction.count(db)
     else:
         # Return user-specific predictions
         predictions = await crud_prediction.get_user_predictions(
-            db, user_id=current_user_email, skip=skip, limit=limit
+            db, user_id=current_user_email, skip=skip, limit=limit, after=after
         )
+
+    total = None
+    if count == "exact":
         total = await crud_prediction.count(db, user_id=current_user_email)
+    elif count == "estimate":
+        total = await crud_prediction.estimate_count(db, user_id=current_user_email)
     
     items = [
         PredictionResponse(
@@ -93,31 +401,98 @@ async def read_predictions(
         )
         for prediction in predictions
     ]
-    
-    pages = (total + limit - 1) // limit
+
+    next_cursor = None
+    if len(predictions) == limit:
+        last = predictions[-1]
+        next_cursor = encode_cursor(last.created_at, last.id)
     
     return PredictionList(
         items=items,
         total=total,
-        page=skip // limit + 1,
+        total_is_estimate=count == "estimate",
+        page=None if after else skip // limit + 1,
         size=len(items),
-        pages=pages,
+        pages=None if total is None else (total + limit - 1) // limit,
+        next_cursor=next_cursor,
     )
 
 
 @router.get("/stats", response_model=PredictionStats)
 async def get_prediction_stats(
     db: AsyncSession = Depends(deps.get_db),
+    start_date: Optional[date] = Query(None, description="First UTC day to include"),
+    end_date: Optional[date] = Query(None, description="Last UTC day to include"),
+    category: Optional[str] = Query(None, max_length=100),
+    model_version: Optional[str] = Query(None, max_length=50),
     current_user_email: Optional[str] = Depends(verify_token),
 ) -> PredictionStats:
     """Get prediction statistics."""
     stats = await crud_prediction.get_stats(
-        db, user_id=current_user_email
+        db,
+        user_id=current_user_email,
+        start_date=start_date,
+        end_date=end_date,
+        category=category,
+        model_version=model_version,
     )
     
     return PredictionStats(**stats)
 
 
+@router.get("/search", response_model=PredictionList)
+async def search_predictions(
+    db: AsyncSession = Depends(deps.get_db),
+    q: Optional[str] = Query(
+        None,
+        min_length=1,
+        max_length=200,
+        description='Full-text query: words, "quoted phrases" and -excluded words',
+    ),
+    category: Optional[str] = Query(None, max_length=100),
+    prediction_result: Optional[str] = Query(None, max_length=10),
+    min_rating: Optional[int] = Query(None, ge=1, le=5),
+    max_rating: Optional[int] = Query(None, ge=1, le=5),
+    start_date: Optional[date] = Query(None, description="First UTC day to include"),
+    end_date: Optional[date] = Query(None, description="Last UTC day to include"),
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    current_user=Depends(deps.get_current_active_superuser),
+) -> PredictionList:
+    """Search all stored predictions (superuser), newest first."""
+    after = None
+    if cursor:
+        try:
+            after = decode_cursor(cursor)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+    predictions = await crud_prediction.search(
+        db,
+        query=q,
+        category=category,
+        prediction_result=prediction_result,
+        min_rating=min_rating,
+        max_rating=max_rating,
+        start_date=start_date,
+        end_date=end_date,
+        limit=limit,
+        after=after,
+    )
+
+    next_cursor = None
+    if len(predictions) == limit:
+        last = predictions[-1]
+        next_cursor = encode_cursor(last.created_at, last.id)
+
+    # Search pages by cursor only; counting matches would defeat the LIMIT
+    return PredictionList(
+        items=[PredictionResponse.model_validate(prediction) for prediction in predictions],
+        size=len(predictions),
+        next_cursor=next_cursor,
+    )
+
+
 @router.get("/{prediction_id}", response_model=PredictionResponse)
 async def read_prediction(
     prediction_id: str,
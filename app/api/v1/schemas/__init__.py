@@ -1,18 +1,25 @@
 from app.api.v1.schemas.user import UserCreate, UserResponse, UserLogin
 from app.api.v1.schemas.prediction import (
     PredictionCreate,
+    PredictionBatchCreate,
     PredictionResponse,
+    PredictionBatchResponse,
     PredictionList,
 )
 from app.api.v1.schemas.auth import Token, TokenData
+from app.api.v1.schemas.ml_model import ModelVersionLoad, ModelVersionResponse
 
 __all__ = [
     "UserCreate",
     "UserResponse",
     "UserLogin",
     "PredictionCreate",
+    "PredictionBatchCreate",
     "PredictionResponse",
+    "PredictionBatchResponse",
     "PredictionList",
     "Token",
     "TokenData",
+    "ModelVersionLoad",
+    "ModelVersionResponse",
 ]
@@ -0,0 +1,19 @@
+from typing import Optional
+from pydantic import BaseModel, Field
+from datetime import datetime
+
+
+class ModelVersionLoad(BaseModel):
+    version: str = Field(..., min_length=1, max_length=50)
+    model_name: str = Field(..., min_length=1)
+    model_format: Optional[str] = Field(None, pattern="^(pickle|artifact)$")
+    activate: bool = True
+
+
+class ModelVersionResponse(BaseModel):
+    version: str
+    model_name: str
+    model_format: str
+    active: bool
+    ready: bool
+    loaded_at: Optional[datetime] = None
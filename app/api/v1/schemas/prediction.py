@@ -1,8 +1,10 @@
 from typing import Optional
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, computed_field
 from datetime import datetime
 from uuid import UUID
 
+from app.core.config import settings
+
 
 class PredictionBase(BaseModel):
     review_text: str = Field(..., min_length=1, max_length=5000)
@@ -15,8 +17,15 @@ class PredictionCreate(PredictionBase):
     pass
 
 
+class PredictionBatchCreate(BaseModel):
+    items: list[PredictionCreate] = Field(
+        ..., min_length=1, max_length=settings.PREDICTION_BATCH_MAX_SIZE
+    )
+
+
 class PredictionUpdate(BaseModel):
-    review_text: Optional[str] = Field(None, min_length=1, max_length=5000)
+    # review_text is not updatable: it lives in reviews, shared by every
+    # prediction of the same text, and Prediction.review_text is read-only
     rating: Optional[int] = Field(None, ge=1, le=5)
     verified_purchase: Optional[bool] = None
     category: Optional[str] = Field(None, min_length=1, max_length=100)
@@ -24,6 +33,10 @@ class PredictionUpdate(BaseModel):
     confidence_score: Optional[float] = None
     model_version: Optional[str] = None
 
+    class Config:
+        # Reject review_text (and typos) instead of silently dropping them
+        extra = "forbid"
+
 
 class PredictionResponse(BaseModel):
     id: UUID
@@ -36,6 +49,18 @@ class PredictionResponse(BaseModel):
     confidence_score: Optional[float] = None
     model_version: str
     created_at: datetime
+    # Set when the review was just scored; see services.near_duplicates
+    near_duplicate_of: Optional[UUID] = None
+    cluster_size: Optional[int] = None
+
+    @computed_field
+    @property
+    def abstain(self) -> bool:
+        """Whether confidence falls inside the configured abstain band."""
+        threshold = settings.CONFIDENCE_ABSTAIN_THRESHOLD
+        if threshold is None or self.confidence_score is None:
+            return False
+        return self.confidence_score < threshold
 
     class Config:
         from_attributes = True
@@ -43,10 +68,17 @@ class PredictionResponse(BaseModel):
 
 class PredictionList(BaseModel):
     items: list[PredictionResponse]
-    total: int
-    page: int
+    total: Optional[int] = None
+    total_is_estimate: bool = False
+    page: Optional[int] = None
+    size: int
+    pages: Optional[int] = None
+    next_cursor: Optional[str] = None
+
+
+class PredictionBatchResponse(BaseModel):
+    items: list[PredictionResponse]
     size: int
-    pages: int
 
 
 class PredictionStats(BaseModel):
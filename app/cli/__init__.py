@@ -0,0 +1,24 @@
+import argparse
+import logging
+from typing import List, Optional
+
+from app.cli import export_model, maintain_partitions, rebuild_stats, score
+
+COMMANDS = {
+    "export-model": export_model,
+    "maintain-partitions": maintain_partitions,
+    "rebuild-stats": rebuild_stats,
+    "score": score,
+}
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Entry point for ``python -m app.cli``"""
+    parser = argparse.ArgumentParser(prog="python -m app.cli")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    for name, command in COMMANDS.items():
+        command.add_parser(subparsers, name)
+
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s %(name)s: %(message)s")
+    return COMMANDS[args.command].run(args)
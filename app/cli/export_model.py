@@ -0,0 +1,59 @@
+import logging
+import os
+
+import numpy as np
+
+from app.core.config import settings
+from app.services.ml_service import MLService
+from app.services.model_artifacts import export_artifact, load_artifact
+
+logger = logging.getLogger(__name__)
+
+
+def add_parser(subparsers, name: str):
+    parser = subparsers.add_parser(
+        name,
+        help="Convert the pickled classifier into a memory-mappable artifact directory",
+    )
+    parser.add_argument(
+        "--model-name",
+        default=settings.MODEL_NAME,
+        help="Pickle file under MODEL_PATH (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--output",
+        required=True,
+        help="Directory to write the weight, bias and vocabulary arrays and meta.json to",
+    )
+
+
+def _same_vocabulary(mapped, vocabulary: dict) -> bool:
+    return len(mapped) == len(vocabulary) and mapped.get_many(list(vocabulary)) == list(vocabulary.values())
+
+
+def run(args) -> int:
+    service = MLService(model_name=args.model_name, model_format="pickle")
+    service.load()
+    if service.compiled is None and not service.compile_model():
+        logger.error("The classifier cannot be exported to the artifact format")
+        return 1
+
+    export_artifact(service.compiled, args.output)
+
+    # Re-read the artifact and make sure it round-trips exactly
+    artifact = load_artifact(args.output)
+    if not (
+        np.array_equal(artifact.weights, service.compiled.weights)
+        and np.array_equal(artifact.bias, service.compiled.bias)
+        and _same_vocabulary(artifact.vocabulary, service.compiled.vocabulary)
+        and _same_vocabulary(artifact.unknown_columns, service.compiled.unknown_columns)
+        and artifact.labels == list(service.compiled.labels)
+    ):
+        logger.error("Exported artifact does not reproduce the compiled classifier")
+        return 1
+
+    size = sum(
+        os.path.getsize(os.path.join(args.output, f)) for f in os.listdir(args.output)
+    )
+    logger.info(f"Exported {args.model_name} to {args.output} ({size / 1e6:.1f} MB)")
+    return 0
@@ -0,0 +1,75 @@
+import asyncio
+import logging
+
+from app.core.config import settings
+from app.db import partitions
+from app.db.session import engine
+
+logger = logging.getLogger(__name__)
+
+
+def add_parser(subparsers, name: str):
+    parser = subparsers.add_parser(
+        name,
+        help="Create upcoming monthly predictions partitions and apply retention",
+    )
+    parser.add_argument(
+        "--months-ahead",
+        type=int,
+        default=settings.PREDICTION_PARTITION_MONTHS_AHEAD,
+    )
+    parser.add_argument(
+        "--retention-months",
+        type=int,
+        default=settings.PREDICTION_RETENTION_MONTHS,
+        help="Remove partitions wholly older than this many months; 0 keeps all",
+    )
+    parser.add_argument(
+        "--mode",
+        choices=partitions.RETENTION_MODES,
+        default=settings.PREDICTION_RETENTION_MODE,
+        help="detach keeps old partitions as standalone tables; drop deletes them",
+    )
+    parser.add_argument(
+        "--prune-reviews",
+        action="store_true",
+        help="Also delete review texts older than the retention window that no "
+        "prediction uses; scans reviews, so run it off-peak",
+    )
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="Report what would change, then roll back",
+    )
+
+
+async def _maintain(args) -> tuple:
+    try:
+        async with engine.connect() as conn:
+            async with conn.begin() as transaction:
+                changes = await partitions.maintain(
+                    conn,
+                    months_ahead=args.months_ahead,
+                    retention_months=args.retention_months,
+                    mode=args.mode,
+                )
+                pruned = 0
+                if args.prune_reviews:
+                    pruned = await partitions.prune_reviews(
+                        conn, retention_months=args.retention_months
+                    )
+                if args.dry_run:
+                    await transaction.rollback()
+            return (*changes, pruned)
+    finally:
+        await engine.dispose()
+
+
+def run(args) -> int:
+    created, removed, pruned = asyncio.run(_maintain(args))
+    removed_as = "dropped" if args.mode == "drop" else "detached"
+    logger.info(
+        f"{'Dry run: would have ' if args.dry_run else ''}created {created or 'no partitions'}, "
+        f"{removed_as} {removed or 'none'}, pruned {pruned} reviews"
+    )
+    return 0
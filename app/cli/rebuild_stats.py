@@ -0,0 +1,28 @@
+import asyncio
+import logging
+
+from app.crud import prediction as crud_prediction
+from app.db.session import AsyncSessionLocal, engine
+
+logger = logging.getLogger(__name__)
+
+
+def add_parser(subparsers, name: str):
+    subparsers.add_parser(
+        name,
+        help="Recompute the prediction_stats rollup from the predictions table",
+    )
+
+
+async def _rebuild() -> int:
+    try:
+        async with AsyncSessionLocal() as db:
+            return await crud_prediction.rebuild_stats(db)
+    finally:
+        await engine.dispose()
+
+
+def run(args) -> int:
+    rows = asyncio.run(_rebuild())
+    logger.info(f"Rebuilt prediction_stats: {rows} rows")
+    return 0
@@ -0,0 +1,201 @@
+import asyncio
+import csv
+import json
+import logging
+import os
+import sys
+import time
+import uuid
+from collections import deque
+from contextlib import nullcontext
+from itertools import islice
+from typing import Iterator, List, Union
+
+from pydantic import ValidationError
+
+from app.api.v1.schemas.prediction import PredictionCreate
+from app.core.config import settings
+from app.crud import prediction as crud_prediction
+from app.db.session import AsyncSessionLocal, engine
+from app.services.inference import _worker_predict_batch, create_worker_pool, warm_up_workers
+from app.services.ml_service import MLService
+
+logger = logging.getLogger(__name__)
+
+TRUE_VALUES = {"1", "true", "t", "yes", "y"}
+
+
+def add_parser(subparsers, name: str):
+    parser = subparsers.add_parser(
+        name,
+        help="Score a JSONL or CSV file of reviews and stream the predictions out",
+    )
+    parser.add_argument("input", help="JSONL or CSV file of reviews, or - for stdin")
+    parser.add_argument(
+        "--output",
+        default="-",
+        help="Where to write predictions, .csv or JSONL (default: stdout)",
+    )
+    parser.add_argument(
+        "--format",
+        choices=("auto", "jsonl", "csv"),
+        default="auto",
+        help="Input format; auto picks csv for *.csv and JSONL otherwise",
+    )
+    parser.add_argument("--chunk-size", type=int, default=1000)
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="Scoring processes, each with its own model (default: %(default)s)",
+    )
+    parser.add_argument("--model-name", default=settings.MODEL_NAME)
+    parser.add_argument("--model-format", default=settings.MODEL_FORMAT)
+    parser.add_argument("--model-version", default=settings.MODEL_VERSION)
+    parser.add_argument(
+        "--copy",
+        action="store_true",
+        help="Also bulk-load the predictions into the database with COPY",
+    )
+    parser.add_argument("--user-id", type=uuid.UUID, help="Owner of the copied predictions")
+
+
+def _open(path: str, mode: str):
+    if path == "-":
+        # The caller's ``with`` must not close the process's stdin/stdout
+        return nullcontext(sys.stdin if "r" in mode else sys.stdout)
+    return open(path, mode, newline="", encoding="utf-8")
+
+
+def _read_rows(f, fmt: str) -> Iterator[Union[dict, str]]:
+    """CSV rows as dicts, or JSONL lines still to be decoded"""
+    if fmt == "csv":
+        for row in csv.DictReader(f):
+            row["verified_purchase"] = str(row.get("verified_purchase", "")).strip().lower() in TRUE_VALUES
+            yield row
+        return
+    for line in f:
+        if line.strip():
+            yield line
+
+
+def _read_reviews(f, fmt: str, skipped: List[int]) -> Iterator[PredictionCreate]:
+    for line_number, row in enumerate(_read_rows(f, fmt), start=1):
+        try:
+            if isinstance(row, str):
+                row = json.loads(row)
+            yield PredictionCreate(**row)
+        except (json.JSONDecodeError, ValidationError, TypeError) as e:
+            skipped[0] += 1
+            logger.warning(f"Skipping record {line_number}: {str(e)}")
+
+
+def _chunks(reviews: Iterator[PredictionCreate], size: int) -> Iterator[List[PredictionCreate]]:
+    while True:
+        chunk = list(islice(reviews, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+class _Writer:
+    """Writes prediction rows as JSONL, or CSV when the path ends in .csv"""
+
+    def __init__(self, f, csv_output: bool):
+        self.f = f
+        self.csv_output = csv_output
+        self._csv = None
+
+    def write(self, rows: List[dict]):
+        if not self.csv_output:
+            self.f.writelines(json.dumps(row, default=str) + "\n" for row in rows)
+            return
+        if self._csv is None:
+            self._csv = csv.DictWriter(self.f, fieldnames=list(rows[0]))
+            self._csv.writeheader()
+        self._csv.writerows(rows)
+
+
+async def _score(args) -> int:
+    fmt = args.format
+    if fmt == "auto":
+        fmt = "csv" if args.input.endswith(".csv") else "jsonl"
+
+    loop = asyncio.get_running_loop()
+    executor = None
+    service = None
+    if args.workers > 1:
+        executor = create_worker_pool(
+            args.workers, args.model_name, args.model_version, args.model_format
+        )
+        # Load the model in every worker before the clock starts
+        if not await warm_up_workers(executor, args.workers):
+            executor.shutdown(cancel_futures=True)
+            logger.error("Scoring workers failed to load the model")
+            return 1
+    else:
+        service = MLService(
+            model_name=args.model_name,
+            model_version=args.model_version,
+            model_format=args.model_format,
+        )
+        service.load()
+
+    skipped = [0]
+    scored = 0
+    started = time.perf_counter()
+    # Bound the chunks in flight so memory stays flat however large the input
+    pending = deque()
+    max_pending = 2 * max(args.workers, 1)
+
+    with _open(args.input, "r") as f_in, _open(args.output, "w") as f_out:
+        writer = _Writer(f_out, args.output.endswith(".csv"))
+
+        async def drain_one():
+            nonlocal scored
+            chunk, future = pending.popleft()
+            results = await future
+            rows = [
+                crud_prediction.build_row(
+                    review,
+                    user_id=args.user_id,
+                    prediction_result=result,
+                    confidence_score=confidence,
+                    model_version=model_version,
+                )
+                for review, (result, confidence, model_version) in zip(chunk, results)
+            ]
+            if args.copy:
+                async with AsyncSessionLocal() as db:
+                    await crud_prediction.copy_rows(db, rows=rows)
+            writer.write(rows)
+            scored += len(rows)
+
+        try:
+            for chunk in _chunks(_read_reviews(f_in, fmt, skipped), args.chunk_size):
+                reviews = [review.model_dump() for review in chunk]
+                if executor is not None:
+                    future = loop.run_in_executor(executor, _worker_predict_batch, reviews)
+                else:
+                    future = loop.run_in_executor(None, service.predict_batch, reviews)
+                pending.append((chunk, future))
+                if len(pending) >= max_pending:
+                    await drain_one()
+            while pending:
+                await drain_one()
+        finally:
+            if executor is not None:
+                executor.shutdown(cancel_futures=True)
+            if args.copy:
+                await engine.dispose()
+
+    elapsed = time.perf_counter() - started
+    logger.info(
+        f"Scored {scored} reviews in {elapsed:.1f}s "
+        f"({scored / elapsed if elapsed else 0:.0f}/s), skipped {skipped[0]}"
+    )
+    return 0
+
+
+def run(args) -> int:
+    return asyncio.run(_score(args))
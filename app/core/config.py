@@ -20,15 +20,80 @@ class Settings(BaseSettings):
     SECRET_KEY: str = secrets.token_urlsafe(32)
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
+    # Skip JWT verification and user lookups for recently seen tokens and users;
+    # a deactivated user keeps access for at most AUTH_USER_CACHE_TTL seconds
+    AUTH_TOKEN_CACHE_TTL: float = 60.0  # seconds; 0 disables
+    AUTH_TOKEN_CACHE_SIZE: int = 10000
+    AUTH_USER_CACHE_TTL: float = 30.0  # seconds; 0 disables
+    AUTH_USER_CACHE_SIZE: int = 10000
+    BCRYPT_ROUNDS: int = 12  # cost factor for new hashes; existing hashes keep theirs
+    PASSWORD_HASH_WORKERS: int = 2
+    # Concurrent login/register requests allowed per client IP; 0 disables
+    LOGIN_MAX_CONCURRENT_PER_IP: int = 2
+    # Proxies trusted to report the client address in X-Forwarded-For
+    # (comma-separated IPs/CIDRs, or *); otherwise every client behind a
+    # reverse proxy shares the proxy's IP and its login slots. Same variable
+    # uvicorn reads when started from the command line.
+    FORWARDED_ALLOW_IPS: str = "127.0.0.1"
     
     # Database
     DATABASE_URL: PostgresDsn
     REDIS_URL: str = "redis://localhost:6379/0"
+    DB_ECHO: bool = False  # log every SQL statement; independent of DEBUG
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30.0  # seconds to wait for a free connection
+    DB_POOL_RECYCLE: int = 1800  # seconds; -1 keeps connections forever
+    DB_STATEMENT_CACHE_SIZE: int = 100  # prepared statements per connection; 0 behind pgbouncer
+    DB_STATEMENT_TIMEOUT_MS: int = 30000  # 0 disables
+    # Respond before predictions are stored; a background task inserts them in batches
+    PREDICTION_WRITE_BEHIND: bool = False
+    PREDICTION_WRITE_BATCH_SIZE: int = 500
+    PREDICTION_WRITE_MAX_WAIT_MS: float = 200.0
+    PREDICTION_WRITE_QUEUE_SIZE: int = 10000
+    PREDICTION_WRITE_CONCURRENCY: int = 2  # batches inserted at once; keep well below DB_POOL_SIZE
+    # predictions is partitioned by month of created_at
+    PREDICTION_PARTITION_MONTHS_AHEAD: int = 2  # future months kept ready for inserts
+    PREDICTION_RETENTION_MONTHS: int = 0  # remove months older than this; 0 keeps all
+    PREDICTION_RETENTION_MODE: str = "detach"  # detach (keep as a table to archive) or drop
+    PREDICTION_PARTITION_CHECK_INTERVAL: float = 3600  # seconds; 0 checks only at startup
     
     # ML Model
     MODEL_PATH: str = "./models/"
     MODEL_NAME: str = "classifierx.pickle"
+    # pickle, or artifact: a directory written by `python -m app.cli export-model`
+    MODEL_FORMAT: str = "pickle"
+    MODEL_MMAP: bool = True
+    MODEL_VERSION: str = "1.0.0"
+    MODEL_REGISTRY_MAX_VERSIONS: int = 2
+    MODEL_WATCH_INTERVAL: float = 0  # seconds; 0 disables hot-swap on file change
+    FEATURE_BACKEND: str = "compiled"  # compiled (sparse NumPy) or nltk
+    # Predictions below this confidence are flagged for human moderation
+    CONFIDENCE_ABSTAIN_THRESHOLD: Optional[float] = None
     CACHE_TTL: int = 3600
+    PREDICTION_CACHE_ENABLED: bool = True
+    PREDICTION_CACHE_LOCAL_SIZE: int = 10000
+    PREDICTION_CACHE_REDIS_RETRY_AFTER: float = 5.0  # seconds without Redis after an error
+    LEMMA_CACHE_SIZE: int = 300000
+    PREDICTION_BATCH_MAX_SIZE: int = 1000
+    # Streaming endpoints score this many reviews per call and hold at most two batches
+    PREDICTION_STREAM_BATCH_SIZE: int = 64
+    PREDICTION_STREAM_MAX_LINE_BYTES: int = 65536
+
+    # Inference
+    INFERENCE_EXECUTOR: str = "thread"  # inline, thread or process (model held by workers only)
+    INFERENCE_WORKERS: int = 2
+    INFERENCE_MAX_QUEUE: int = 64
+    MICROBATCH_ENABLED: bool = True
+    MICROBATCH_MAX_SIZE: int = 32
+    MICROBATCH_MAX_WAIT_MS: float = 5.0
+
+    # Near-duplicate detection (MinHash-LSH over review shingles)
+    NEAR_DUPLICATE_ENABLED: bool = True
+    NEAR_DUPLICATE_NUM_PERM: int = 64
+    NEAR_DUPLICATE_BANDS: int = 16  # must divide NUM_PERM; more bands find looser matches
+    NEAR_DUPLICATE_THRESHOLD: float = 0.7  # estimated Jaccard similarity to count as a copy
+    NEAR_DUPLICATE_MAX_ENTRIES: int = 100000  # most recent reviews kept; roughly 1 KB each
     
     # CORS
     BACKEND_CORS_ORIGINS: List[str] = ["*"]
@@ -0,0 +1,114 @@
+from prometheus_client import Counter, Gauge, Histogram
+
+# Latency buckets for sub-second request and inference timings
+LATENCY_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10,
+)
+
+HTTP_REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route template",
+    ["method", "route", "status"],
+    buckets=LATENCY_BUCKETS,
+)
+INFERENCE_STAGE_DURATION = Histogram(
+    "inference_stage_duration_seconds",
+    "Time per classifier call spent in each stage of MLService.predict_batch",
+    ["stage", "model_version"],
+    buckets=LATENCY_BUCKETS,
+)
+PREDICTIONS = Counter(
+    "predictions_total",
+    "Predictions served, including cache hits",
+    ["result", "model_version"],
+)
+MODEL_ACTIVE = Gauge(
+    "model_active",
+    "1 for the model version serving predictions, 0 for other loaded versions",
+    ["model_version"],
+)
+CACHE_REQUESTS = Counter(
+    "prediction_cache_requests_total",
+    "Prediction cache lookups by tier and outcome",
+    ["tier", "result"],
+)
+DB_COMMIT_DURATION = Histogram(
+    "db_commit_duration_seconds",
+    "Time to commit a database transaction",
+    buckets=LATENCY_BUCKETS,
+)
+
+MICROBATCH_SIZE = Histogram(
+    "inference_microbatch_size",
+    "Number of single predictions coalesced into one classifier call",
+    buckets=(1, 2, 4, 8, 16, 32, 64, 128, 256),
+)
+MICROBATCH_QUEUE_WAIT = Histogram(
+    "inference_microbatch_queue_wait_seconds",
+    "Time a single prediction waited in the micro-batch queue",
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25),
+)
+
+WRITE_BEHIND_QUEUE_DEPTH = Gauge(
+    "prediction_write_behind_queue_depth",
+    "Prediction records waiting to be inserted",
+)
+WRITE_BEHIND_LAG = Histogram(
+    "prediction_write_behind_lag_seconds",
+    "Time from enqueueing a prediction record to its insert being committed",
+    buckets=(0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30),
+)
+WRITE_BEHIND_BATCH_SIZE = Histogram(
+    "prediction_write_behind_batch_size",
+    "Prediction records inserted per write-behind flush",
+    buckets=(1, 10, 50, 100, 250, 500, 1000, 2500),
+)
+WRITE_BEHIND_DROPPED = Counter(
+    "prediction_write_behind_dropped_total",
+    "Prediction records that were never stored",
+    ["reason"],
+)
+
+DB_POOL_CHECKOUT_WAIT = Histogram(
+    "db_pool_checkout_wait_seconds",
+    "Time spent waiting for a database connection from the pool",
+    buckets=(0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5, 30),
+)
+DB_POOL_CHECKED_OUT = Gauge(
+    "db_pool_connections_in_use",
+    "Database connections currently checked out of the pool",
+)
+DB_POOL_OPEN = Gauge(
+    "db_pool_connections_open",
+    "Database connections currently open, idle or in use",
+)
+DB_POOL_CAPACITY = Gauge(
+    "db_pool_connections_max",
+    "Most connections this process may open (pool size plus overflow)",
+)
+
+NEAR_DUPLICATE_LOOKUPS = Counter(
+    "near_duplicate_lookups_total",
+    "Reviews checked against the near-duplicate index",
+    ["result"],
+)
+NEAR_DUPLICATE_INDEX_SIZE = Gauge(
+    "near_duplicate_index_entries",
+    "Reviews currently held in the near-duplicate index",
+)
+
+AUTH_CACHE_REQUESTS = Counter(
+    "auth_cache_requests_total",
+    "Verified-token and user lookups served from the in-process caches",
+    ["cache", "result"],
+)
+PASSWORD_HASH_DURATION = Histogram(
+    "password_hash_duration_seconds",
+    "Time to hash or verify a password, including waiting for a hashing thread",
+    ["operation"],
+    buckets=(0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+)
+LOGIN_REJECTED = Counter(
+    "auth_requests_rejected_total",
+    "Login and register requests refused because the client had too many in flight",
+)
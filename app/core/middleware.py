@@ -0,0 +1,39 @@
+import time
+
+from app.core.metrics import HTTP_REQUEST_DURATION
+
+
+class MetricsMiddleware:
+    """Records request latency labelled by route template, not raw path.
+
+    Plain ASGI rather than BaseHTTPMiddleware so it adds no extra task or
+    body buffering per request. Requests that match no route share the
+    ``unmatched`` label to keep label cardinality bounded.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+        started = time.perf_counter()
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = scope.get("route")
+            HTTP_REQUEST_DURATION.labels(
+                scope["method"],
+                getattr(route, "path", "unmatched"),
+                str(status),
+            ).observe(time.perf_counter() - started)
@@ -0,0 +1,41 @@
+from contextlib import contextmanager
+from typing import Dict, Hashable, Iterator
+
+
+class TooManyConcurrent(Exception):
+    """Raised when a key already has the maximum number of calls in flight"""
+
+
+class ConcurrencyLimiter:
+    """Caps how many calls per key (e.g. client IP) may run at the same time.
+
+    Unlike a request-rate limit this needs no clock or window: a client
+    may retry as soon as one of its calls finishes. ``max_per_key`` of 0
+    disables the limit.
+    """
+
+    def __init__(self, max_per_key: int):
+        self.max_per_key = max_per_key
+        self._in_flight: Dict[Hashable, int] = {}
+
+    def in_flight(self, key: Hashable) -> int:
+        return self._in_flight.get(key, 0)
+
+    @contextmanager
+    def slot(self, key: Hashable) -> Iterator[None]:
+        if not self.max_per_key:
+            yield
+            return
+        count = self._in_flight.get(key, 0)
+        if count >= self.max_per_key:
+            raise TooManyConcurrent(f"{count} calls already in flight for {key}")
+        self._in_flight[key] = count + 1
+        try:
+            yield
+        finally:
+            remaining = self._in_flight[key] - 1
+            if remaining:
+                self._in_flight[key] = remaining
+            else:
+                # Drop idle keys so the map only holds clients with calls in flight
+                del self._in_flight[key]
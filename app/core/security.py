@@ -1,11 +1,34 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from typing import Any, Union, Optional
 from jose import jwt
 from passlib.context import CryptContext
 
 from app.core.config import settings
+from app.core.metrics import PASSWORD_HASH_DURATION
+from app.core.ttl_cache import TTLCache
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__rounds=settings.BCRYPT_ROUNDS,
+)
+
+# bcrypt releases the GIL, so a few threads hash in parallel without
+# blocking the event loop; excess calls queue here instead of on the CPU
+password_executor = ThreadPoolExecutor(
+    max_workers=settings.PASSWORD_HASH_WORKERS,
+    thread_name_prefix="password-hash",
+)
+
+# Token -> subject for tokens that verified recently; never outlives the token
+token_cache: TTLCache[str] = TTLCache(
+    "token",
+    max_size=settings.AUTH_TOKEN_CACHE_SIZE,
+    ttl=settings.AUTH_TOKEN_CACHE_TTL,
+)
 
 
 def create_access_token(
@@ -32,11 +55,39 @@ def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
 
+async def _run_hash(operation: str, fn, *args):
+    loop = asyncio.get_running_loop()
+    started = time.perf_counter()
+    try:
+        return await loop.run_in_executor(password_executor, fn, *args)
+    finally:
+        PASSWORD_HASH_DURATION.labels(operation).observe(time.perf_counter() - started)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """verify_password on the password-hash executor"""
+    return await _run_hash("verify", verify_password, plain_password, hashed_password)
+
+
+async def get_password_hash_async(password: str) -> str:
+    """get_password_hash on the password-hash executor"""
+    return await _run_hash("hash", get_password_hash, password)
+
+
 def verify_token(token: str) -> Optional[str]:
+    if token_cache.enabled:
+        subject = token_cache.get(token)
+        if subject is not None:
+            return subject
     try:
         payload = jwt.decode(
             token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM]
         )
-        return payload.get("sub")
     except jwt.JWTError:
         return None
+    subject = payload.get("sub")
+    if subject is not None and token_cache.enabled:
+        # Invalid tokens are not cached, so garbage cannot evict real entries
+        expires = payload.get("exp")
+        token_cache.set(token, subject, None if expires is None else expires - time.time())
+    return subject
@@ -0,0 +1,61 @@
+import time
+from collections import OrderedDict
+from typing import Any, Generic, Hashable, Optional, Tuple, TypeVar
+
+from app.core.metrics import AUTH_CACHE_REQUESTS
+
+V = TypeVar("V")
+
+
+class TTLCache(Generic[V]):
+    """Bounded in-process cache whose entries expire after ``ttl`` seconds.
+
+    Entries are kept in insertion order; expired ones are dropped when read
+    and the oldest when the cache is full. ``ttl`` or ``max_size`` of 0
+    disables caching. Not shared between worker processes.
+    """
+
+    def __init__(self, name: str, max_size: int, ttl: float):
+        self.name = name
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries: "OrderedDict[Hashable, Tuple[float, V]]" = OrderedDict()
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl > 0 and self.max_size > 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable) -> Optional[V]:
+        entry = self._entries.get(key)
+        if entry is None:
+            AUTH_CACHE_REQUESTS.labels(self.name, "miss").inc()
+            return None
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            AUTH_CACHE_REQUESTS.labels(self.name, "expired").inc()
+            return None
+        AUTH_CACHE_REQUESTS.labels(self.name, "hit").inc()
+        return value
+
+    def set(self, key: Hashable, value: V, ttl: Optional[float] = None):
+        """Store ``value`` for ``ttl`` seconds, capped at the cache's own TTL"""
+        if not self.enabled:
+            return
+        ttl = self.ttl if ttl is None else min(ttl, self.ttl)
+        if ttl <= 0:
+            return
+        self._entries.pop(key, None)
+        self._entries[key] = (time.monotonic() + ttl, value)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def pop(self, key: Hashable) -> Any:
+        entry = self._entries.pop(key, None)
+        return None if entry is None else entry[1]
+
+    def clear(self):
+        self._entries.clear()
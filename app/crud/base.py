@@ -1,20 +1,48 @@
-from typing import Any, Dict, Generic, List, Optional, Type, TypeVar, Union
+import base64
+import json
+import uuid
+from datetime import datetime
+from typing import Any, Dict, Generic, List, Optional, Tuple, Type, TypeVar, Union
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func
+from sqlalchemy import Select, select, func, text, tuple_
 from sqlalchemy.orm import selectinload
 from pydantic import BaseModel
 
+from app.core.metrics import DB_COMMIT_DURATION
 from app.db.base import Base
 
 ModelType = TypeVar("ModelType", bound=Base)
 CreateSchemaType = TypeVar("CreateSchemaType", bound=BaseModel)
 UpdateSchemaType = TypeVar("UpdateSchemaType", bound=BaseModel)
 
+# Position of the last row of a page: (created_at, id)
+Cursor = Tuple[datetime, uuid.UUID]
+
+
+def encode_cursor(created_at: datetime, id: Any) -> str:
+    """Opaque page token pointing just past the given row"""
+    raw = f"{created_at.isoformat()}|{id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(token: str) -> Cursor:
+    """Parse a page token, raising ValueError if it is malformed"""
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4)).decode()
+        created_at, id = raw.split("|", 1)
+        return datetime.fromisoformat(created_at), uuid.UUID(id)
+    except (ValueError, UnicodeDecodeError) as e:
+        raise ValueError("Invalid cursor") from e
+
 
 class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
     def __init__(self, model: Type[ModelType]):
         self.model = model
 
+    async def _commit(self, db: AsyncSession):
+        with DB_COMMIT_DURATION.time():
+            await db.commit()
+
     async def get(self, db: AsyncSession, id: Any) -> Optional[ModelType]:
         statement = select(self.model).where(self.model.id == id)
         result = await db.execute(statement)
@@ -27,20 +55,40 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         skip: int = 0,
         limit: int = 100,
         user_id: Optional[str] = None,
+        after: Optional[Cursor] = None,
     ) -> List[ModelType]:
         statement = select(self.model)
         
         if user_id:
             statement = statement.where(self.model.user_id == user_id)
         
-        statement = statement.offset(skip).limit(limit).order_by(self.model.created_at.desc())
+        statement = self._paginate(statement, skip=skip, limit=limit, after=after)
         result = await db.execute(statement)
         return result.scalars().all()
 
+    def _paginate(
+        self,
+        statement: Select,
+        *,
+        skip: int,
+        limit: int,
+        after: Optional[Cursor],
+    ) -> Select:
+        """Newest first; with ``after`` seek past that row instead of OFFSET"""
+        if after is not None:
+            statement = statement.where(
+                tuple_(self.model.created_at, self.model.id) < tuple_(*after)
+            )
+        else:
+            statement = statement.offset(skip)
+        return statement.order_by(
+            self.model.created_at.desc(), self.model.id.desc()
+        ).limit(limit)
+
     async def create(self, db: AsyncSession, *, obj_in: CreateSchemaType) -> ModelType:
         db_obj = self.model(**obj_in.model_dump())
         db.add(db_obj)
-        await db.commit()
+        await self._commit(db)
         await db.refresh(db_obj)
         return db_obj
 
@@ -60,7 +108,7 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
             setattr(db_obj, field, value)
         
         db.add(db_obj)
-        await db.commit()
+        await self._commit(db)
         await db.refresh(db_obj)
         return db_obj
 
@@ -71,7 +119,7 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         
         if obj:
             await db.delete(obj)
-            await db.commit()
+            await self._commit(db)
         return obj
 
     async def count(
@@ -87,3 +135,22 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         
         result = await db.execute(statement)
         return result.scalar()
+
+    async def estimate_count(
+        self,
+        db: AsyncSession,
+        *,
+        user_id: Optional[str] = None,
+    ) -> int:
+        """Row count estimated by the query planner, without scanning the table"""
+        query = f"EXPLAIN (FORMAT JSON) SELECT 1 FROM {self.model.__tablename__}"
+        params = {}
+        if user_id:
+            query += " WHERE user_id = :user_id"
+            params["user_id"] = user_id
+
+        result = await db.execute(text(query), params)
+        plan = result.scalar()
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return int(plan[0]["Plan"]["Plan Rows"])
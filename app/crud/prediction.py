@@ -1,9 +1,15 @@
-from typing import List, Optional
+import uuid
+from datetime import date, datetime, time, timedelta
+from types import SimpleNamespace
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, and_
+from sqlalchemy import select, func, and_, insert, delete, text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 
-from app.crud.base import CRUDBase
+from app.crud.base import CRUDBase, Cursor
 from app.models.prediction import Prediction
+from app.models.prediction_stat import ANONYMOUS_USER_ID, PredictionStat
+from app.models.review import SEARCH_CONFIG, Review, review_hash
 from app.api.v1.schemas.prediction import PredictionCreate, PredictionUpdate
 
 
@@ -15,42 +21,99 @@ class CRUDPrediction(CRUDBase[Prediction, PredictionCreate, PredictionUpdate]):
         user_id: str,
         skip: int = 0,
         limit: int = 100,
+        after: Optional[Cursor] = None,
     ) -> List[Prediction]:
-        statement = (
-            select(Prediction)
-            .where(Prediction.user_id == user_id)
-            .offset(skip)
-            .limit(limit)
-            .order_by(Prediction.created_at.desc())
+        # Served by ix_predictions_user_id_created_at
+        statement = self._paginate(
+            select(Prediction).where(Prediction.user_id == user_id),
+            skip=skip,
+            limit=limit,
+            after=after,
         )
         result = await db.execute(statement)
         return result.scalars().all()
 
+    async def search(
+        self,
+        db: AsyncSession,
+        *,
+        query: Optional[str] = None,
+        category: Optional[str] = None,
+        prediction_result: Optional[str] = None,
+        min_rating: Optional[int] = None,
+        max_rating: Optional[int] = None,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
+        limit: int = 50,
+        after: Optional[Cursor] = None,
+    ) -> List[Prediction]:
+        """Filter all predictions, newest first.
+
+        ``query`` uses web search syntax (words, "quoted phrases", -excluded)
+        against ix_reviews_review_text_tsv, then follows ix_predictions_review_hash
+        to the predictions of each matching text; category and result filters
+        walk their (column, created_at) indexes in order.
+        """
+        statement = select(Prediction)
+        if query:
+            statement = statement.join(Review, Review.hash == Prediction.review_hash).where(
+                func.to_tsvector(SEARCH_CONFIG, Review.review_text).op("@@")(
+                    func.websearch_to_tsquery(SEARCH_CONFIG, query)
+                )
+            )
+        if category:
+            statement = statement.where(Prediction.category == category)
+        if prediction_result:
+            statement = statement.where(Prediction.prediction_result == prediction_result)
+        if min_rating is not None:
+            statement = statement.where(Prediction.rating >= min_rating)
+        if max_rating is not None:
+            statement = statement.where(Prediction.rating <= max_rating)
+        # Half-open range on the raw column so the created_at indexes apply
+        if start_date:
+            statement = statement.where(
+                Prediction.created_at >= datetime.combine(start_date, time.min)
+            )
+        if end_date:
+            statement = statement.where(
+                Prediction.created_at < datetime.combine(end_date + timedelta(days=1), time.min)
+            )
+
+        statement = self._paginate(statement, skip=0, limit=limit, after=after)
+        result = await db.execute(statement)
+        return result.scalars().all()
+
     async def get_stats(
         self,
         db: AsyncSession,
         *,
         user_id: Optional[str] = None,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
+        category: Optional[str] = None,
+        model_version: Optional[str] = None,
     ) -> dict:
+        """Sum the prediction_stats rollup instead of scanning predictions"""
         statement = select(
-            func.count(Prediction.id).label("total"),
-            func.sum(
-                func.case(
-                    (Prediction.prediction_result == "real", 1),
-                    else_=0,
-                )
-            ).label("real_count"),
-            func.sum(
-                func.case(
-                    (Prediction.prediction_result == "fake", 1),
-                    else_=0,
-                )
-            ).label("fake_count"),
-            func.avg(Prediction.confidence_score).label("avg_confidence"),
+            func.sum(PredictionStat.total).label("total"),
+            func.sum(PredictionStat.real_count).label("real_count"),
+            func.sum(PredictionStat.fake_count).label("fake_count"),
+            (
+                func.sum(PredictionStat.confidence_sum)
+                / func.nullif(func.sum(PredictionStat.confidence_count), 0)
+            ).label("avg_confidence"),
         )
 
         if user_id:
-            statement = statement.where(Prediction.user_id == user_id)
+            statement = statement.where(PredictionStat.user_id == user_id)
+        if start_date:
+            statement = statement.where(PredictionStat.day >= start_date)
+        if end_date:
+            statement = statement.where(PredictionStat.day <= end_date)
+        if category:
+            statement = statement.where(PredictionStat.category == category)
+        if model_version:
+            statement = statement.where(PredictionStat.model_version == model_version)
 
         result = await db.execute(statement)
         row = result.one()
@@ -62,21 +125,245 @@ class CRUDPrediction(CRUDBase[Prediction, PredictionCreate, PredictionUpdate]):
             "average_confidence": float(row.avg_confidence) if row.avg_confidence else None,
         }
 
+    async def _record_stats(self, db: AsyncSession, predictions: Iterable[Prediction]):
+        """Add flushed predictions to the rollup inside the caller's transaction"""
+        rows: Dict[tuple, dict] = {}
+        for prediction in predictions:
+            key = (
+                prediction.user_id or ANONYMOUS_USER_ID,
+                prediction.created_at.date(),
+                prediction.category,
+                prediction.model_version or "",
+            )
+            row = rows.get(key)
+            if row is None:
+                row = rows[key] = {
+                    "user_id": key[0],
+                    "day": key[1],
+                    "category": key[2],
+                    "model_version": key[3],
+                    "total": 0,
+                    "real_count": 0,
+                    "fake_count": 0,
+                    "confidence_sum": 0.0,
+                    "confidence_count": 0,
+                }
+            row["total"] += 1
+            if prediction.prediction_result == "real":
+                row["real_count"] += 1
+            elif prediction.prediction_result == "fake":
+                row["fake_count"] += 1
+            if prediction.confidence_score is not None:
+                row["confidence_sum"] += prediction.confidence_score
+                row["confidence_count"] += 1
+        if not rows:
+            return
+
+        # Upsert in key order so concurrent batches lock rows in the same order
+        statement = pg_insert(PredictionStat).values(
+            [rows[key] for key in sorted(rows, key=str)]
+        )
+        excluded = statement.excluded
+        statement = statement.on_conflict_do_update(
+            index_elements=[
+                PredictionStat.user_id,
+                PredictionStat.day,
+                PredictionStat.category,
+                PredictionStat.model_version,
+            ],
+            set_={
+                "total": PredictionStat.total + excluded.total,
+                "real_count": PredictionStat.real_count + excluded.real_count,
+                "fake_count": PredictionStat.fake_count + excluded.fake_count,
+                "confidence_sum": PredictionStat.confidence_sum + excluded.confidence_sum,
+                "confidence_count": PredictionStat.confidence_count + excluded.confidence_count,
+            },
+        )
+        await db.execute(statement)
+
+    async def rebuild_stats(self, db: AsyncSession) -> int:
+        """Recompute the rollup from predictions; returns the number of rows.
+
+        Only days still held in predictions are replaced, so totals for
+        partitions removed by retention survive a rebuild.
+        """
+        # Block concurrent upserts so no insert is counted twice or lost
+        await db.execute(text(f"LOCK TABLE {PredictionStat.__tablename__} IN EXCLUSIVE MODE"))
+        first_day = select(func.min(func.date(Prediction.created_at))).scalar_subquery()
+        await db.execute(delete(PredictionStat).where(PredictionStat.day >= first_day))
+
+        user_id = func.coalesce(Prediction.user_id, ANONYMOUS_USER_ID)
+        day = func.date(Prediction.created_at)
+        model_version = func.coalesce(Prediction.model_version, "")
+        source = select(
+            user_id,
+            day,
+            Prediction.category,
+            model_version,
+            func.count(),
+            func.count().filter(Prediction.prediction_result == "real"),
+            func.count().filter(Prediction.prediction_result == "fake"),
+            func.coalesce(func.sum(Prediction.confidence_score), 0.0),
+            func.count(Prediction.confidence_score),
+        ).group_by(user_id, day, Prediction.category, model_version)
+        result = await db.execute(
+            insert(PredictionStat).from_select(
+                [
+                    "user_id",
+                    "day",
+                    "category",
+                    "model_version",
+                    "total",
+                    "real_count",
+                    "fake_count",
+                    "confidence_sum",
+                    "confidence_count",
+                ],
+                source,
+            )
+        )
+        await self._commit(db)
+        return result.rowcount
+
+    async def update(
+        self,
+        db: AsyncSession,
+        *,
+        db_obj: Prediction,
+        obj_in: Union[PredictionUpdate, Dict[str, Any]],
+    ) -> Prediction:
+        # review_text is a read-only view of the shared reviews row; setting
+        # it would be silently discarded
+        if isinstance(obj_in, dict) and "review_text" in obj_in:
+            raise ValueError("review_text cannot be updated")
+        return await super().update(db, db_obj=db_obj, obj_in=obj_in)
+
     async def create_with_user(
         self,
         db: AsyncSession,
         *,
         obj_in: PredictionCreate,
         user_id: Optional[str] = None,
+        prediction_result: Optional[str] = None,
+        confidence_score: Optional[float] = None,
+        model_version: Optional[str] = None,
     ) -> Prediction:
+        hashes = await self._store_reviews(db, [obj_in.review_text])
         db_obj = Prediction(
-            **obj_in.model_dump(),
+            **obj_in.model_dump(exclude={"review_text"}),
+            review_hash=hashes[0],
             user_id=user_id,
+            prediction_result=prediction_result,
+            confidence_score=confidence_score,
+            model_version=model_version,
         )
         db.add(db_obj)
-        await db.commit()
+        await db.flush()
+        await self._record_stats(db, [db_obj])
+        await self._commit(db)
         await db.refresh(db_obj)
         return db_obj
 
+    def build_row(
+        self,
+        obj_in: PredictionCreate,
+        *,
+        user_id: Optional[str] = None,
+        prediction_result: str,
+        confidence_score: Optional[float] = None,
+        model_version: Optional[str] = None,
+    ) -> dict:
+        """Column values for a new prediction, including its id and created_at"""
+        return {
+            "id": uuid.uuid4(),
+            **obj_in.model_dump(),
+            "user_id": user_id,
+            "prediction_result": prediction_result,
+            "confidence_score": confidence_score,
+            # The ORM would store the column default for None, and COPY would
+            # not; fill it here so the row, its stats and the response agree
+            "model_version": (
+                model_version if model_version is not None else Prediction.model_version.default.arg
+            ),
+            "created_at": datetime.utcnow(),
+        }
+
+    async def create_many_with_user(
+        self,
+        db: AsyncSession,
+        *,
+        objs_in: List[PredictionCreate],
+        results: List[Tuple[str, Optional[float], str]],
+        user_id: Optional[str] = None,
+    ) -> List[dict]:
+        """Insert a batch of scored reviews in one multi-row INSERT; returns the rows"""
+        rows = [
+            self.build_row(
+                obj_in,
+                user_id=user_id,
+                prediction_result=result,
+                confidence_score=confidence,
+                model_version=model_version,
+            )
+            for obj_in, (result, confidence, model_version) in zip(objs_in, results)
+        ]
+        await self.insert_rows(db, rows=rows)
+        return rows
+
+    async def _store_reviews(self, db: AsyncSession, review_texts: Iterable[str]) -> List[bytes]:
+        """Insert texts not yet in reviews; returns the hash of each text"""
+        review_texts = list(review_texts)
+        hashes = [review_hash(review_text) for review_text in review_texts]
+        # Repeats are sent once, and in hash order so concurrent batches lock
+        # rows in the same order and cannot deadlock
+        distinct = dict(sorted(zip(hashes, review_texts)))
+        if distinct:
+            await db.execute(
+                pg_insert(Review)
+                .values([
+                    {"hash": review_hash_, "review_text": review_text}
+                    for review_hash_, review_text in distinct.items()
+                ])
+                .on_conflict_do_nothing(index_elements=[Review.hash])
+            )
+        return hashes
+
+    def _prediction_values(self, rows: List[dict], hashes: List[bytes]) -> List[dict]:
+        """build_row output as predictions columns: the text replaced by its hash"""
+        return [
+            {
+                **{column: value for column, value in row.items() if column != "review_text"},
+                "review_hash": review_hash_,
+            }
+            for row, review_hash_ in zip(rows, hashes)
+        ]
+
+    async def insert_rows(self, db: AsyncSession, *, rows: List[dict]):
+        """Insert rows from build_row without reading them back."""
+        if not rows:
+            return
+        hashes = await self._store_reviews(db, [row["review_text"] for row in rows])
+        await db.execute(insert(Prediction), self._prediction_values(rows, hashes))
+        await self._record_stats(db, [SimpleNamespace(**row) for row in rows])
+        await self._commit(db)
+
+    async def copy_rows(self, db: AsyncSession, *, rows: List[dict]):
+        """Bulk-load rows from build_row with COPY, for offline backfills."""
+        if not rows:
+            return
+        # Upsert the rollup and texts first so the COPY runs inside the same transaction
+        await self._record_stats(db, [SimpleNamespace(**row) for row in rows])
+        hashes = await self._store_reviews(db, [row["review_text"] for row in rows])
+        values = self._prediction_values(rows, hashes)
+        connection = await db.connection()
+        raw = await connection.get_raw_connection()
+        columns = list(values[0])
+        await raw.driver_connection.copy_records_to_table(
+            Prediction.__tablename__,
+            records=[tuple(row[column] for column in columns) for row in values],
+            columns=columns,
+        )
+        await self._commit(db)
+
 
 prediction = CRUDPrediction(Prediction)
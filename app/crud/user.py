@@ -1,27 +1,83 @@
-from typing import Optional
+import uuid
+from typing import Any, Dict, NamedTuple, Optional, Union
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 
+from app.core.config import settings
+from app.core.ttl_cache import TTLCache
 from app.crud.base import CRUDBase
 from app.models.user import User
 from app.api.v1.schemas.user import UserCreate, UserUpdate
 
 
+class UserIdentity(NamedTuple):
+    """The fields authorization checks need, cheap to cache across requests"""
+
+    id: uuid.UUID
+    email: str
+    is_active: bool
+    is_superuser: bool
+
+
+# Email -> UserIdentity; unknown emails are not cached so a new user can log in at once
+identity_cache: TTLCache[UserIdentity] = TTLCache(
+    "user",
+    max_size=settings.AUTH_USER_CACHE_SIZE,
+    ttl=settings.AUTH_USER_CACHE_TTL,
+)
+
+
 class CRUDUser(CRUDBase[User, UserCreate, UserUpdate]):
     async def get_by_email(self, db: AsyncSession, *, email: str) -> Optional[User]:
         statement = select(User).where(User.email == email)
         result = await db.execute(statement)
         return result.scalar_one_or_none()
 
+    async def get_identity_by_email(
+        self, db: AsyncSession, *, email: str
+    ) -> Optional[UserIdentity]:
+        """Id and permission flags for ``email``, cached for AUTH_USER_CACHE_TTL"""
+        identity = identity_cache.get(email) if identity_cache.enabled else None
+        if identity is not None:
+            return identity
+        statement = select(
+            User.id, User.email, User.is_active, User.is_superuser
+        ).where(User.email == email)
+        row = (await db.execute(statement)).one_or_none()
+        if row is None:
+            return None
+        identity = UserIdentity(row.id, row.email, bool(row.is_active), bool(row.is_superuser))
+        identity_cache.set(email, identity)
+        return identity
+
+    async def update(
+        self,
+        db: AsyncSession,
+        *,
+        db_obj: User,
+        obj_in: Union[UserUpdate, Dict[str, Any]],
+    ) -> User:
+        # Flags or the email may change; drop the cached identity under both emails
+        identity_cache.pop(db_obj.email)
+        db_obj = await super().update(db, db_obj=db_obj, obj_in=obj_in)
+        identity_cache.pop(db_obj.email)
+        return db_obj
+
+    async def remove(self, db: AsyncSession, *, id: Any) -> Optional[User]:
+        obj = await super().remove(db, id=id)
+        if obj is not None:
+            identity_cache.pop(obj.email)
+        return obj
+
     async def create(self, db: AsyncSession, *, obj_in: UserCreate) -> User:
-        from app.core.security import get_password_hash
+        from app.core.security import get_password_hash_async
         
         db_obj = User(
             email=obj_in.email,
-            hashed_password=get_password_hash(obj_in.password),
+            hashed_password=await get_password_hash_async(obj_in.password),
         )
         db.add(db_obj)
-        await db.commit()
+        await self._commit(db)
         await db.refresh(db_obj)
         return db_obj
 
@@ -31,8 +87,8 @@ class CRUDUser(CRUDBase[User, UserCreate, UserUpdate]):
         user = await self.get_by_email(db, email=email)
         if not user:
             return None
-        from app.core.security import verify_password
-        if not verify_password(password, user.hashed_password):
+        from app.core.security import verify_password_async
+        if not await verify_password_async(password, user.hashed_password):
             return None
         return user
 
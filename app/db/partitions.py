@@ -0,0 +1,183 @@
+import asyncio
+import logging
+import re
+from datetime import date, datetime
+from typing import List, NamedTuple, Optional
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from app.core.config import settings
+from app.db.session import engine
+
+logger = logging.getLogger(__name__)
+
+PARENT = "predictions"
+RETENTION_MODES = ("detach", "drop")
+
+# Serializes maintenance across API workers and the CLI
+_ADVISORY_LOCK = 0x70726564  # "pred"
+
+_BOUND = re.compile(r"FROM \((.+?)\) TO \((.+?)\)")
+
+
+class Partition(NamedTuple):
+    name: str
+    start: Optional[date]  # None for MINVALUE
+    end: Optional[date]  # None for MAXVALUE
+
+
+def partition_name(month: date) -> str:
+    return f"{PARENT}_y{month.year:04d}m{month.month:02d}"
+
+
+def add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def _parse_bound(value: str) -> Optional[date]:
+    value = value.strip().strip("'")
+    if value in ("MINVALUE", "MAXVALUE"):
+        return None
+    return datetime.fromisoformat(value).date()
+
+
+async def is_partitioned(conn: AsyncConnection) -> bool:
+    relkind = await conn.scalar(
+        text("SELECT relkind FROM pg_class WHERE oid = to_regclass(:name)"),
+        {"name": PARENT},
+    )
+    return relkind == "p"
+
+
+async def list_partitions(conn: AsyncConnection) -> List[Partition]:
+    """Attached range partitions of predictions, oldest first"""
+    result = await conn.execute(
+        text(
+            "SELECT c.relname, pg_get_expr(c.relpartbound, c.oid) "
+            "FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+            "WHERE i.inhparent = to_regclass(:name)"
+        ),
+        {"name": PARENT},
+    )
+    partitions = []
+    for name, bound in result:
+        match = _BOUND.search(bound or "")
+        if match is None:
+            continue  # DEFAULT partition
+        partitions.append(Partition(name, _parse_bound(match[1]), _parse_bound(match[2])))
+    return sorted(partitions, key=lambda p: (p.start is not None, p.start or date.min))
+
+
+async def ensure_partitions(
+    conn: AsyncConnection, *, months_ahead: int, today: Optional[date] = None
+) -> List[str]:
+    """Create monthly partitions from this month through ``months_ahead``"""
+    existing = await list_partitions(conn)
+    month = (today or datetime.utcnow().date()).replace(day=1)
+    created = []
+    for offset in range(months_ahead + 1):
+        start, end = add_months(month, offset), add_months(month, offset + 1)
+        # Skip months already covered, e.g. by a wider partition from a migration
+        if any(
+            (p.start is None or p.start < end) and (p.end is None or p.end > start)
+            for p in existing
+        ):
+            continue
+        name = partition_name(start)
+        await conn.execute(text(
+            f"CREATE TABLE {name} PARTITION OF {PARENT} "
+            f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+        ))
+        created.append(name)
+    return created
+
+
+async def apply_retention(
+    conn: AsyncConnection,
+    *,
+    retention_months: int,
+    mode: str,
+    today: Optional[date] = None,
+) -> List[str]:
+    """Detach (or drop) partitions wholly older than ``retention_months``.
+
+    Only whole months go: a partition is kept while any of its rows are
+    inside the window. Detached partitions become ordinary tables that can
+    be archived with pg_dump and dropped later.
+    """
+    if mode not in RETENTION_MODES:
+        raise ValueError(f"Unknown retention mode {mode!r}, expected one of {RETENTION_MODES}")
+    if retention_months <= 0:
+        return []
+    cutoff = add_months((today or datetime.utcnow().date()).replace(day=1), -retention_months)
+    removed = []
+    for partition in await list_partitions(conn):
+        if partition.end is None or partition.end > cutoff:
+            continue
+        await conn.execute(text(f"ALTER TABLE {PARENT} DETACH PARTITION {partition.name}"))
+        if mode == "drop":
+            await conn.execute(text(f"DROP TABLE {partition.name}"))
+        removed.append(partition.name)
+    return removed
+
+
+async def prune_reviews(
+    conn: AsyncConnection, *, retention_months: int, today: Optional[date] = None
+) -> int:
+    """Delete review texts first stored before the retention window that no
+    prediction references any more; returns the number deleted.
+
+    Fails with a foreign key error while a detached partition that still
+    references them exists: archive and drop those first. An insert that
+    reuses a text while it is being deleted fails the same way, so run this
+    when traffic is low.
+    """
+    if retention_months <= 0:
+        return 0
+    cutoff = add_months((today or datetime.utcnow().date()).replace(day=1), -retention_months)
+    result = await conn.execute(
+        text(
+            f"DELETE FROM reviews r WHERE r.created_at < :cutoff AND NOT EXISTS "
+            f"(SELECT 1 FROM {PARENT} p WHERE p.review_hash = r.hash)"
+        ),
+        {"cutoff": cutoff},
+    )
+    return result.rowcount
+
+
+async def maintain(
+    conn: AsyncConnection,
+    *,
+    months_ahead: int = settings.PREDICTION_PARTITION_MONTHS_AHEAD,
+    retention_months: int = settings.PREDICTION_RETENTION_MONTHS,
+    mode: str = settings.PREDICTION_RETENTION_MODE,
+) -> tuple:
+    """Create upcoming partitions and apply retention; returns (created, removed)"""
+    if not await is_partitioned(conn):
+        logger.warning(f"{PARENT} is not partitioned; run `alembic upgrade head`")
+        return [], []
+    await conn.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": _ADVISORY_LOCK})
+    # Creating and detaching partitions lock predictions briefly; give up
+    # rather than stall inserts queued behind a long query, and retry later
+    await conn.execute(text("SET LOCAL lock_timeout = '5s'"))
+    created = await ensure_partitions(conn, months_ahead=months_ahead)
+    removed = await apply_retention(conn, retention_months=retention_months, mode=mode)
+    if created or removed:
+        logger.info(
+            f"Partition maintenance: created {created or 'none'}, "
+            f"{'dropped' if mode == 'drop' else 'detached'} {removed or 'none'}"
+        )
+    return created, removed
+
+
+async def run_maintenance(interval: float):
+    """Keep partitions ahead of the clock and enforce retention every ``interval`` seconds"""
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            async with engine.begin() as conn:
+                await maintain(conn)
+        except Exception as e:
+            logger.error(f"Partition maintenance failed: {str(e)}")
@@ -1,14 +1,51 @@
+import time
+
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 
 from app.core.config import settings
+from app.core.metrics import (
+    DB_POOL_CAPACITY,
+    DB_POOL_CHECKED_OUT,
+    DB_POOL_CHECKOUT_WAIT,
+    DB_POOL_OPEN,
+)
+
+
+class InstrumentedPool(AsyncAdaptedQueuePool):
+    """Queue pool that records how long each checkout waited"""
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            DB_POOL_CHECKOUT_WAIT.observe(time.perf_counter() - started)
+
+
+connect_args = {"prepared_statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE}
+if settings.DB_STATEMENT_TIMEOUT_MS > 0:
+    connect_args["server_settings"] = {
+        "statement_timeout": str(settings.DB_STATEMENT_TIMEOUT_MS)
+    }
 
 engine = create_async_engine(
     str(settings.DATABASE_URL),
-    echo=settings.DEBUG,
+    echo=settings.DB_ECHO,
     pool_pre_ping=True,
+    poolclass=InstrumentedPool,
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
+    pool_timeout=settings.DB_POOL_TIMEOUT,
+    pool_recycle=settings.DB_POOL_RECYCLE,
+    connect_args=connect_args,
 )
 
+DB_POOL_CHECKED_OUT.set_function(lambda: engine.pool.checkedout())
+DB_POOL_OPEN.set_function(lambda: engine.pool.checkedin() + engine.pool.checkedout())
+DB_POOL_CAPACITY.set(settings.DB_POOL_SIZE + max(settings.DB_MAX_OVERFLOW, 0))
+
 AsyncSessionLocal = sessionmaker(
     engine,
     class_=AsyncSession,
@@ -1,18 +1,57 @@
-from fastapi import FastAPI, Depends
+import asyncio
+import logging
+import time
+
+from fastapi import FastAPI, Depends, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi import Request, Form
-from fastapi.responses import HTMLResponse
+from fastapi.responses import HTMLResponse, Response
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
 from contextlib import asynccontextmanager
+from datetime import datetime
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app import IMPORT_STARTED
 from app.core.config import settings
-from app.api.v1.endpoints import auth, predictions, health
+from app.core.security import password_executor
+from app.core.middleware import MetricsMiddleware
+from app.api.v1.endpoints import auth, predictions, health, ml_models
 from app.api.v1.schemas.prediction import PredictionCreate
 from app.crud import prediction as crud_prediction
 from app.api import deps
+from app.db import partitions
 from app.db.base import Base
 from app.db.session import engine
-from app.services.ml_service import ml_service
+from app.services.batcher import micro_batcher
+from app.services.cache import prediction_cache
+from app.services.inference import inference_executor, InferenceQueueFull
+from app.services.ml_service import ModelNotReady, ml_service
+from app.services.model_registry import model_registry
+from app.services.near_duplicates import near_duplicate_index
+from app.services.prediction_writer import prediction_writer
+from app.services.scoring import score_review
+
+ml_service.startup_timings["import"] = time.perf_counter() - IMPORT_STARTED
+
+logger = logging.getLogger(__name__)
+
+
+async def load_model(started_at: datetime):
+    """Load and warm up the model without blocking the event loop."""
+    try:
+        await asyncio.to_thread(ml_service.load, not inference_executor.models_in_workers)
+        await inference_executor.warm_up()
+    except Exception as e:
+        logger.error(f"Model startup failed: {str(e)}")
+        return
+
+    if settings.NEAR_DUPLICATE_ENABLED:
+        # Predictions stored from now on are indexed as they are created;
+        # build slots the older ones in behind them
+        try:
+            await near_duplicate_index.build(before=started_at)
+        except Exception as e:
+            logger.error(f"Near-duplicate index build failed: {str(e)}")
 
 
 @asynccontextmanager
@@ -21,8 +60,38 @@ async def lifespan(app: FastAPI):
     # Startup
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
+        # Inserts fail without a partition for the current month
+        await partitions.maintain(conn)
+    inference_executor.start()
+    if settings.MICROBATCH_ENABLED:
+        micro_batcher.start()
+    if settings.PREDICTION_WRITE_BEHIND:
+        prediction_writer.start()
+    # Readiness reports false until the model has loaded and warmed up
+    model_loader = asyncio.create_task(load_model(datetime.utcnow()))
+    model_watcher = None
+    if settings.MODEL_WATCH_INTERVAL > 0:
+        model_watcher = asyncio.create_task(
+            model_registry.watch(settings.MODEL_WATCH_INTERVAL)
+        )
+    partition_maintainer = None
+    if settings.PREDICTION_PARTITION_CHECK_INTERVAL > 0:
+        partition_maintainer = asyncio.create_task(
+            partitions.run_maintenance(settings.PREDICTION_PARTITION_CHECK_INTERVAL)
+        )
     yield
     # Shutdown
+    if model_watcher is not None:
+        model_watcher.cancel()
+    if partition_maintainer is not None:
+        partition_maintainer.cancel()
+    await model_loader
+    await micro_batcher.stop()
+    inference_executor.shutdown()
+    password_executor.shutdown(wait=False, cancel_futures=True)
+    # Store queued predictions before the engine goes away
+    await prediction_writer.stop()
+    await prediction_cache.close()
     await engine.dispose()
 
 
@@ -33,6 +102,8 @@ app = FastAPI(
     lifespan=lifespan,
 )
 
+app.add_middleware(MetricsMiddleware)
+
 # CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -53,6 +124,11 @@ app.include_router(
     prefix=f"{settings.API_V1_STR}/predictions",
     tags=["predictions"],
 )
+app.include_router(
+    ml_models.router,
+    prefix=f"{settings.API_V1_STR}/models",
+    tags=["models"],
+)
 app.include_router(
     health.router,
     prefix=f"{settings.API_V1_STR}/health",
@@ -73,39 +149,49 @@ async def predict_frontend(
     """Handle frontend prediction form submission and save to database."""
     try:
         # Make prediction using ML service
-        result, confidence = ml_service.predict(
+        result, confidence, model_version = await score_review(
             review_text=news,
             rating=rating,
             verified_purchase=verified_options == "Y",
             category=category_options,
         )
         
-        # Create prediction object for database with all data
-        from app.models.prediction import Prediction
-        import uuid
-        from datetime import datetime
-        
-        saved_prediction = Prediction(
-            id=uuid.uuid4(),
-            user_id=None,  # Anonymous frontend submission
+        # Save to database (anonymous frontend submission)
+        prediction_in = PredictionCreate(
             review_text=news,
             rating=rating,
             verified_purchase=verified_options == "Y",
             category=category_options,
-            prediction_result=result,
-            confidence_score=confidence,
-            model_version="1.0.0",
-            created_at=datetime.utcnow()
         )
-        
-        # Save to database
-        db.add(saved_prediction)
-        await db.commit()
-        await db.refresh(saved_prediction)
+        if prediction_writer.running:
+            row = crud_prediction.build_row(
+                prediction_in,
+                prediction_result=result,
+                confidence_score=confidence,
+                model_version=model_version,
+            )
+            prediction_writer.submit([row])
+            prediction_id = row["id"]
+        else:
+            prediction = await crud_prediction.create_with_user(
+                db,
+                obj_in=prediction_in,
+                user_id=None,
+                prediction_result=result,
+                confidence_score=confidence,
+                model_version=model_version,
+            )
+            prediction_id = prediction.id
+        if settings.NEAR_DUPLICATE_ENABLED:
+            await near_duplicate_index.add_many([prediction_id], [news])
         
         # Return simple HTML response for Next.js frontend
         return f"Review is {result.title()}"
         
+    except (InferenceQueueFull, ModelNotReady) as e:
+        raise HTTPException(
+            status_code=503, detail=str(e), headers={"Retry-After": "1"}
+        )
     except Exception as e:
         return f"Error: {str(e)}"
 
@@ -117,6 +203,12 @@ async def api_root():
     return {"message": "Fake Review Detection API", "version": settings.VERSION}
 
 
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus metrics endpoint."""
+    return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
+
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(
@@ -124,4 +216,6 @@ if __name__ == "__main__":
         host=settings.HOST,
         port=settings.PORT,
         reload=settings.DEBUG,
+        proxy_headers=True,
+        forwarded_allow_ips=settings.FORWARDED_ALLOW_IPS,
     )
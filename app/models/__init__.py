@@ -1,4 +1,6 @@
 from app.models.user import User
+from app.models.review import Review
 from app.models.prediction import Prediction
+from app.models.prediction_stat import PredictionStat
 
-__all__ = ["User", "Prediction"]
+__all__ = ["User", "Review", "Prediction", "PredictionStat"]
@@ -6,37 +6,76 @@ from sqlalchemy import (
     Float,
     ForeignKey,
     Integer,
+    LargeBinary,
     String,
-    Text,
     Boolean,
+    Index,
+    select,
 )
 from sqlalchemy.dialects.postgresql import UUID
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import column_property, relationship
 
 from app.db.base import Base
+from app.models.review import Review
 
 
 class Prediction(Base):
     __tablename__ = "predictions"
 
+    # The primary key includes created_at because predictions is partitioned
+    # by it (see app/db/partitions.py); lookups by id alone still use it
     id = Column(
         UUID(as_uuid=True),
         primary_key=True,
         default=uuid.uuid4,
-        index=True,
     )
     user_id = Column(
         UUID(as_uuid=True),
         ForeignKey("users.id"),
         nullable=True,
     )
-    review_text = Column(Text, nullable=False)
+    # Text lives once per distinct review in reviews; see models/review.py
+    review_hash = Column(LargeBinary(32), ForeignKey("reviews.hash"), nullable=False)
+    # Read-only; loaded with every query by primary key lookup on reviews
+    review_text = column_property(
+        select(Review.review_text)
+        .where(Review.hash == review_hash)
+        .correlate_except(Review)
+        .scalar_subquery()
+    )
     rating = Column(Integer, nullable=False)
     verified_purchase = Column(Boolean, nullable=False)
     category = Column(String(100), nullable=False)
     prediction_result = Column(String(10), nullable=False)  # 'real' or 'fake'
     confidence_score = Column(Float, nullable=True)
     model_version = Column(String(50), default="1.0.0")
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_at = Column(DateTime, primary_key=True, default=datetime.utcnow)
 
     user = relationship("User", back_populates="predictions")
+
+    # Keyset pagination walks (created_at, id) newest first, per user or overall
+    __table_args__ = (
+        Index(
+            "ix_predictions_user_id_created_at",
+            user_id,
+            created_at.desc(),
+            id.desc(),
+        ),
+        Index("ix_predictions_created_at", created_at.desc(), id.desc()),
+        # Moderator search: equality filter, then newest first
+        Index(
+            "ix_predictions_category_created_at",
+            category,
+            created_at.desc(),
+            id.desc(),
+        ),
+        Index(
+            "ix_predictions_result_created_at",
+            prediction_result,
+            created_at.desc(),
+            id.desc(),
+        ),
+        # Finds predictions sharing a text, and keeps deletes from reviews cheap
+        Index("ix_predictions_review_hash", review_hash),
+        {"postgresql_partition_by": "RANGE (created_at)"},
+    )
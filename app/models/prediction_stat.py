@@ -0,0 +1,25 @@
+import uuid
+from sqlalchemy import BigInteger, Column, Date, Float, String
+from sqlalchemy.dialects.postgresql import UUID
+
+from app.db.base import Base
+
+# Stats rows need a non-null key; anonymous predictions are counted here
+ANONYMOUS_USER_ID = uuid.UUID(int=0)
+
+
+class PredictionStat(Base):
+    """Running totals of predictions per user, day, category and model version"""
+
+    __tablename__ = "prediction_stats"
+
+    user_id = Column(UUID(as_uuid=True), primary_key=True)
+    day = Column(Date, primary_key=True)
+    category = Column(String(100), primary_key=True)
+    model_version = Column(String(50), primary_key=True)
+    total = Column(BigInteger, nullable=False, default=0)
+    real_count = Column(BigInteger, nullable=False, default=0)
+    fake_count = Column(BigInteger, nullable=False, default=0)
+    # AVG(confidence_score) ignores NULLs, so keep the sum and its own count
+    confidence_sum = Column(Float, nullable=False, default=0.0)
+    confidence_count = Column(BigInteger, nullable=False, default=0)
@@ -0,0 +1,32 @@
+import hashlib
+from datetime import datetime
+from sqlalchemy import Column, DateTime, Index, LargeBinary, Text, func, literal_column
+
+from app.db.base import Base
+
+# Text search configuration; the search query must use the same one to hit
+# ix_reviews_review_text_tsv
+SEARCH_CONFIG = literal_column("'english'::regconfig")
+
+
+def review_hash(review_text: str) -> bytes:
+    """SHA-256 of the exact text; equals Postgres sha256(convert_to(text, 'UTF8'))"""
+    return hashlib.sha256(review_text.encode("utf-8")).digest()
+
+
+class Review(Base):
+    """Each distinct review text, stored once and shared by its predictions"""
+
+    __tablename__ = "reviews"
+
+    hash = Column(LargeBinary(32), primary_key=True)
+    review_text = Column(Text, nullable=False)
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+
+    __table_args__ = (
+        Index(
+            "ix_reviews_review_text_tsv",
+            func.to_tsvector(SEARCH_CONFIG, review_text),
+            postgresql_using="gin",
+        ),
+    )
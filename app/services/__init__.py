@@ -1,3 +1,19 @@
-from app.services.ml_service import MLService
+from app.services.ml_service import MLService, ModelNotReady
+from app.services.inference import InferenceExecutor, InferenceQueueFull
+from app.services.batcher import MicroBatcher
+from app.services.cache import PredictionCache
+from app.services.model_registry import ModelRegistry
+from app.services.near_duplicates import NearDuplicateIndex
+from app.services.prediction_writer import PredictionWriter
 
-__all__ = ["MLService"]
+__all__ = [
+    "MLService",
+    "ModelNotReady",
+    "InferenceExecutor",
+    "InferenceQueueFull",
+    "MicroBatcher",
+    "PredictionCache",
+    "ModelRegistry",
+    "NearDuplicateIndex",
+    "PredictionWriter",
+]
@@ -0,0 +1,162 @@
+import asyncio
+import logging
+import time
+from typing import List, Optional, Set, Tuple
+
+from app.core.config import settings
+from app.core.metrics import MICROBATCH_QUEUE_WAIT, MICROBATCH_SIZE
+from app.services.inference import (
+    InferenceExecutor,
+    InferenceQueueFull,
+    inference_executor,
+)
+from app.services.ml_service import PredictionResult
+
+logger = logging.getLogger(__name__)
+
+
+async def collect_batch(
+    queue: asyncio.Queue, max_batch_size: int, max_wait: float
+) -> Tuple[list, bool]:
+    """Wait for one item, then take more until ``max_batch_size`` are
+    collected or ``max_wait`` seconds have passed.
+
+    A ``None`` item asks the consumer to stop; returns ``(batch, stopping)``
+    with whatever was collected before it.
+    """
+    item = await queue.get()
+    if item is None:
+        return [], True
+
+    loop = asyncio.get_running_loop()
+    batch = [item]
+    deadline = loop.time() + max_wait
+    while len(batch) < max_batch_size:
+        timeout = deadline - loop.time()
+        if timeout <= 0:
+            break
+        try:
+            item = await asyncio.wait_for(queue.get(), timeout)
+        except asyncio.TimeoutError:
+            break
+        if item is None:
+            return batch, True
+        batch.append(item)
+    return batch, False
+
+
+class MicroBatcher:
+    """Coalesces concurrent single predictions into batched classifier calls.
+
+    Callers of ``predict`` are queued; a background task collects them until
+    ``max_batch_size`` are waiting or the oldest has waited ``max_wait_ms``,
+    scores the whole batch with one ``predict_batch`` call on the inference
+    executor and resolves each caller's future. When the batcher is not
+    running, ``predict`` goes straight to the executor.
+    """
+
+    def __init__(
+        self,
+        executor: InferenceExecutor,
+        max_batch_size: int,
+        max_wait_ms: float,
+        max_queue: int,
+    ):
+        self.executor = executor
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.max_queue = max_queue
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self._inflight: Set[asyncio.Task] = set()
+
+    def start(self):
+        """Start collecting predictions on the running event loop"""
+        if self._task is not None:
+            return
+        self._queue = asyncio.Queue(maxsize=self.max_queue)
+        self._task = asyncio.create_task(self._run())
+        logger.info(
+            f"Micro-batcher started: max {self.max_batch_size} reviews "
+            f"or {self.max_wait * 1000:g}ms"
+        )
+
+    async def stop(self):
+        """Flush queued predictions and stop the background task"""
+        if self._task is None:
+            return
+        await self._queue.put(None)
+        await self._task
+        if self._inflight:
+            await asyncio.gather(*self._inflight, return_exceptions=True)
+        self._task = None
+        self._queue = None
+
+    async def predict(
+        self,
+        review_text: str,
+        rating: int,
+        verified_purchase: bool,
+        category: str
+    ) -> PredictionResult:
+        """Queue a single review and wait for its batched result"""
+        if self._task is None:
+            return await self.executor.predict(
+                review_text=review_text,
+                rating=rating,
+                verified_purchase=verified_purchase,
+                category=category,
+            )
+
+        review = {
+            "review_text": review_text,
+            "rating": rating,
+            "verified_purchase": verified_purchase,
+            "category": category,
+        }
+        future = asyncio.get_running_loop().create_future()
+        try:
+            self._queue.put_nowait((review, future, time.perf_counter()))
+        except asyncio.QueueFull:
+            raise InferenceQueueFull(
+                f"Micro-batch queue is full ({self._queue.qsize()} waiting)"
+            )
+        return await future
+
+    async def _run(self):
+        stopping = False
+        while not stopping:
+            batch, stopping = await collect_batch(self._queue, self.max_batch_size, self.max_wait)
+            if batch:
+                task = asyncio.create_task(self._score(batch))
+                self._inflight.add(task)
+                task.add_done_callback(self._inflight.discard)
+
+    async def _score(self, batch: List[tuple]):
+        started = time.perf_counter()
+        MICROBATCH_SIZE.observe(len(batch))
+        for _, _, enqueued_at in batch:
+            MICROBATCH_QUEUE_WAIT.observe(started - enqueued_at)
+
+        try:
+            results = await self.executor.predict_batch(
+                [review for review, _, _ in batch]
+            )
+        except Exception as e:
+            for _, future, _ in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for (_, future, _), result in zip(batch, results):
+            # The caller may have gone away (client disconnect) meanwhile
+            if not future.done():
+                future.set_result(result)
+
+
+micro_batcher = MicroBatcher(
+    inference_executor,
+    max_batch_size=settings.MICROBATCH_MAX_SIZE,
+    max_wait_ms=settings.MICROBATCH_MAX_WAIT_MS,
+    max_queue=settings.INFERENCE_MAX_QUEUE * settings.MICROBATCH_MAX_SIZE,
+)
@@ -0,0 +1,159 @@
+import hashlib
+import json
+import logging
+import time
+from collections import OrderedDict
+from typing import List, Optional, Tuple
+
+import redis.asyncio as redis
+
+from app.core.config import settings
+from app.core.metrics import CACHE_REQUESTS
+from app.services.ml_service import PredictionResult
+
+logger = logging.getLogger(__name__)
+
+
+def cache_key(
+    review_text: str,
+    rating: int,
+    verified_purchase: bool,
+    category: str,
+    model_version: str,
+) -> str:
+    """Hash a review into a cache key.
+
+    Only normalization that cannot change the model's output is applied:
+    trailing whitespace is stripped (``predict`` does the same) and the text
+    is lowercased (every token is lowercased before lemmatization anyway).
+    """
+    normalized = json.dumps(
+        [review_text.rstrip().lower(), int(rating), bool(verified_purchase), category],
+        ensure_ascii=False,
+    )
+    digest = hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+    return f"prediction:{model_version}:{digest}"
+
+
+class PredictionCache:
+    """Two-tier prediction cache: a small in-process LRU in front of Redis.
+
+    Keys embed the model version, so results from an old model are never
+    served. When a lookup arrives for a new version the local tier is
+    cleared; the old version's Redis keys are left to expire after ``ttl``
+    rather than scanned and deleted on the request path.
+
+    After a Redis error the cache runs on the local tier alone for
+    ``redis_retry_after`` seconds, so an unreachable Redis costs one
+    failed call per interval instead of one per request.
+    """
+
+    def __init__(self, redis_url: Optional[str], ttl: int, local_size: int, redis_retry_after: float = 5.0):
+        self.ttl = ttl
+        self.local_size = local_size
+        self.redis_retry_after = redis_retry_after
+        self._redis_down_until = 0.0
+        self._local: "OrderedDict[str, PredictionResult]" = OrderedDict()
+        self._redis = redis.from_url(redis_url) if redis_url else None
+        self._model_version: Optional[str] = None
+        self.hits = 0
+        self.misses = 0
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else None,
+            "local_size": len(self._local),
+        }
+
+    def _redis_available(self) -> bool:
+        return self._redis is not None and time.monotonic() >= self._redis_down_until
+
+    def _redis_failed(self, action: str, error: Exception):
+        logger.warning(
+            f"Prediction cache {action} failed, skipping Redis for "
+            f"{self.redis_retry_after:g}s: {str(error)}"
+        )
+        self._redis_down_until = time.monotonic() + self.redis_retry_after
+
+    def _check_version(self, model_version: str):
+        if self._model_version == model_version:
+            return
+        if self._model_version is not None:
+            self._local.clear()
+        self._model_version = model_version
+
+    def _remember(self, key: str, value: PredictionResult):
+        self._local[key] = value
+        self._local.move_to_end(key)
+        if len(self._local) > self.local_size:
+            self._local.popitem(last=False)
+
+    async def get_many(self, keys: List[str], model_version: str) -> List[Optional[PredictionResult]]:
+        """Look up many keys, returning None for each miss"""
+        self._check_version(model_version)
+
+        found: List[Optional[PredictionResult]] = []
+        remote_keys = []
+        for key in keys:
+            value = self._local.get(key)
+            if value is not None:
+                self._local.move_to_end(key)
+                CACHE_REQUESTS.labels("memory", "hit").inc()
+            else:
+                CACHE_REQUESTS.labels("memory", "miss").inc()
+                remote_keys.append(key)
+            found.append(value)
+
+        if remote_keys and self._redis_available():
+            try:
+                raw_values = await self._redis.mget(remote_keys)
+            except redis.RedisError as e:
+                self._redis_failed("read", e)
+                raw_values = [None] * len(remote_keys)
+
+            remote = {}
+            for key, raw in zip(remote_keys, raw_values):
+                if raw is None:
+                    CACHE_REQUESTS.labels("redis", "miss").inc()
+                    continue
+                CACHE_REQUESTS.labels("redis", "hit").inc()
+                remote[key] = tuple(json.loads(raw))
+                self._remember(key, remote[key])
+            found = [
+                value if value is not None else remote.get(key)
+                for key, value in zip(keys, found)
+            ]
+
+        hits = sum(1 for value in found if value is not None)
+        self.hits += hits
+        self.misses += len(found) - hits
+        return found
+
+    async def set_many(self, items: List[Tuple[str, PredictionResult]]):
+        """Store results in both tiers"""
+        for key, value in items:
+            self._remember(key, value)
+        if not items or not self._redis_available():
+            return
+        try:
+            async with self._redis.pipeline(transaction=False) as pipe:
+                for key, value in items:
+                    pipe.set(key, json.dumps(list(value)), ex=self.ttl)
+                await pipe.execute()
+        except redis.RedisError as e:
+            self._redis_failed("write", e)
+
+    async def close(self):
+        if self._redis is not None:
+            await self._redis.aclose()
+
+
+prediction_cache = PredictionCache(
+    redis_url=settings.REDIS_URL or None,
+    ttl=settings.CACHE_TTL,
+    local_size=settings.PREDICTION_CACHE_LOCAL_SIZE,
+    redis_retry_after=settings.PREDICTION_CACHE_REDIS_RETRY_AFTER,
+)
@@ -0,0 +1,230 @@
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+from scipy import sparse
+
+# Mirrors nltk.probability._NINF, which NaiveBayesClassifier adds for a
+# feature a label has never been seen with.
+_NINF = float("-1e300")
+
+# A value no training featureset can contain, used to read the probability
+# a smoothed distribution assigns to unseen feature values.
+_UNSEEN = object()
+
+ReviewTokens = Tuple[bool, str, Sequence[str]]
+
+
+def _lookup(mapping, keys: List[Any]) -> List[Optional[int]]:
+    """Columns for ``keys``, None where absent, from a dict or a MappedVocabulary"""
+    get_many = getattr(mapping, "get_many", None)
+    if get_many is not None:
+        return get_many(keys)
+    return [mapping.get(key) for key in keys]
+
+
+def count_features(verified_purchase: bool, category: str, tokens: Iterable[str]) -> Counter:
+    """Token counts with the same keys and values as MLService._create_feature_vector"""
+    counts = Counter(tokens)
+    counts[category] += 1
+    counts["R"] += 1
+    counts["VP"] += 1 if verified_purchase else 0
+    return counts
+
+
+class CompiledClassifier:
+    """NumPy-scorable export of a trained classifier.
+
+    Every supported model reduces to ``scores = X @ weights.T + bias`` over a
+    frozen vocabulary, where ``X`` is a CSR matrix with one row per review
+    and the predicted label is the arg-max column of ``scores``.
+
+    ``categorical`` vocabularies (NLTK Naive Bayes) have one column per
+    ``(feature, value)`` pair seen in training plus one per feature for
+    unseen values; the matching entry is set to 1. ``numeric`` vocabularies
+    (scikit-learn via ``SklearnClassifier``) have one column per feature
+    holding the feature value. Features outside the vocabulary are ignored,
+    as the original classifiers do.
+
+    ``vocabulary`` and ``unknown_columns`` are dicts when compiled in
+    process and ``MappedVocabulary`` instances when loaded from an artifact.
+    """
+
+    def __init__(
+        self,
+        kind: str,
+        labels: List[Any],
+        vocabulary: Mapping[Any, int],
+        unknown_columns: Mapping[str, int],
+        weights: np.ndarray,
+        bias: np.ndarray,
+    ):
+        self.kind = kind
+        self.labels = labels
+        self.vocabulary = vocabulary
+        self.unknown_columns = unknown_columns
+        self.weights = weights
+        self.bias = bias
+
+    @property
+    def n_features(self) -> int:
+        return self.weights.shape[1]
+
+    def transform(self, featuresets: Sequence[Dict[str, Any]]) -> sparse.csr_matrix:
+        """Convert feature dicts into a CSR matrix"""
+        categorical = self.kind == "categorical"
+        # Look each distinct key up once per batch; memory-mapped
+        # vocabularies answer a whole batch in one vectorized search
+        keys: Dict[Any, Any] = {}
+        for features in featuresets:
+            for fname, fval in features.items():
+                keys.setdefault((fname, fval) if categorical else fname, None)
+        columns = dict(zip(keys, _lookup(self.vocabulary, list(keys))))
+        if categorical:
+            unseen = list({key[0]: None for key, column in columns.items() if column is None})
+            fallback = dict(zip(unseen, _lookup(self.unknown_columns, unseen)))
+
+        indptr = [0]
+        indices: list = []
+        data: list = []
+        for features in featuresets:
+            if categorical:
+                for fname, fval in features.items():
+                    column = columns[(fname, fval)]
+                    if column is None:
+                        column = fallback[fname]
+                        if column is None:
+                            continue
+                    indices.append(column)
+                    data.append(1.0)
+            else:
+                for fname, fval in features.items():
+                    column = columns[fname]
+                    if column is not None and fval:
+                        indices.append(column)
+                        data.append(float(fval))
+            indptr.append(len(indices))
+        return sparse.csr_matrix(
+            (np.asarray(data, dtype=np.float64), np.asarray(indices, dtype=np.int64), indptr),
+            shape=(len(featuresets), self.n_features),
+        )
+
+    def transform_reviews(self, reviews: Sequence[ReviewTokens]) -> sparse.csr_matrix:
+        """Convert (verified_purchase, category, tokens) rows into a CSR matrix"""
+        return self.transform([
+            count_features(verified_purchase, category, tokens)
+            for verified_purchase, category, tokens in reviews
+        ])
+
+    def decision_scores(self, matrix: sparse.csr_matrix) -> np.ndarray:
+        return np.asarray(matrix @ self.weights.T) + self.bias
+
+    def classify_matrix(self, matrix: sparse.csr_matrix) -> List[Any]:
+        if matrix.shape[0] == 0:
+            return []
+        best = self.decision_scores(matrix).argmax(axis=1)
+        return [self.labels[i] for i in best]
+
+    def predict_proba(self, matrix: sparse.csr_matrix) -> np.ndarray:
+        """Softmax over the decision scores.
+
+        Exact posteriors for the Naive Bayes models and logistic regression;
+        for margin-based models such as LinearSVC it is a sigmoid of the
+        margin, which ranks reviews correctly but is not calibrated.
+        """
+        scores = self.decision_scores(matrix)
+        scores -= scores.max(axis=1, keepdims=True)
+        np.exp(scores, out=scores)
+        scores /= scores.sum(axis=1, keepdims=True)
+        return scores
+
+    def classify_with_confidence(self, matrix: sparse.csr_matrix) -> Tuple[List[Any], List[float]]:
+        """Predicted labels and the probability of each prediction"""
+        if matrix.shape[0] == 0:
+            return [], []
+        probabilities = self.predict_proba(matrix)
+        best = probabilities.argmax(axis=1)
+        confidences = probabilities[np.arange(len(best)), best]
+        return [self.labels[i] for i in best], confidences.tolist()
+
+    def classify_many(self, featuresets: Sequence[Dict[str, Any]]) -> List[Any]:
+        """Drop-in replacement for the NLTK ``classify_many``"""
+        return self.classify_matrix(self.transform(featuresets))
+
+
+def _compile_naive_bayes(classifier) -> CompiledClassifier:
+    labels = list(classifier._labels)
+    label_index = {label: i for i, label in enumerate(labels)}
+
+    # Collect every (feature, value) pair any label has seen
+    vocabulary: Dict[Tuple[str, Any], int] = {}
+    unknown_columns: Dict[str, int] = {}
+    for (_, fname), probdist in classifier._feature_probdist.items():
+        if fname not in unknown_columns:
+            unknown_columns[fname] = len(unknown_columns)
+    offset = len(unknown_columns)
+    for (_, fname), probdist in classifier._feature_probdist.items():
+        for fval in probdist.samples():
+            key = (fname, fval)
+            if key not in vocabulary:
+                vocabulary[key] = offset + len(vocabulary)
+
+    weights = np.full((len(labels), offset + len(vocabulary)), _NINF)
+    for (label, fname), probdist in classifier._feature_probdist.items():
+        row = weights[label_index[label]]
+        row[unknown_columns[fname]] = probdist.logprob(_UNSEEN)
+        for fval in probdist.samples():
+            row[vocabulary[(fname, fval)]] = probdist.logprob(fval)
+    # A seen feature value that this label's distribution lacks still gets
+    # the label's smoothed unseen-value estimate, not -inf
+    for (fname, fval), column in vocabulary.items():
+        for label, i in label_index.items():
+            if weights[i, column] == _NINF and (label, fname) in classifier._feature_probdist:
+                weights[i, column] = weights[i, unknown_columns[fname]]
+
+    bias = np.array([classifier._label_probdist.logprob(label) for label in labels])
+    # NLTK log probabilities are base 2; store natural logs so predict_proba
+    # reproduces prob_classify exactly
+    weights *= np.log(2)
+    bias *= np.log(2)
+    return CompiledClassifier("categorical", labels, vocabulary, unknown_columns, weights, bias)
+
+
+def _compile_sklearn(classifier) -> CompiledClassifier:
+    clf = classifier._clf
+    vectorizer = classifier._vectorizer
+    # SklearnClassifier label-encodes targets; classes_ holds the originals
+    labels = list(classifier._encoder.classes_)
+    vocabulary = dict(vectorizer.vocabulary_)
+
+    if type(clf).__name__ == "MultinomialNB":
+        weights = np.asarray(clf.feature_log_prob_, dtype=np.float64)
+        bias = np.asarray(clf.class_log_prior_, dtype=np.float64)
+    elif hasattr(clf, "coef_") and hasattr(clf, "intercept_"):
+        coef = clf.coef_.toarray() if sparse.issparse(clf.coef_) else clf.coef_
+        coef = np.asarray(coef, dtype=np.float64)
+        intercept = np.asarray(clf.intercept_, dtype=np.float64).ravel()
+        if coef.shape[0] == 1:
+            # Binary models score one decision function; class 1 wins when it is > 0
+            weights = np.vstack([np.zeros_like(coef[0]), coef[0]])
+            bias = np.array([0.0, intercept[0]])
+        else:
+            weights, bias = coef, intercept
+    else:
+        raise ValueError(f"Unsupported scikit-learn estimator {type(clf).__name__}")
+
+    return CompiledClassifier("numeric", labels, vocabulary, {}, weights, bias)
+
+
+def compile_classifier(classifier) -> CompiledClassifier:
+    """Export a pickled NLTK classifier into a CompiledClassifier.
+
+    Supports ``nltk.NaiveBayesClassifier`` and ``SklearnClassifier``
+    wrapping a linear model or ``MultinomialNB``; raises ValueError for
+    anything else.
+    """
+    if hasattr(classifier, "_feature_probdist") and hasattr(classifier, "_label_probdist"):
+        return _compile_naive_bayes(classifier)
+    if hasattr(classifier, "_clf") and hasattr(classifier, "_vectorizer"):
+        return _compile_sklearn(classifier)
+    raise ValueError(f"Unsupported classifier {type(classifier).__name__}")
@@ -0,0 +1,225 @@
+import asyncio
+import logging
+import multiprocessing
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import List, Optional
+
+from app.core.config import settings
+from app.services.ml_service import MLService, ModelNotReady, PredictionResult, ml_service
+
+logger = logging.getLogger(__name__)
+
+INFERENCE_MODES = ("inline", "thread", "process")
+
+# Seconds a warmed-up worker waits for the rest of the pool to load
+WORKER_START_TIMEOUT = 600
+
+# The model held by a process-pool worker, and the barrier its pool's
+# workers meet at during warm-up
+_worker_service: Optional[MLService] = None
+_workers_started = None
+
+
+class InferenceQueueFull(Exception):
+    """Raised when more inference calls are pending than the executor allows"""
+
+
+def _init_worker(model_name: str, model_version: str, model_format: str, started):
+    """Load and warm up the model once in each process-pool worker"""
+    global _worker_service, _workers_started
+    _workers_started = started
+    _worker_service = MLService(
+        model_name=model_name,
+        model_version=model_version,
+        model_format=model_format,
+    )
+    _worker_service.load()
+
+
+def _worker_ready() -> bool:
+    # The pool spawns workers on demand and the initializer only runs in
+    # those it spawned; holding each warm-up call until every worker has
+    # one means all of them have started and loaded the model
+    try:
+        _workers_started.wait(WORKER_START_TIMEOUT)
+    except threading.BrokenBarrierError:
+        return False
+    return _worker_service is not None and _worker_service.health_check()
+
+
+def create_worker_pool(
+    max_workers: int, model_name: str, model_version: str, model_format: str
+) -> ProcessPoolExecutor:
+    """Process pool whose workers each load the model in their initializer"""
+    context = multiprocessing.get_context("spawn")
+    return ProcessPoolExecutor(
+        max_workers=max_workers,
+        mp_context=context,
+        initializer=_init_worker,
+        initargs=(model_name, model_version, model_format, context.Barrier(max_workers)),
+    )
+
+
+async def warm_up_workers(executor: ProcessPoolExecutor, max_workers: int) -> bool:
+    """Start every worker of a pool from create_worker_pool; False if any failed to load"""
+    loop = asyncio.get_running_loop()
+    ready = await asyncio.gather(*(
+        loop.run_in_executor(executor, _worker_ready) for _ in range(max_workers)
+    ))
+    return all(ready)
+
+
+def _worker_predict_batch(reviews: List[dict]) -> List[PredictionResult]:
+    """Score a batch inside a process-pool worker"""
+    return _worker_service.predict_batch(reviews)
+
+
+class InferenceExecutor:
+    """Runs CPU-bound model inference off the asyncio event loop.
+
+    ``inline`` scores on the calling coroutine (the old behaviour),
+    ``thread`` uses a thread pool and ``process`` a process pool whose
+    workers each hold their own copy of the model. At most ``max_queue``
+    calls may be pending at once; further calls fail fast with
+    ``InferenceQueueFull`` so the API can answer 503 instead of piling up.
+
+    ``use_model`` swaps the model atomically: calls already dispatched
+    finish on the model (or worker pool) they started on.
+
+    In ``process`` mode only the workers need the classifier; see
+    ``models_in_workers``.
+    """
+
+    def __init__(self, mode: str, max_workers: int, max_queue: int, service: MLService):
+        if mode not in INFERENCE_MODES:
+            raise ValueError(
+                f"Unknown inference executor {mode!r}, expected one of {INFERENCE_MODES}"
+            )
+        self.mode = mode
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.service = service
+        self._executor: Optional[Executor] = None
+        self._pending = 0
+
+    @property
+    def pending(self) -> int:
+        return self._pending
+
+    @property
+    def models_in_workers(self) -> bool:
+        """Whether scoring happens in worker processes with their own model.
+
+        If so, the API process loads models with ``with_model=False``:
+        it still tokenizes (near-duplicate detection) but keeps no second
+        copy of the classifier.
+        """
+        return self.mode == "process"
+
+    def _create_executor(self, service: MLService) -> Optional[Executor]:
+        if self.mode == "inline":
+            return None
+        if self.mode == "thread":
+            return ThreadPoolExecutor(
+                max_workers=self.max_workers,
+                thread_name_prefix="inference",
+            )
+        return create_worker_pool(
+            self.max_workers, service.model_name, service.model_version, service.model_format
+        )
+
+    def start(self):
+        """Create the worker pool for the configured mode"""
+        if self._executor is not None or self.mode == "inline":
+            return
+        self._executor = self._create_executor(self.service)
+        logger.info(f"Inference executor started: {self.mode} x{self.max_workers}")
+
+    async def _warm_up(self, executor: Optional[Executor]):
+        if self.mode != "process" or executor is None:
+            return
+        if not await warm_up_workers(executor, self.max_workers):
+            raise ModelNotReady("Inference workers failed to load the model")
+
+    async def warm_up(self):
+        """Start every process-pool worker so each loads its model before traffic"""
+        await self._warm_up(self._executor)
+
+    async def use_model(self, service: MLService):
+        """Switch to an already loaded model without dropping in-flight calls.
+
+        In process mode a new pool is started and warmed up with the new
+        model first; the old pool is then shut down without cancelling the
+        batches it is still scoring.
+        """
+        if self.mode != "process" or self._executor is None:
+            self.service = service
+            return
+
+        executor = self._create_executor(service)
+        try:
+            await self._warm_up(executor)
+        except Exception:
+            executor.shutdown(wait=False, cancel_futures=True)
+            raise
+        old_executor, self._executor = self._executor, executor
+        self.service = service
+        old_executor.shutdown(wait=False)
+
+    def shutdown(self, wait: bool = True):
+        """Stop the worker pool, optionally waiting for in-flight calls"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait, cancel_futures=not wait)
+            self._executor = None
+
+    async def predict(
+        self,
+        review_text: str,
+        rating: int,
+        verified_purchase: bool,
+        category: str
+    ) -> PredictionResult:
+        """Score a single review on the executor"""
+        results = await self.predict_batch([{
+            "review_text": review_text,
+            "rating": rating,
+            "verified_purchase": verified_purchase,
+            "category": category,
+        }])
+        return results[0]
+
+    async def predict_batch(self, reviews: List[dict]) -> List[PredictionResult]:
+        """Score a batch of reviews on the executor"""
+        # Bind the model and pool now so a concurrent swap cannot split a batch
+        service, executor = self.service, self._executor
+        if not service.health_check():
+            raise ModelNotReady("Model is still loading")
+        if self._pending >= self.max_queue:
+            raise InferenceQueueFull(
+                f"Inference queue is full ({self._pending} pending)"
+            )
+
+        self._pending += 1
+        try:
+            if executor is None:
+                return service.predict_batch(reviews)
+
+            loop = asyncio.get_running_loop()
+            if self.mode == "process":
+                return await loop.run_in_executor(
+                    executor, _worker_predict_batch, reviews
+                )
+            return await loop.run_in_executor(
+                executor, service.predict_batch, reviews
+            )
+        finally:
+            self._pending -= 1
+
+
+inference_executor = InferenceExecutor(
+    mode=settings.INFERENCE_EXECUTOR,
+    max_workers=settings.INFERENCE_WORKERS,
+    max_queue=settings.INFERENCE_MAX_QUEUE,
+    service=ml_service,
+)
@@ -0,0 +1,195 @@
+import json
+import os
+import zlib
+from typing import Any, List, Mapping, Optional
+
+import numpy as np
+
+from app.services.features import CompiledClassifier
+
+ARTIFACT_FORMAT = 2
+
+WEIGHTS_FILE = "weights.npy"
+BIAS_FILE = "bias.npy"
+META_FILE = "meta.json"
+
+# Each vocabulary is four .npy files named "<vocabulary>_<part>.npy"
+VOCABULARIES = ("vocabulary", "unknown_columns")
+VOCABULARY_PARTS = ("hashes", "offsets", "keys", "columns")
+
+
+def _plain(value):
+    # NumPy scalars (e.g. scikit-learn class labels) are not JSON serializable
+    return value.item() if isinstance(value, np.generic) else value
+
+
+def _encode_value(value) -> str:
+    # Self-delimiting, and values that compare equal in a dict (1 == 1.0 ==
+    # True) encode identically, so lookups match the dict they replace
+    if value is None:
+        return "N"
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    if isinstance(value, int):
+        return f"i{int(value)};"
+    if isinstance(value, str):
+        return f"s{len(value)}:{value}"
+    text = repr(value)
+    return f"r{len(text)}:{text}"
+
+
+def _encode_key(key) -> bytes:
+    # Fast paths for the keys real models have: (token, count) and token
+    if type(key) is tuple and len(key) == 2 and type(key[0]) is str and type(key[1]) is int:
+        return f"ts{len(key[0])}:{key[0]}i{key[1]};".encode("utf-8")
+    if type(key) is str:
+        return f"s{len(key)}:{key}".encode("utf-8")
+    if isinstance(key, tuple):
+        return ("t" + "".join(_encode_value(part) for part in key)).encode("utf-8")
+    return _encode_value(key).encode("utf-8")
+
+
+def _key_hash(encoded: bytes) -> int:
+    # Collisions only cost an extra byte comparison, so a fast 32-bit hash will do
+    return zlib.crc32(encoded)
+
+
+class MappedVocabulary:
+    """Read-only feature -> column lookup over four flat arrays.
+
+    Keys are stored as encoded bytes sorted by a 32-bit hash, so a batch
+    of lookups is one ``searchsorted`` plus a byte comparison per hit, and
+    every array can be memory-mapped: workers on a node share the pages
+    instead of each building a Python dict with one entry per
+    ``(feature, value)`` pair.
+    """
+
+    def __init__(self, hashes: np.ndarray, offsets: np.ndarray, keys: np.ndarray, columns: np.ndarray):
+        self._hashes = hashes
+        self._offsets = offsets
+        self._keys = keys
+        self._columns = columns
+        # Slicing a memoryview is far cheaper than slicing a memmap
+        self._key_bytes = memoryview(keys)
+
+    @classmethod
+    def build(cls, mapping: Mapping[Any, int]) -> "MappedVocabulary":
+        encoded = [_encode_key(key) for key in mapping]
+        hashes = np.fromiter((_key_hash(key) for key in encoded), dtype=np.uint32, count=len(encoded))
+        order = np.argsort(hashes, kind="stable")
+        columns = np.fromiter(mapping.values(), dtype=np.int64, count=len(encoded))
+        lengths = np.fromiter((len(encoded[i]) for i in order), dtype=np.int64, count=len(encoded))
+        offsets = np.concatenate([[0], np.cumsum(lengths)]).astype(np.int64)
+        keys = np.frombuffer(b"".join(encoded[i] for i in order), dtype=np.uint8)
+        return cls(hashes[order], offsets, keys, columns[order])
+
+    @classmethod
+    def load(cls, directory: str, name: str, mmap: bool = True) -> "MappedVocabulary":
+        return cls(*(
+            np.load(
+                os.path.join(directory, f"{name}_{part}.npy"),
+                mmap_mode="r" if mmap else None,
+                allow_pickle=False,
+            )
+            for part in VOCABULARY_PARTS
+        ))
+
+    def save(self, directory: str, name: str):
+        arrays = (self._hashes, self._offsets, self._keys, self._columns)
+        for part, array in zip(VOCABULARY_PARTS, arrays):
+            np.save(os.path.join(directory, f"{name}_{part}.npy"), array)
+
+    def __len__(self) -> int:
+        return len(self._hashes)
+
+    def get_many(self, keys: List[Any]) -> List[Optional[int]]:
+        """Column of each key, or None where it is not in the vocabulary"""
+        if not len(self):
+            return [None] * len(keys)
+        encoded = [_encode_key(key) for key in keys]
+        hashes = np.fromiter((_key_hash(key) for key in encoded), dtype=np.uint32, count=len(encoded))
+        starts = np.searchsorted(self._hashes, hashes, side="left")
+        ends = np.searchsorted(self._hashes, hashes, side="right")
+        matches = (ends - starts).tolist()
+        candidates = np.where(matches, starts, 0)
+        key_starts = self._offsets[candidates].tolist()
+        key_ends = self._offsets[candidates + 1].tolist()
+        columns = self._columns[candidates].tolist()
+        key_bytes = self._key_bytes
+        found: List[Optional[int]] = []
+        for i, key in enumerate(encoded):
+            if matches[i] == 1:
+                found.append(columns[i] if key_bytes[key_starts[i]:key_ends[i]] == key else None)
+            elif matches[i] == 0:
+                found.append(None)
+            else:
+                # Several candidates only on a hash collision
+                found.append(self._get_colliding(key, int(starts[i]), int(ends[i])))
+        return found
+
+    def _get_colliding(self, key: bytes, start: int, end: int) -> Optional[int]:
+        for i in range(start, end):
+            if self._key_bytes[self._offsets[i]:self._offsets[i + 1]] == key:
+                return int(self._columns[i])
+        return None
+
+    def get(self, key, default=None) -> Optional[int]:
+        column = self.get_many([key])[0]
+        return default if column is None else column
+
+
+def export_artifact(compiled: CompiledClassifier, directory: str):
+    """Write a compiled classifier as NumPy arrays plus JSON metadata.
+
+    Unlike the pickle, nothing in the directory can execute code when
+    loaded, and every array, vocabularies included, can be memory-mapped
+    read-only so the workers on a node share one physical copy through
+    the page cache.
+    """
+    os.makedirs(directory, exist_ok=True)
+    np.save(os.path.join(directory, WEIGHTS_FILE), np.ascontiguousarray(compiled.weights))
+    np.save(os.path.join(directory, BIAS_FILE), compiled.bias)
+    for name in VOCABULARIES:
+        MappedVocabulary.build(getattr(compiled, name)).save(directory, name)
+
+    with open(os.path.join(directory, META_FILE), "w", encoding="utf-8") as f:
+        json.dump(
+            {
+                "format": ARTIFACT_FORMAT,
+                "kind": compiled.kind,
+                "labels": [_plain(label) for label in compiled.labels],
+                "n_features": compiled.n_features,
+            },
+            f,
+        )
+
+
+def load_artifact(directory: str, mmap: bool = True) -> CompiledClassifier:
+    """Load an exported classifier, memory-mapping the weights and vocabularies"""
+    with open(os.path.join(directory, META_FILE), encoding="utf-8") as f:
+        meta = json.load(f)
+    if meta.get("format") != ARTIFACT_FORMAT:
+        raise ValueError(
+            f"Unsupported model artifact format {meta.get('format')!r}; "
+            f"re-run export-model to write format {ARTIFACT_FORMAT}"
+        )
+
+    weights = np.load(
+        os.path.join(directory, WEIGHTS_FILE),
+        mmap_mode="r" if mmap else None,
+        allow_pickle=False,
+    )
+    bias = np.load(os.path.join(directory, BIAS_FILE), allow_pickle=False)
+    if weights.shape != (len(meta["labels"]), meta["n_features"]):
+        raise ValueError(f"Model artifact weights have unexpected shape {weights.shape}")
+
+    return CompiledClassifier(
+        meta["kind"],
+        meta["labels"],
+        MappedVocabulary.load(directory, "vocabulary", mmap=mmap),
+        MappedVocabulary.load(directory, "unknown_columns", mmap=mmap),
+        weights,
+        bias,
+    )
@@ -0,0 +1,159 @@
+import asyncio
+import logging
+import os
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from app.core.config import settings
+from app.core.metrics import MODEL_ACTIVE
+from app.services.inference import inference_executor
+from app.services.ml_service import MLService, ml_service
+
+logger = logging.getLogger(__name__)
+
+
+class InvalidModelName(ValueError):
+    """Raised when a model name resolves to a path outside MODEL_PATH"""
+
+
+def check_model_name(model_name: str) -> str:
+    """Resolve ``model_name`` inside MODEL_PATH or raise InvalidModelName"""
+    # Models are unpickled, so an absolute path, ``..`` or a symlink out of
+    # the model directory would let the caller execute any pickle on disk
+    root = os.path.realpath(settings.MODEL_PATH)
+    path = os.path.realpath(os.path.join(root, model_name))
+    if not path.startswith(root + os.sep):
+        raise InvalidModelName(f"Model name {model_name!r} is outside the model directory")
+    return path
+
+
+class ModelRegistry:
+    """Loaded model versions and the one currently serving traffic.
+
+    New versions are loaded and warmed up in a background thread, then
+    swapped in atomically through the inference executor. Requests already
+    scoring keep their reference to the previous model, which drains
+    naturally; it stays registered for rollback until evicted.
+    """
+
+    def __init__(self, initial: MLService, max_versions: int):
+        self.max_versions = max_versions
+        self._models: Dict[str, MLService] = {initial.model_version: initial}
+        self._active = initial
+        self._lock = asyncio.Lock()
+        MODEL_ACTIVE.labels(initial.model_version).set(1)
+
+    @property
+    def active(self) -> MLService:
+        return self._active
+
+    def get(self, version: str) -> Optional[MLService]:
+        return self._models.get(version)
+
+    def versions(self) -> List[dict]:
+        return [
+            {
+                "version": service.model_version,
+                "model_name": service.model_name,
+                "model_format": service.model_format,
+                "active": service is self._active,
+                "ready": service.health_check(),
+                "loaded_at": service.loaded_at,
+            }
+            for service in self._models.values()
+        ]
+
+    async def load(
+        self,
+        version: str,
+        model_name: str,
+        activate: bool = False,
+        model_format: Optional[str] = None,
+    ) -> MLService:
+        """Load and warm up a model version without blocking the event loop"""
+        check_model_name(model_name)
+        async with self._lock:
+            if version in self._models:
+                raise ValueError(f"Model version {version} is already loaded")
+            service = MLService(
+                model_name=model_name,
+                model_version=version,
+                model_format=model_format,
+            )
+            # In process mode the model is loaded, and checked, by the new
+            # worker pool when the version is activated
+            await asyncio.to_thread(service.load, not inference_executor.models_in_workers)
+            self._models[version] = service
+            MODEL_ACTIVE.labels(version).set(0)
+            logger.info(f"Registered model version {version} ({model_name})")
+            if activate:
+                await self._activate(service)
+            self._evict()
+            return service
+
+    async def activate(self, version: str) -> MLService:
+        """Make a loaded version serve all new predictions"""
+        async with self._lock:
+            service = self._models.get(version)
+            if service is None:
+                raise KeyError(f"Model version {version} is not loaded")
+            await self._activate(service)
+            return service
+
+    async def _activate(self, service: MLService):
+        if service is self._active:
+            return
+        await inference_executor.use_model(service)
+        previous, self._active = self._active, service
+        MODEL_ACTIVE.labels(previous.model_version).set(0)
+        MODEL_ACTIVE.labels(service.model_version).set(1)
+        logger.info(f"Model version {service.model_version} is now active "
+                    f"(was {previous.model_version})")
+
+    async def unload(self, version: str):
+        """Forget an inactive version so its memory can be reclaimed"""
+        async with self._lock:
+            service = self._models.get(version)
+            if service is None:
+                raise KeyError(f"Model version {version} is not loaded")
+            if service is self._active:
+                raise ValueError("Cannot unload the active model version")
+            del self._models[version]
+            MODEL_ACTIVE.remove(version)
+
+    def _evict(self):
+        # Drop the oldest inactive versions beyond the configured limit
+        for version in list(self._models):
+            if len(self._models) <= self.max_versions:
+                break
+            if self._models[version] is not self._active:
+                del self._models[version]
+                MODEL_ACTIVE.remove(version)
+
+    async def watch(self, interval: float):
+        """Hot-swap the model whenever MODEL_PATH/MODEL_NAME is replaced on disk"""
+        model_path = os.path.join(settings.MODEL_PATH, settings.MODEL_NAME)
+        last_mtime = os.path.getmtime(model_path) if os.path.exists(model_path) else None
+        changed_mtime = None
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                mtime = os.path.getmtime(model_path)
+            except OSError:
+                continue
+            if mtime == last_mtime:
+                continue
+            if mtime != changed_mtime:
+                # Wait one more interval so a file still being copied settles
+                changed_mtime = mtime
+                continue
+            last_mtime = mtime
+            stamp = datetime.utcfromtimestamp(mtime).strftime("%Y%m%d%H%M%S")
+            version = f"{settings.MODEL_VERSION}+{stamp}"
+            try:
+                await self.load(version, settings.MODEL_NAME, activate=True)
+            except Exception as e:
+                logger.error(f"Hot-swap of {model_path} failed: {str(e)}")
+
+
+model_registry = ModelRegistry(ml_service, max_versions=settings.MODEL_REGISTRY_MAX_VERSIONS)
@@ -0,0 +1,274 @@
+import asyncio
+import logging
+import threading
+import time
+import uuid
+import zlib
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from sqlalchemy import select
+
+from app.core.config import settings
+from app.core.metrics import NEAR_DUPLICATE_INDEX_SIZE, NEAR_DUPLICATE_LOOKUPS
+from app.db.session import AsyncSessionLocal
+from app.models.prediction import Prediction
+from app.models.review import Review
+from app.services.model_registry import model_registry
+
+logger = logging.getLogger(__name__)
+
+# Universal hashing modulo a Mersenne prime; products stay below 2**62
+_PRIME = (1 << 31) - 1
+_EMPTY = np.uint64(_PRIME)
+
+# (near_duplicate_of, cluster_size); near_duplicate_of is None for a new cluster
+ClusterInfo = Tuple[Optional[uuid.UUID], int]
+
+
+class NearDuplicateIndex:
+    """In-memory MinHash-LSH index of recent reviews.
+
+    Each review is reduced to a ``num_perm`` MinHash signature of the
+    unigram and bigram shingles from ``MLService.preprocess_batch``. The
+    signature is cut into ``bands`` bands, and reviews that share any band
+    are candidates; a candidate whose signatures agree on at least
+    ``threshold`` of positions (an estimate of Jaccard similarity) is a
+    near duplicate. A new review joins the cluster of its closest match,
+    and every cluster is identified by its first review.
+
+    Each band bucket keeps only its newest review, so an insert compares
+    against at most ``bands`` candidates however large a cluster grows;
+    under identical-text spam the newest copy stands in for the rest.
+
+    At most ``max_entries`` reviews are kept: every review has a sequence
+    number, and everything more than ``max_entries`` behind the newest is
+    evicted. A cluster outlives its first review for as long as any
+    member remains.
+
+    Sequence numbers are reserved when ``add_many`` is called, so reviews
+    are ordered by call even though they are indexed in worker threads.
+    Those below ``max_entries`` are reserved for ``build``, so stored
+    predictions indexed at startup rank before any created while it runs,
+    and are skipped if live inserts have already pushed them out.
+    """
+
+    def __init__(self, num_perm: int, bands: int, threshold: float, max_entries: int):
+        if num_perm % bands:
+            raise ValueError(f"NEAR_DUPLICATE_BANDS ({bands}) must divide NUM_PERM ({num_perm})")
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.threshold = threshold
+        self.max_entries = max_entries
+
+        rng = np.random.default_rng(1)
+        self._a = rng.integers(1, _PRIME, size=num_perm, dtype=np.uint64)
+        self._b = rng.integers(0, _PRIME, size=num_perm, dtype=np.uint64)
+
+        # Ring buffers indexed by sequence number modulo max_entries
+        self._signatures = np.zeros((max_entries, num_perm), dtype=np.uint32)
+        self._seqs = np.full(max_entries, -1, dtype=np.int64)  # -1 for an empty slot
+        self._roots = np.zeros(max_entries, dtype=np.int64)
+        # Band hash -> sequence number of the newest review in that bucket
+        self._buckets: List[Dict[int, int]] = [{} for _ in range(bands)]
+        # Cluster key (its first member's sequence number, never reassigned)
+        # -> [root id, live member count, root sequence number]
+        self._clusters: Dict[int, list] = {}
+        self._next = max_entries
+        self._newest = -1
+        self._size = 0
+        # add_many indexes in worker threads; one at a time
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return self._size
+
+    def signatures(self, texts: Sequence[str]) -> Optional[np.ndarray]:
+        """MinHash signatures for raw review texts, or None before the model loads.
+
+        CPU-bound (tokenization and hashing): call it off the event loop.
+        """
+        service = model_registry.active
+        if not service.health_check():
+            return None
+        return self._signatures_for(service.preprocess_batch(list(texts)))
+
+    def _signatures_for(self, token_lists: List[list]) -> np.ndarray:
+        signatures = np.empty((len(token_lists), self.num_perm), dtype=np.uint32)
+        for i, tokens in enumerate(token_lists):
+            if not tokens:
+                signatures[i] = _EMPTY
+                continue
+            unique = set(tokens)
+            shingles = np.fromiter(
+                (zlib.crc32(token.encode()) for token in unique),
+                dtype=np.uint64,
+                count=len(unique),
+            ) % _PRIME
+            hashed = (shingles[:, None] * self._a + self._b) % _PRIME
+            signatures[i] = hashed.min(axis=0)
+        return signatures
+
+    def _band_keys(self, signature: np.ndarray) -> List[int]:
+        rows = self.rows
+        return [hash(signature[band * rows:(band + 1) * rows].tobytes()) for band in range(self.bands)]
+
+    def _best_match(self, signature: np.ndarray, keys: List[int]) -> Optional[int]:
+        candidates = {
+            member
+            for band, key in enumerate(keys)
+            if (member := self._buckets[band].get(key)) is not None
+        }
+        if not candidates:
+            return None
+        candidates = np.fromiter(candidates, dtype=np.int64, count=len(candidates))
+        similarity = (
+            self._signatures[candidates % self.max_entries] == signature
+        ).mean(axis=1)
+        best = int(similarity.argmax())
+        if similarity[best] < self.threshold:
+            return None
+        return int(candidates[best])
+
+    def reserve(self, count: int) -> range:
+        """Sequence numbers for the next ``count`` reviews, in call order"""
+        seqs = range(self._next, self._next + count)
+        self._next += count
+        return seqs
+
+    def add(self, id: uuid.UUID, signature: np.ndarray, seq: int) -> ClusterInfo:
+        """Index a stored review and return the cluster it joined.
+
+        ``seq`` comes from ``reserve``, or from the range kept for
+        ``build``. Callers off the event loop must hold ``_lock``.
+        """
+        if seq <= self._newest - self.max_entries:
+            # Already older than the newest max_entries reviews
+            return None, 1
+        if seq > self._newest:
+            for old in range(max(self._newest - self.max_entries + 1, 0), seq - self.max_entries + 1):
+                self._evict(old)
+            self._newest = seq
+        if (signature == _EMPTY).all():
+            # Nothing left after stopword removal; never a meaningful match
+            NEAR_DUPLICATE_LOOKUPS.labels("empty").inc()
+            return None, 1
+
+        keys = self._band_keys(signature)
+        match = self._best_match(signature, keys)
+
+        slot = seq % self.max_entries
+        if match is None:
+            root = seq
+            self._clusters[root] = [id, 0, seq]
+        else:
+            root = int(self._roots[match % self.max_entries])
+        cluster = self._clusters[root]
+        cluster[1] += 1
+        if seq < cluster[2]:
+            # An older review indexed by build becomes the cluster's first
+            cluster[0], cluster[2] = id, seq
+
+        self._signatures[slot] = signature
+        self._seqs[slot] = seq
+        self._roots[slot] = root
+        self._size += 1
+        for band, key in enumerate(keys):
+            buckets = self._buckets[band]
+            if buckets.get(key, -1) < seq:
+                buckets[key] = seq
+
+        first = cluster[2] == seq
+        NEAR_DUPLICATE_LOOKUPS.labels("unique" if first else "duplicate").inc()
+        NEAR_DUPLICATE_INDEX_SIZE.set(len(self))
+        return (None if first else cluster[0]), cluster[1]
+
+    def _add_texts(self, ids: Sequence[uuid.UUID], texts: Sequence[str], seqs: range) -> List[ClusterInfo]:
+        signatures = self.signatures(texts)
+        if signatures is None:
+            return [(None, 1)] * len(ids)
+        with self._lock:
+            return [self.add(id, signature, seq) for id, signature, seq in zip(ids, signatures, seqs)]
+
+    async def add_many(self, ids: Sequence[uuid.UUID], texts: Sequence[str]) -> List[ClusterInfo]:
+        """Index stored reviews; all unclustered if the model is not loaded yet.
+
+        Sequence numbers are taken before the first await, so concurrent
+        calls are ordered as they were made; everything else runs in a
+        worker thread.
+        """
+        seqs = self.reserve(len(ids))
+        return await asyncio.to_thread(self._add_texts, ids, texts, seqs)
+
+    def _evict(self, seq: int):
+        slot = seq % self.max_entries
+        if self._seqs[slot] != seq:
+            return  # reserved and never filled, skipped, or empty
+        for band, key in enumerate(self._band_keys(self._signatures[slot])):
+            buckets = self._buckets[band]
+            # Newer reviews replace older ones in a bucket, and eviction
+            # goes oldest first, so anything else here is newer
+            if buckets.get(key) == seq:
+                del buckets[key]
+        self._seqs[slot] = -1
+        self._size -= 1
+        root = int(self._roots[slot])
+        cluster = self._clusters[root]
+        cluster[1] -= 1
+        if cluster[1] == 0:
+            del self._clusters[root]
+
+    def _add_chunk(self, ids: List[uuid.UUID], token_lists: List[list], seqs: range):
+        signatures = self._signatures_for(token_lists)
+        with self._lock:
+            for id, signature, seq in zip(ids, signatures, seqs):
+                self.add(id, signature, seq)
+
+    async def build(self, before: Optional[datetime] = None, chunk_size: int = 5000):
+        """Index the most recent stored predictions created before ``before``.
+
+        Safe to run while new predictions are being added: stored ones
+        take the reserved sequence numbers below ``max_entries``, in
+        creation order, so they count as older than every live insert.
+        """
+        started = time.perf_counter()
+        statement = select(Prediction.id, Review.review_text).join(
+            Review, Review.hash == Prediction.review_hash
+        )
+        if before is not None:
+            statement = statement.where(Prediction.created_at < before)
+        statement = statement.order_by(Prediction.created_at.desc()).limit(self.max_entries)
+
+        rows = []
+        async with AsyncSessionLocal() as db:
+            result = await db.stream(statement.execution_options(yield_per=chunk_size))
+            async for row in result:
+                rows.append(row)
+        # Newest were fetched first; replay in creation order
+        rows.reverse()
+        first_seq = self.max_entries - len(rows)
+
+        service = model_registry.active
+        for start in range(0, len(rows), chunk_size):
+            chunk = rows[start:start + chunk_size]
+            token_lists = await asyncio.to_thread(
+                service.preprocess_batch, [review_text for _, review_text in chunk]
+            )
+            ids = [id for id, _ in chunk]
+            seqs = range(first_seq + start, first_seq + start + len(chunk))
+            await asyncio.to_thread(self._add_chunk, ids, token_lists, seqs)
+
+        logger.info(
+            f"Near-duplicate index built from {len(rows)} predictions "
+            f"({len(self._clusters)} clusters) in {time.perf_counter() - started:.1f}s"
+        )
+
+
+near_duplicate_index = NearDuplicateIndex(
+    num_perm=settings.NEAR_DUPLICATE_NUM_PERM,
+    bands=settings.NEAR_DUPLICATE_BANDS,
+    threshold=settings.NEAR_DUPLICATE_THRESHOLD,
+    max_entries=settings.NEAR_DUPLICATE_MAX_ENTRIES,
+)
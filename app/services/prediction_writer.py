@@ -0,0 +1,126 @@
+import asyncio
+import logging
+import time
+from typing import List, Optional, Set
+
+from app.core.config import settings
+from app.core.metrics import (
+    WRITE_BEHIND_BATCH_SIZE,
+    WRITE_BEHIND_DROPPED,
+    WRITE_BEHIND_LAG,
+    WRITE_BEHIND_QUEUE_DEPTH,
+)
+from app.crud import prediction as crud_prediction
+from app.db.session import AsyncSessionLocal
+from app.services.batcher import collect_batch
+
+logger = logging.getLogger(__name__)
+
+
+class PredictionWriter:
+    """Stores prediction records off the request path.
+
+    ``submit`` enqueues rows built by ``crud.prediction.build_row`` and
+    returns immediately; a background task inserts them in multi-row
+    batches of up to ``max_batch_size`` rows or every ``max_wait_ms``.
+    At most ``max_concurrency`` batches are inserted at once, so a slow
+    database backs rows up in the queue instead of taking the whole
+    connection pool from request handlers. The queue is bounded: when it
+    is full, or a batch fails to insert, the rows are dropped and counted
+    rather than slowing down requests.
+    """
+
+    def __init__(
+        self,
+        max_batch_size: int,
+        max_wait_ms: float,
+        max_queue: int,
+        max_concurrency: int,
+    ):
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.max_queue = max_queue
+        self.max_concurrency = max_concurrency
+        self._queue: Optional[asyncio.Queue] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._task: Optional[asyncio.Task] = None
+        self._inflight: Set[asyncio.Task] = set()
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None
+
+    def start(self):
+        """Start the background flush task on the running event loop"""
+        if self._task is not None:
+            return
+        self._queue = asyncio.Queue(maxsize=self.max_queue)
+        self._slots = asyncio.Semaphore(self.max_concurrency)
+        WRITE_BEHIND_QUEUE_DEPTH.set_function(self._queue.qsize)
+        self._task = asyncio.create_task(self._run())
+        logger.info(
+            f"Prediction write-behind started: batches of {self.max_batch_size} "
+            f"or every {self.max_wait * 1000:g}ms, {self.max_concurrency} at a time"
+        )
+
+    async def stop(self):
+        """Insert everything still queued and stop the background task"""
+        if self._task is None:
+            return
+        await self._queue.put(None)
+        await self._task
+        if self._inflight:
+            await asyncio.gather(*self._inflight, return_exceptions=True)
+        self._task = None
+        self._queue = None
+        self._slots = None
+
+    def submit(self, rows: List[dict]) -> int:
+        """Queue rows for insertion; returns how many were accepted"""
+        enqueued_at = time.perf_counter()
+        for accepted, row in enumerate(rows):
+            try:
+                self._queue.put_nowait((row, enqueued_at))
+            except asyncio.QueueFull:
+                dropped = len(rows) - accepted
+                WRITE_BEHIND_DROPPED.labels(reason="queue_full").inc(dropped)
+                logger.warning(f"Write-behind queue is full, dropped {dropped} predictions")
+                return accepted
+        return len(rows)
+
+    async def _run(self):
+        stopping = False
+        while not stopping:
+            # Take a batch off the queue only once an insert slot is free
+            await self._slots.acquire()
+            batch, stopping = await collect_batch(self._queue, self.max_batch_size, self.max_wait)
+            if not batch:
+                self._slots.release()
+                continue
+            task = asyncio.create_task(self._flush(batch))
+            self._inflight.add(task)
+            task.add_done_callback(self._inflight.discard)
+
+    async def _flush(self, batch: List[tuple]):
+        WRITE_BEHIND_BATCH_SIZE.observe(len(batch))
+        try:
+            async with AsyncSessionLocal() as db:
+                await crud_prediction.insert_rows(db, rows=[row for row, _ in batch])
+        except Exception as e:
+            WRITE_BEHIND_DROPPED.labels(reason="error").inc(len(batch))
+            logger.error(f"Failed to store {len(batch)} predictions: {str(e)}")
+            return
+        finally:
+            self._slots.release()
+
+        committed_at = time.perf_counter()
+        for _, enqueued_at in batch:
+            WRITE_BEHIND_LAG.observe(committed_at - enqueued_at)
+
+
+prediction_writer = PredictionWriter(
+    max_batch_size=settings.PREDICTION_WRITE_BATCH_SIZE,
+    max_wait_ms=settings.PREDICTION_WRITE_MAX_WAIT_MS,
+    max_queue=settings.PREDICTION_WRITE_QUEUE_SIZE,
+    max_concurrency=settings.PREDICTION_WRITE_CONCURRENCY,
+)
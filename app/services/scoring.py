@@ -0,0 +1,93 @@
+from typing import List
+
+from app.core.config import settings
+from app.core.metrics import PREDICTIONS
+from app.services.batcher import micro_batcher
+from app.services.cache import cache_key, prediction_cache
+from app.services.inference import inference_executor
+from app.services.ml_service import PredictionResult
+from app.services.model_registry import model_registry
+
+
+def _count(results: List[PredictionResult]):
+    for result, _, model_version in results:
+        PREDICTIONS.labels(result, model_version).inc()
+
+
+async def score_review(
+    review_text: str,
+    rating: int,
+    verified_purchase: bool,
+    category: str
+) -> PredictionResult:
+    """Score one review, serving repeats from the prediction cache"""
+    if not settings.PREDICTION_CACHE_ENABLED:
+        result = await micro_batcher.predict(
+            review_text=review_text,
+            rating=rating,
+            verified_purchase=verified_purchase,
+            category=category,
+        )
+        _count([result])
+        return result
+
+    model_version = model_registry.active.model_version
+    key = cache_key(review_text, rating, verified_purchase, category, model_version)
+    cached = (await prediction_cache.get_many([key], model_version))[0]
+    if cached is not None:
+        _count([cached])
+        return cached
+
+    result = await micro_batcher.predict(
+        review_text=review_text,
+        rating=rating,
+        verified_purchase=verified_purchase,
+        category=category,
+    )
+    # Only cache under the key's version; a hot-swap may have happened meanwhile
+    if result[2] == model_version:
+        await prediction_cache.set_many([(key, result)])
+    _count([result])
+    return result
+
+
+async def score_reviews(reviews: List[dict]) -> List[PredictionResult]:
+    """Score a batch of reviews, sending only cache misses to the model"""
+    if not settings.PREDICTION_CACHE_ENABLED:
+        results = await inference_executor.predict_batch(reviews)
+        _count(results)
+        return results
+
+    model_version = model_registry.active.model_version
+    keys = [
+        cache_key(
+            review["review_text"],
+            review["rating"],
+            review["verified_purchase"],
+            review["category"],
+            model_version,
+        )
+        for review in reviews
+    ]
+    results = await prediction_cache.get_many(keys, model_version)
+
+    # Identical reviews within one batch are scored once
+    missing = {}
+    for i, result in enumerate(results):
+        if result is None:
+            missing.setdefault(keys[i], []).append(i)
+    if missing:
+        scored = await inference_executor.predict_batch(
+            [reviews[indexes[0]] for indexes in missing.values()]
+        )
+        for indexes, result in zip(missing.values(), scored):
+            for i in indexes:
+                results[i] = result
+        await prediction_cache.set_many([
+            (key, result)
+            for key, result in zip(missing.keys(), scored)
+            if result[2] == model_version
+        ])
+
+    _count(results)
+    return results
@@ -0,0 +1 @@
+"""Reproducible performance benchmarks; see the Benchmarks section of the README."""
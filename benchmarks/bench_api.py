@@ -0,0 +1,134 @@
+"""End-to-end load test of POST /api/v1/predictions/.
+
+Usage::
+
+    # in-process, against DATABASE_URL (e.g. the docker-compose Postgres)
+    python -m benchmarks.bench_api --requests 5000 --concurrency 32
+    # against a running server
+    python -m benchmarks.bench_api --url http://localhost:8000
+
+In-process runs drive the ASGI app through httpx with its lifespan, so
+tables are created and the model is loaded exactly as in production,
+minus the network. The schema uses PostgreSQL-only statements (upserts,
+COPY), so a Postgres instance is required; SQLite is not supported.
+"""
+import argparse
+import asyncio
+import contextlib
+import logging
+import random
+import time
+from collections import Counter
+
+import httpx
+
+from benchmarks.common import make_reviews, summarize, write_report
+
+ENDPOINT = "/api/v1/predictions/"
+
+
+@contextlib.asynccontextmanager
+async def _client(url):
+    if url:
+        async with httpx.AsyncClient(base_url=url, timeout=30) as client:
+            yield client
+        return
+
+    from app.main import app
+    from app.services.model_registry import model_registry
+
+    async with app.router.lifespan_context(app):
+        # The model loads in the background; wait until it serves traffic
+        while not model_registry.active.health_check():
+            if model_registry.active.load_error:
+                raise RuntimeError(f"Model failed to load: {model_registry.active.load_error}")
+            await asyncio.sleep(0.1)
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=30) as client:
+            yield client
+
+
+async def run_load(client, reviews, total, concurrency) -> tuple:
+    latencies = []
+    statuses = Counter()
+    sent = 0
+
+    async def worker():
+        nonlocal sent
+        while sent < total:
+            review = reviews[sent % len(reviews)]
+            sent += 1
+            t0 = time.perf_counter()
+            try:
+                # verify_token reads a query parameter; an invalid one means anonymous
+                response = await client.post(ENDPOINT, params={"token": "bench"}, json=review)
+                statuses[response.status_code] += 1
+            except httpx.HTTPError as e:
+                statuses[type(e).__name__] += 1
+            latencies.append(time.perf_counter() - t0)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return latencies, time.perf_counter() - started, statuses
+
+
+async def _main(args):
+    unique = max(1, int(args.requests * (1 - args.duplicate_ratio)))
+    reviews = make_reviews(unique, args.length, seed=args.seed)
+    # Repeat reviews so that duplicate_ratio of requests can hit the cache
+    sequence = [random.Random(args.seed).choice(reviews) for _ in range(args.requests - unique)]
+    reviews = reviews + sequence
+    random.Random(args.seed).shuffle(reviews)
+
+    results = []
+    async with _client(args.url) as client:
+        if args.warmup:
+            await run_load(client, reviews, args.warmup, args.concurrency)
+        latencies, elapsed, statuses = await run_load(
+            client, reviews, args.requests, args.concurrency
+        )
+        row = summarize(
+            "post_prediction",
+            {
+                "concurrency": args.concurrency,
+                "length": args.length,
+                "duplicates": args.duplicate_ratio,
+            },
+            latencies,
+            len(latencies),
+            elapsed,
+        )
+        row["statuses"] = {str(status): count for status, count in statuses.items()}
+        results.append(row)
+
+    write_report(
+        "api",
+        results,
+        args.output,
+        meta={"target": args.url or "in-process"},
+    )
+    failures = sum(count for status, count in statuses.items() if status != 200)
+    if failures:
+        logging.warning(f"{failures} of {args.requests} requests did not return 200: {dict(statuses)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", help="Base URL of a running server (default: in-process)")
+    parser.add_argument("--output", help="JSON report path (default: stdout)")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--length", type=int, default=50, help="Words per review")
+    parser.add_argument(
+        "--duplicate-ratio", type=float, default=0.0,
+        help="Fraction of requests that repeat an earlier review",
+    )
+    parser.add_argument("--warmup", type=int, default=100, help="Untimed requests first")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.WARNING)
+    asyncio.run(_main(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""Micro-benchmarks for per-request authentication.
+
+Usage::
+
+    python -m benchmarks.bench_auth --output benchmarks/results/auth.json
+    python -m benchmarks.bench_auth --email admin@example.com  # also the user lookup
+
+Times ``verify_token`` with the verified-token cache cold (every call
+decodes and checks the HMAC) and warm, and, given ``--email`` of an
+existing user, the superuser dependency's lookup against DATABASE_URL
+with and without the user cache.
+"""
+import argparse
+import asyncio
+import logging
+import time
+from itertools import cycle
+
+from benchmarks.common import summarize, time_calls, write_report
+
+TOKENS = 256
+
+
+async def _time_async(fn, min_calls: int, min_seconds: float, warmup: int = 3) -> tuple:
+    for _ in range(warmup):
+        await fn()
+    latencies = []
+    started = time.perf_counter()
+    while len(latencies) < min_calls or time.perf_counter() - started < min_seconds:
+        t0 = time.perf_counter()
+        await fn()
+        latencies.append(time.perf_counter() - t0)
+    return latencies, time.perf_counter() - started
+
+
+def bench_tokens(min_seconds: float) -> list:
+    from app.core import security
+
+    tokens = [security.create_access_token(f"user{i}@example.com") for i in range(TOKENS)]
+    results = []
+
+    def cold():
+        security.token_cache.clear()
+        security.verify_token(next(cold_tokens))
+
+    cold_tokens = cycle(tokens)
+    latencies, elapsed = time_calls(cold, min_seconds=min_seconds)
+    results.append(summarize("verify_token", {"cache": "cold"}, latencies, len(latencies), elapsed))
+
+    warm_tokens = cycle(tokens)
+    latencies, elapsed = time_calls(
+        lambda: security.verify_token(next(warm_tokens)), min_seconds=min_seconds
+    )
+    results.append(summarize("verify_token", {"cache": "warm"}, latencies, len(latencies), elapsed))
+    return results
+
+
+async def bench_user(email: str, min_seconds: float) -> list:
+    from app.crud import user as crud_user
+    from app.crud.user import identity_cache
+    from app.db.session import AsyncSessionLocal, engine
+
+    results = []
+    try:
+        async with AsyncSessionLocal() as db:
+            if await crud_user.get_identity_by_email(db, email=email) is None:
+                raise SystemExit(f"No user with email {email}")
+
+            async def cold():
+                identity_cache.clear()
+                await crud_user.get_identity_by_email(db, email=email)
+
+            latencies, elapsed = await _time_async(cold, 20, min_seconds)
+            results.append(summarize("user_identity", {"cache": "cold"}, latencies, len(latencies), elapsed))
+
+            latencies, elapsed = await _time_async(
+                lambda: crud_user.get_identity_by_email(db, email=email), 20, min_seconds
+            )
+            results.append(summarize("user_identity", {"cache": "warm"}, latencies, len(latencies), elapsed))
+    finally:
+        await engine.dispose()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--output", help="JSON report path (default: stdout)")
+    parser.add_argument("--email", help="Existing user to time the DB lookup with")
+    parser.add_argument(
+        "--min-seconds", type=float, default=1.0, help="Minimum time per benchmark"
+    )
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.WARNING)
+
+    from app.core.config import settings
+
+    results = bench_tokens(args.min_seconds)
+    if args.email:
+        results += asyncio.run(bench_user(args.email, args.min_seconds))
+    write_report(
+        "auth",
+        results,
+        args.output,
+        meta={
+            "algorithm": settings.ALGORITHM,
+            "token_cache_ttl": settings.AUTH_TOKEN_CACHE_TTL,
+            "user_cache_ttl": settings.AUTH_USER_CACHE_TTL,
+        },
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""Micro-benchmarks for the MLService hot path.
+
+Usage::
+
+    python -m benchmarks.bench_ml --output benchmarks/results/ml.json
+
+Loads the model configured by MODEL_PATH/MODEL_NAME (and MODEL_FORMAT)
+and times preprocessing, feature building and classification across
+review lengths and batch sizes on seeded synthetic reviews.
+"""
+import argparse
+import logging
+from itertools import cycle
+
+from benchmarks.common import make_reviews, summarize, time_calls, write_report
+
+LENGTHS = (10, 50, 200)
+BATCH_SIZES = (1, 32, 256)
+POOL_SIZE = 512
+
+
+def _bench(name, params, fn, items_per_call, min_seconds):
+    latencies, elapsed = time_calls(fn, min_seconds=min_seconds)
+    return summarize(name, params, latencies, len(latencies) * items_per_call, elapsed)
+
+
+def run_benchmarks(service, lengths, batch_sizes, min_seconds) -> list:
+    results = []
+    for length in lengths:
+        reviews = make_reviews(POOL_SIZE, length)
+        texts = cycle([review["review_text"].rstrip() for review in reviews])
+        results.append(_bench(
+            "preprocess_text", {"length": length},
+            lambda: service._preprocess_text(next(texts)), 1, min_seconds,
+        ))
+
+        tokenized = [
+            (review, service._preprocess_text(review["review_text"].rstrip()))
+            for review in reviews
+        ]
+        rows = cycle(tokenized)
+
+        def build():
+            review, tokens = next(rows)
+            return service._create_feature_vector(
+                str(review["rating"]), review["verified_purchase"], review["category"], tokens
+            )
+
+        results.append(_bench(
+            "create_feature_vector", {"length": length}, build, 1, min_seconds,
+        ))
+
+        features = [
+            service._create_feature_vector(
+                str(review["rating"]), review["verified_purchase"], review["category"], tokens
+            )
+            for review, tokens in tokenized
+        ]
+        for batch_size in batch_sizes:
+            batches = cycle([
+                features[i:i + batch_size]
+                for i in range(0, POOL_SIZE - batch_size + 1, batch_size)
+            ])
+            review_batches = cycle([
+                reviews[i:i + batch_size]
+                for i in range(0, POOL_SIZE - batch_size + 1, batch_size)
+            ])
+            params = {"length": length, "batch": batch_size}
+            if service.classifier is not None:
+                results.append(_bench(
+                    "classify_many", params,
+                    lambda: service.classifier.classify_many(next(batches)),
+                    batch_size, min_seconds,
+                ))
+            if service.compiled is not None:
+                results.append(_bench(
+                    "compiled_classify_many", params,
+                    lambda: service.compiled.classify_many(next(batches)),
+                    batch_size, min_seconds,
+                ))
+            results.append(_bench(
+                "predict_batch", params,
+                lambda: service.predict_batch(next(review_batches)),
+                batch_size, min_seconds,
+            ))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--output", help="JSON report path (default: stdout)")
+    parser.add_argument("--lengths", type=int, nargs="+", default=LENGTHS)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=BATCH_SIZES)
+    parser.add_argument(
+        "--min-seconds", type=float, default=1.0, help="Minimum time per benchmark"
+    )
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.WARNING)
+
+    from app.core.config import settings
+    from app.services.ml_service import MLService
+
+    service = MLService()
+    service.load()
+    results = run_benchmarks(service, args.lengths, args.batch_sizes, args.min_seconds)
+    write_report(
+        "ml",
+        results,
+        args.output,
+        meta={
+            "model_name": service.model_name,
+            "model_format": service.model_format,
+            "feature_backend": settings.FEATURE_BACKEND,
+            "lemma_cache": service.lemma_cache_stats(),
+        },
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+# Vocabulary for synthetic reviews: common review words plus some noise
+# tokens so the lemma cache sees a realistic mix of hits and misses
+WORDS = (
+    "great good bad terrible product works worked broke broken seller "
+    "shipping arrived quickly slow quality cheap expensive price value love "
+    "loved hate hated recommend recommended would buy again never return "
+    "returned five stars star one two days week month color size fits "
+    "fit small large pictures described exactly amazing awesome best worst "
+    "okay fine disappointed happy satisfied battery charger screen fabric "
+    "smell taste box package instructions easy hard use using used "
+    "the a an and but it is was this that with for not very really so too"
+).split()
+CATEGORIES = ["Electronics", "Home", "Beauty", "Clothing", "Books", "Toys", "Sports"]
+PUNCTUATION = ["", "", "", ",", ".", "!", "!!!", "?"]
+
+
+def make_review(rng: random.Random, length: int) -> dict:
+    """A synthetic review of ``length`` words shaped like PredictionCreate"""
+    words = []
+    for _ in range(length):
+        word = rng.choice(WORDS)
+        if rng.random() < 0.05:
+            # Rare tokens (typos, model numbers) that miss the lemma cache
+            word = f"{word}{rng.randint(0, 9999)}"
+        if rng.random() < 0.1:
+            word = word.capitalize()
+        words.append(word + rng.choice(PUNCTUATION))
+    return {
+        "review_text": " ".join(words),
+        "rating": rng.randint(1, 5),
+        "verified_purchase": rng.random() < 0.6,
+        "category": rng.choice(CATEGORIES),
+    }
+
+
+def make_reviews(count: int, length: int, seed: int = 0) -> List[dict]:
+    rng = random.Random(f"{seed}:{length}")
+    return [make_review(rng, length) for _ in range(count)]
+
+
+def percentile(samples: List[float], q: float) -> float:
+    """Nearest-rank percentile of an unsorted list"""
+    ordered = sorted(samples)
+    index = max(0, min(len(ordered) - 1, round(q / 100 * len(ordered) + 0.5) - 1))
+    return ordered[index]
+
+
+def summarize(name: str, params: dict, latencies: List[float], items: int, elapsed: float) -> dict:
+    """One result row: throughput in items/s and latency percentiles in ms"""
+    return {
+        "name": name,
+        "params": params,
+        "calls": len(latencies),
+        "items": items,
+        "throughput_per_s": items / elapsed if elapsed else None,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p95_ms": percentile(latencies, 95) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+        "mean_ms": sum(latencies) / len(latencies) * 1000,
+    }
+
+
+def time_calls(
+    fn: Callable[[], object],
+    min_calls: int = 20,
+    min_seconds: float = 1.0,
+    warmup: int = 3,
+) -> tuple:
+    """Call ``fn`` until both limits are reached; returns (latencies, elapsed)"""
+    for _ in range(warmup):
+        fn()
+    latencies = []
+    started = time.perf_counter()
+    while len(latencies) < min_calls or time.perf_counter() - started < min_seconds:
+        t0 = time.perf_counter()
+        fn()
+        latencies.append(time.perf_counter() - t0)
+    return latencies, time.perf_counter() - started
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def write_report(suite: str, results: List[dict], output: Optional[str], meta: Dict = None):
+    """Print a table to stderr and write the JSON report to ``output`` (or stdout)"""
+    report = {
+        "suite": suite,
+        "meta": {
+            "commit": _git_commit(),
+            "timestamp": datetime.utcnow().isoformat(timespec="seconds") + "Z",
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            **(meta or {}),
+        },
+        "results": results,
+    }
+
+    for row in results:
+        params = " ".join(f"{k}={v}" for k, v in row["params"].items())
+        print(
+            f"{row['name']:<24} {params:<32} "
+            f"{row['throughput_per_s']:>12,.0f}/s  "
+            f"p50 {row['p50_ms']:8.3f}ms  p95 {row['p95_ms']:8.3f}ms  p99 {row['p99_ms']:8.3f}ms",
+            file=sys.stderr,
+        )
+
+    text = json.dumps(report, indent=2)
+    if output:
+        os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+        with open(output, "w") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
@@ -0,0 +1,55 @@
+"""Compare two benchmark reports, e.g. from before and after a change.
+
+Usage::
+
+    python -m benchmarks.compare base.json head.json [--threshold 10]
+
+Exits with status 1 when any benchmark's throughput drops, or its p95
+latency rises, by more than ``--threshold`` percent.
+"""
+import argparse
+import json
+import sys
+
+
+def _key(row: dict) -> tuple:
+    return row["name"], tuple(sorted(row["params"].items()))
+
+
+def _change(before, after) -> float:
+    return (after - before) / before * 100 if before else 0.0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("base")
+    parser.add_argument("head")
+    parser.add_argument(
+        "--threshold", type=float, default=10.0, help="Allowed regression in percent"
+    )
+    args = parser.parse_args()
+
+    with open(args.base) as f:
+        base = {_key(row): row for row in json.load(f)["results"]}
+    with open(args.head) as f:
+        head = json.load(f)["results"]
+
+    regressions = 0
+    for row in head:
+        before = base.get(_key(row))
+        if before is None:
+            continue
+        throughput = _change(before["throughput_per_s"], row["throughput_per_s"])
+        p95 = _change(before["p95_ms"], row["p95_ms"])
+        regressed = throughput < -args.threshold or p95 > args.threshold
+        regressions += regressed
+        params = " ".join(f"{k}={v}" for k, v in row["params"].items())
+        print(
+            f"{'REGRESSED' if regressed else 'ok':<9} {row['name']:<24} {params:<32} "
+            f"throughput {throughput:+7.1f}%  p95 {p95:+7.1f}%"
+        )
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
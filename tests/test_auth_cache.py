@@ -0,0 +1,213 @@
+"""Verified-token and user-identity caches, with a fake clock"""
+import uuid
+from datetime import timedelta
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import Session
+from sqlalchemy.schema import CreateTable
+
+from app.core import security, ttl_cache
+from app.core.ttl_cache import TTLCache
+from app.crud import user as crud_user
+from app.crud.user import identity_cache
+from app.models.prediction import Prediction
+from app.models.review import Review
+from app.models.user import User
+
+
+@compiles(UUID, "sqlite")
+def _uuid_as_text(type_, compiler, **kw):
+    return "CHAR(32)"
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+
+class SyncSession:
+    """The AsyncSession calls CRUDUser makes, run on a sync SQLite session"""
+
+    def __init__(self, session: Session):
+        self.session = session
+        self.queries = 0
+
+    async def execute(self, statement, params=None):
+        self.queries += 1
+        return self.session.execute(statement, params)
+
+    def add(self, obj):
+        self.session.add(obj)
+
+    async def delete(self, obj):
+        self.session.delete(obj)
+
+    async def commit(self):
+        self.session.commit()
+
+    async def refresh(self, obj):
+        self.session.refresh(obj)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(ttl_cache, "time", fake)
+    return fake
+
+
+@pytest.fixture
+def caches():
+    security.token_cache.clear()
+    identity_cache.clear()
+    yield
+    security.token_cache.clear()
+    identity_cache.clear()
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://")
+    with Session(engine) as session:
+        # Tables only (deleting a user loads its predictions)
+        for model in (User, Review, Prediction):
+            session.execute(CreateTable(model.__table__))
+        yield SyncSession(session)
+
+
+@pytest.fixture
+def decodes(monkeypatch):
+    """Counts the jwt.decode calls verify_token makes"""
+    calls = []
+    decode = security.jwt.decode
+
+    def counting_decode(*args, **kwargs):
+        calls.append(args[0])
+        return decode(*args, **kwargs)
+
+    monkeypatch.setattr(security.jwt, "decode", counting_decode)
+    return calls
+
+
+def test_entries_expire_after_ttl(clock):
+    cache = TTLCache("test", max_size=10, ttl=5)
+    cache.set("a", 1)
+    cache.set("b", 2, ttl=1)
+
+    clock.now += 2
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+    assert len(cache) == 1
+
+    clock.now += 3
+    assert cache.get("a") is None
+    assert len(cache) == 0
+
+
+def test_full_cache_evicts_the_oldest(clock):
+    cache = TTLCache("test", max_size=2, ttl=5)
+    for key in "abc":
+        cache.set(key, key)
+
+    assert [cache.get(key) for key in "abc"] == [None, "b", "c"]
+
+
+def test_zero_ttl_disables_the_cache(clock):
+    cache = TTLCache("test", max_size=10, ttl=0)
+    cache.set("a", 1)
+
+    assert not cache.enabled
+    assert cache.get("a") is None
+
+
+def test_verified_token_is_decoded_once_until_its_entry_expires(clock, caches, decodes):
+    token = security.create_access_token("user@example.com")
+
+    assert security.verify_token(token) == "user@example.com"
+    assert security.verify_token(token) == "user@example.com"
+    assert decodes == [token]
+
+    clock.now += security.token_cache.ttl + 1
+    assert security.verify_token(token) == "user@example.com"
+    assert decodes == [token, token]
+
+
+def test_cached_token_never_outlives_its_expiry(clock, caches, decodes):
+    token = security.create_access_token("user@example.com", expires_delta=timedelta(seconds=10))
+    assert security.verify_token(token) == "user@example.com"
+
+    # Well inside AUTH_TOKEN_CACHE_TTL, but past the token's own exp
+    clock.now += 11
+    assert security.token_cache.get(token) is None
+    security.verify_token(token)
+    assert decodes == [token, token]
+
+
+def test_invalid_token_is_not_cached(clock, caches, decodes):
+    token = security.create_access_token("user@example.com")
+    tampered = token[:-2] + ("AA" if not token.endswith("AA") else "BB")
+
+    assert security.verify_token(tampered) is None
+    assert security.verify_token(tampered) is None
+    assert decodes == [tampered, tampered]
+    assert len(security.token_cache) == 0
+
+
+async def _add_user(db: SyncSession, email: str, is_superuser: bool = False) -> User:
+    user = User(id=uuid.uuid4(), email=email, hashed_password="x", is_superuser=is_superuser)
+    db.add(user)
+    await db.commit()
+    return user
+
+
+@pytest.mark.asyncio
+async def test_identity_is_cached_for_the_ttl(clock, caches, db):
+    user = await _add_user(db, "admin@example.com", is_superuser=True)
+
+    first = await crud_user.get_identity_by_email(db, email="admin@example.com")
+    second = await crud_user.get_identity_by_email(db, email="admin@example.com")
+
+    assert first == second == (user.id, "admin@example.com", True, True)
+    assert db.queries == 1
+
+    clock.now += identity_cache.ttl + 1
+    await crud_user.get_identity_by_email(db, email="admin@example.com")
+    assert db.queries == 2
+
+
+@pytest.mark.asyncio
+async def test_unknown_email_is_not_cached(clock, caches, db):
+    assert await crud_user.get_identity_by_email(db, email="new@example.com") is None
+
+    await _add_user(db, "new@example.com")
+    identity = await crud_user.get_identity_by_email(db, email="new@example.com")
+    assert identity is not None and identity.email == "new@example.com"
+
+
+@pytest.mark.asyncio
+async def test_update_drops_the_identity_under_both_emails(clock, caches, db):
+    user = await _add_user(db, "admin@example.com", is_superuser=True)
+    await crud_user.get_identity_by_email(db, email="admin@example.com")
+
+    await crud_user.update(db, db_obj=user, obj_in={"email": "ops@example.com", "is_superuser": False})
+
+    assert identity_cache.get("admin@example.com") is None
+    assert await crud_user.get_identity_by_email(db, email="admin@example.com") is None
+    identity = await crud_user.get_identity_by_email(db, email="ops@example.com")
+    assert not identity.is_superuser
+
+
+@pytest.mark.asyncio
+async def test_remove_drops_the_identity(clock, caches, db):
+    user = await _add_user(db, "admin@example.com")
+    await crud_user.get_identity_by_email(db, email="admin@example.com")
+
+    await crud_user.remove(db, id=user.id)
+
+    assert await crud_user.get_identity_by_email(db, email="admin@example.com") is None
@@ -0,0 +1,146 @@
+"""Micro-batching of concurrent predictions, with a fake inference executor"""
+import asyncio
+
+import pytest
+
+from app.services.batcher import MicroBatcher, collect_batch
+from app.services.inference import InferenceQueueFull
+
+
+class FakeExecutor:
+    def __init__(self, fail: bool = False):
+        self.fail = fail
+        self.batches = []
+        self.singles = []
+
+    async def predict_batch(self, reviews):
+        self.batches.append([review["review_text"] for review in reviews])
+        await asyncio.sleep(0)
+        if self.fail:
+            raise RuntimeError("model exploded")
+        return [(f"label for {review['review_text']}", 0.9, "test") for review in reviews]
+
+    async def predict(self, review_text, rating, verified_purchase, category):
+        self.singles.append(review_text)
+        return f"label for {review_text}", 0.9, "test"
+
+
+def _predict(batcher: MicroBatcher, text: str):
+    return batcher.predict(review_text=text, rating=5, verified_purchase=True, category="Books")
+
+
+@pytest.mark.asyncio
+async def test_collect_batch_stops_at_max_size():
+    queue = asyncio.Queue()
+    for i in range(5):
+        queue.put_nowait(i)
+
+    assert await collect_batch(queue, max_batch_size=3, max_wait=10) == ([0, 1, 2], False)
+    assert await collect_batch(queue, max_batch_size=3, max_wait=0) == ([3], False)
+
+
+@pytest.mark.asyncio
+async def test_collect_batch_stops_at_deadline():
+    queue = asyncio.Queue()
+    queue.put_nowait("first")
+    loop = asyncio.get_running_loop()
+    loop.call_later(0.01, queue.put_nowait, "in time")
+    loop.call_later(0.5, queue.put_nowait, "too late")
+
+    started = loop.time()
+    assert await collect_batch(queue, max_batch_size=10, max_wait=0.05) == (["first", "in time"], False)
+    assert loop.time() - started < 0.5
+
+
+@pytest.mark.asyncio
+async def test_collect_batch_stop_signal_keeps_collected_items():
+    queue = asyncio.Queue()
+    for item in ["a", "b", None, "c"]:
+        queue.put_nowait(item)
+
+    assert await collect_batch(queue, max_batch_size=10, max_wait=10) == (["a", "b"], True)
+
+    queue = asyncio.Queue()
+    queue.put_nowait(None)
+    assert await collect_batch(queue, max_batch_size=10, max_wait=10) == ([], True)
+
+
+@pytest.mark.asyncio
+async def test_concurrent_predictions_share_batches_and_get_their_own_result():
+    executor = FakeExecutor()
+    batcher = MicroBatcher(executor, max_batch_size=4, max_wait_ms=1000, max_queue=100)
+    batcher.start()
+    try:
+        texts = [f"review {i}" for i in range(10)]
+        results = await asyncio.wait_for(
+            asyncio.gather(*(_predict(batcher, text) for text in texts[:8])), 1
+        )
+        assert [label for label, _, _ in results] == [f"label for {text}" for text in texts[:8]]
+        assert executor.batches == [texts[:4], texts[4:8]]
+
+        # Fewer than max_batch_size: flushed by stop instead of waiting out the deadline
+        pending = asyncio.gather(*(_predict(batcher, text) for text in texts[8:]))
+        await asyncio.sleep(0)
+    finally:
+        await batcher.stop()
+    assert [label for label, _, _ in await pending] == [f"label for {text}" for text in texts[8:]]
+    assert executor.batches[-1] == texts[8:]
+
+
+@pytest.mark.asyncio
+async def test_partial_batch_is_scored_after_max_wait():
+    executor = FakeExecutor()
+    batcher = MicroBatcher(executor, max_batch_size=100, max_wait_ms=20, max_queue=100)
+    batcher.start()
+    try:
+        results = await asyncio.wait_for(
+            asyncio.gather(_predict(batcher, "a"), _predict(batcher, "b")), 1
+        )
+    finally:
+        await batcher.stop()
+
+    assert [label for label, _, _ in results] == ["label for a", "label for b"]
+    assert executor.batches == [["a", "b"]]
+
+
+@pytest.mark.asyncio
+async def test_failed_batch_raises_in_every_caller():
+    executor = FakeExecutor(fail=True)
+    batcher = MicroBatcher(executor, max_batch_size=3, max_wait_ms=1000, max_queue=100)
+    batcher.start()
+    try:
+        callers = [_predict(batcher, f"review {i}") for i in range(3)]
+        results = await asyncio.wait_for(asyncio.gather(*callers, return_exceptions=True), 1)
+    finally:
+        await batcher.stop()
+
+    assert len(results) == 3
+    assert all(isinstance(result, RuntimeError) for result in results)
+    assert {str(result) for result in results} == {"model exploded"}
+
+
+@pytest.mark.asyncio
+async def test_full_queue_is_rejected():
+    executor = FakeExecutor()
+    batcher = MicroBatcher(executor, max_batch_size=10, max_wait_ms=1000, max_queue=1)
+    batcher.start()
+    try:
+        # Both enqueue before the collector gets to run
+        pending = asyncio.gather(
+            _predict(batcher, "queued"), _predict(batcher, "rejected"), return_exceptions=True
+        )
+        await asyncio.sleep(0)
+    finally:
+        await batcher.stop()
+    queued, rejected = await pending
+    assert queued[0] == "label for queued"
+    assert isinstance(rejected, InferenceQueueFull)
+
+
+@pytest.mark.asyncio
+async def test_not_running_goes_straight_to_the_executor():
+    executor = FakeExecutor()
+    batcher = MicroBatcher(executor, max_batch_size=10, max_wait_ms=1000, max_queue=10)
+
+    assert (await _predict(batcher, "direct"))[0] == "label for direct"
+    assert executor.singles == ["direct"] and executor.batches == []
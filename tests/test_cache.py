@@ -0,0 +1,141 @@
+"""Two-tier prediction cache, with Redis replaced by an in-memory fake"""
+import pytest
+import redis.asyncio as redis
+
+from app.services import cache as cache_module
+from app.services.cache import PredictionCache, cache_key
+
+RESULT = ("OR", 0.9, "1.0.0")
+
+
+class FakeRedis:
+    def __init__(self):
+        self.data = {}
+        self.down = False
+        self.calls = 0
+
+    def _check(self):
+        self.calls += 1
+        if self.down:
+            raise redis.ConnectionError("Connection refused")
+
+    async def mget(self, keys):
+        self._check()
+        return [self.data.get(key) for key in keys]
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+
+class FakePipeline:
+    def __init__(self, fake: FakeRedis):
+        self.fake = fake
+        self.pending = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+    def set(self, key, value, ex=None):
+        self.pending.append((key, value.encode()))
+
+    async def execute(self):
+        self.fake._check()
+        self.fake.data.update(self.pending)
+
+
+def _cache(local_size: int = 10, fake: FakeRedis = None) -> PredictionCache:
+    cache = PredictionCache(redis_url=None, ttl=60, local_size=local_size, redis_retry_after=5.0)
+    cache._redis = fake
+    return cache
+
+
+def test_cache_key_normalization():
+    key = cache_key("Great product  ", 5, True, "Books", "1.0.0")
+
+    assert cache_key("GREAT Product", 5, True, "Books", "1.0.0") == key
+    # Leading whitespace and every other field still distinguish reviews
+    assert cache_key("  Great product", 5, True, "Books", "1.0.0") != key
+    assert cache_key("Great product", 4, True, "Books", "1.0.0") != key
+    assert cache_key("Great product", 5, False, "Books", "1.0.0") != key
+    assert cache_key("Great product", 5, True, "Home", "1.0.0") != key
+    assert cache_key("Great product", 5, True, "Books", "2.0.0") != key
+    assert key.startswith("prediction:1.0.0:")
+
+
+@pytest.mark.asyncio
+async def test_local_hit_and_miss():
+    cache = _cache()
+    await cache.set_many([("a", RESULT)])
+
+    assert await cache.get_many(["a", "b"], "1.0.0") == [RESULT, None]
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 1
+
+
+@pytest.mark.asyncio
+async def test_local_lru_evicts_least_recently_used():
+    cache = _cache(local_size=2)
+    await cache.set_many([("a", RESULT), ("b", RESULT)])
+    await cache.get_many(["a"], "1.0.0")
+    await cache.set_many([("c", RESULT)])
+
+    assert await cache.get_many(["a", "b", "c"], "1.0.0") == [RESULT, None, RESULT]
+
+
+@pytest.mark.asyncio
+async def test_new_model_version_clears_the_local_tier():
+    cache = _cache()
+    await cache.get_many([], "1.0.0")
+    await cache.set_many([("a", RESULT)])
+
+    assert await cache.get_many(["a"], "2.0.0") == [None]
+    assert cache.stats()["local_size"] == 0
+
+
+@pytest.mark.asyncio
+async def test_versions_never_share_keys():
+    fake = FakeRedis()
+    cache = _cache(fake=fake)
+    old = cache_key("Great product", 5, True, "Books", "1.0.0")
+    await cache.set_many([(old, RESULT)])
+
+    new = cache_key("Great product", 5, True, "Books", "2.0.0")
+    assert await cache.get_many([new], "2.0.0") == [None]
+
+
+@pytest.mark.asyncio
+async def test_redis_fills_local_misses():
+    fake = FakeRedis()
+    writer, reader = _cache(fake=fake), _cache(fake=fake)
+    await writer.set_many([("a", RESULT)])
+
+    assert await reader.get_many(["a"], "1.0.0") == [RESULT]
+    # Now held locally: no second trip to Redis
+    calls = fake.calls
+    assert await reader.get_many(["a"], "1.0.0") == [RESULT]
+    assert fake.calls == calls
+
+
+@pytest.mark.asyncio
+async def test_redis_errors_fall_back_to_local_and_back_off(monkeypatch):
+    now = 1000.0
+    monkeypatch.setattr(cache_module.time, "monotonic", lambda: now)
+    fake = FakeRedis()
+    cache = _cache(fake=fake)
+    await cache.set_many([("a", RESULT)])
+    fake.down = True
+
+    assert await cache.get_many(["a", "b"], "1.0.0") == [RESULT, None]
+    assert fake.calls == 2
+
+    # Within the back-off Redis is not tried at all, for reads or writes
+    await cache.set_many([("c", RESULT)])
+    assert await cache.get_many(["b", "c"], "1.0.0") == [None, RESULT]
+    assert fake.calls == 2
+
+    fake.down = False
+    now += 5.0
+    assert await cache.get_many(["b"], "1.0.0") == [None]
+    assert fake.calls == 3
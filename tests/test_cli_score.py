@@ -0,0 +1,140 @@
+"""python -m app.cli score, in-process with a fake model"""
+import csv
+import io
+import json
+import logging
+import sys
+
+import pytest
+
+from app.cli import main, score
+
+
+class FakeService:
+    """Scores reviews by rating, without loading anything"""
+
+    def __init__(self, **kwargs):
+        self.loaded = False
+
+    def load(self):
+        self.loaded = True
+
+    def predict_batch(self, reviews):
+        assert self.loaded
+        return [("real" if review["rating"] > 2 else "fake", 0.9, "test") for review in reviews]
+
+
+@pytest.fixture(autouse=True)
+def fake_model(monkeypatch):
+    monkeypatch.setattr(score, "MLService", FakeService)
+
+
+def _review(n: int) -> dict:
+    return {
+        "review_text": f"review {n}",
+        "rating": n % 5 + 1,
+        "verified_purchase": n % 2 == 0,
+        "category": "Books",
+    }
+
+
+def _score(*args) -> int:
+    return main(["score", *args, "--workers", "1"])
+
+
+def test_jsonl_in_jsonl_out(tmp_path):
+    source = tmp_path / "reviews.jsonl"
+    source.write_text("".join(json.dumps(_review(n)) + "\n" for n in range(5)))
+    output = tmp_path / "scored.jsonl"
+
+    assert _score(str(source), "--output", str(output), "--chunk-size", "2") == 0
+
+    rows = [json.loads(line) for line in output.read_text().splitlines()]
+    assert [row["review_text"] for row in rows] == [f"review {n}" for n in range(5)]
+    assert [row["prediction_result"] for row in rows] == ["fake", "fake", "real", "real", "real"]
+    assert all(row["model_version"] == "test" and row["user_id"] is None for row in rows)
+
+
+def test_csv_in_csv_out(tmp_path):
+    source = tmp_path / "reviews.csv"
+    source.write_text(
+        "review_text,rating,verified_purchase,category\n"
+        '"Great, really",5,Yes,Books\n'
+        "meh,1,false,Home\n"
+    )
+    output = tmp_path / "scored.csv"
+
+    assert _score(str(source), "--output", str(output)) == 0
+
+    with open(output, newline="") as f:
+        rows = list(csv.DictReader(f))
+    assert [(row["review_text"], row["verified_purchase"], row["prediction_result"]) for row in rows] == [
+        ("Great, really", "True", "real"),
+        ("meh", "False", "fake"),
+    ]
+
+
+def test_malformed_records_are_skipped(tmp_path, caplog):
+    caplog.set_level(logging.INFO, logger="app.cli.score")
+    source = tmp_path / "reviews.jsonl"
+    source.write_text(
+        json.dumps(_review(0)) + "\n"
+        "{not json\n"
+        "\n"
+        + json.dumps({**_review(1), "rating": 9}) + "\n"
+        + json.dumps(["a", "list"]) + "\n"
+        + json.dumps(_review(2)) + "\n"
+    )
+    output = tmp_path / "scored.jsonl"
+
+    assert _score(str(source), "--output", str(output)) == 0
+
+    rows = [json.loads(line) for line in output.read_text().splitlines()]
+    assert [row["review_text"] for row in rows] == ["review 0", "review 2"]
+    # Blank lines are not records
+    skipped = [r.getMessage() for r in caplog.records if r.getMessage().startswith("Skipping")]
+    assert [message.split(":")[0] for message in skipped] == [
+        "Skipping record 2", "Skipping record 3", "Skipping record 4",
+    ]
+    assert "skipped 3" in caplog.records[-1].getMessage()
+
+
+def test_chunks_in_flight_are_bounded(tmp_path, monkeypatch):
+    source = tmp_path / "reviews.jsonl"
+    source.write_text("".join(json.dumps(_review(n)) + "\n" for n in range(20)))
+    read = []
+    in_flight = []
+    chunks = score._chunks
+    write = score._Writer.write
+
+    def counting_chunks(reviews, size):
+        for chunk in chunks(reviews, size):
+            read.append(chunk)
+            yield chunk
+
+    def counting_write(self, rows):
+        in_flight.append(len(read) - counting_write.calls)
+        counting_write.calls += 1
+        write(self, rows)
+
+    counting_write.calls = 0
+    monkeypatch.setattr(score, "_chunks", counting_chunks)
+    monkeypatch.setattr(score._Writer, "write", counting_write)
+
+    assert _score(str(source), "--output", str(tmp_path / "out.jsonl"), "--chunk-size", "2") == 0
+
+    # One worker may have two chunks read but not yet written out
+    assert len(read) == counting_write.calls == 10
+    assert max(in_flight) == 2
+
+
+def test_stdin_and_stdout_are_left_open(monkeypatch, capsys):
+    stdin = io.StringIO("".join(json.dumps(_review(n)) + "\n" for n in range(3)))
+    monkeypatch.setattr(sys, "stdin", stdin)
+
+    assert _score("-") == 0
+
+    assert not stdin.closed
+    assert not sys.stdout.closed
+    rows = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    assert [row["review_text"] for row in rows] == ["review 0", "review 1", "review 2"]
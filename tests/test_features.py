@@ -0,0 +1,141 @@
+"""CompiledClassifier must score exactly like the classifier it was exported from"""
+import os
+import pickle
+import random
+
+import numpy as np
+import pytest
+from nltk.classify import NaiveBayesClassifier, SklearnClassifier
+from sklearn.linear_model import LogisticRegression
+from sklearn.naive_bayes import MultinomialNB
+
+from app.core.config import settings
+from app.services.features import compile_classifier, count_features
+from app.services.model_artifacts import export_artifact, load_artifact
+
+MODEL_FILE = os.path.join(settings.MODEL_PATH, settings.MODEL_NAME)
+
+CATEGORIES = ["Electronics", "Home", "Beauty", "Clothing", "Books"]
+LABELS = ["CG", "OR"]
+
+
+def _training_corpus(rng: random.Random, size: int = 300) -> list:
+    """Labelled feature dicts where each label favours its own half of the vocabulary"""
+    vocabulary = [f"word{i}" for i in range(60)]
+    corpus = []
+    for _ in range(size):
+        label = rng.choice(LABELS)
+        preferred = vocabulary[:40] if label == "CG" else vocabulary[20:]
+        tokens = rng.choices(preferred, k=rng.randint(1, 12))
+        features = count_features(rng.random() < 0.5, rng.choice(CATEGORIES), tokens)
+        corpus.append((dict(features), label))
+    return corpus
+
+
+def _feature_names(classifier) -> list:
+    if hasattr(classifier, "_feature_probdist"):
+        names = {fname for _, fname in classifier._feature_probdist}
+    else:
+        names = set(classifier._vectorizer.vocabulary_)
+    return sorted(names - {"R", "VP"})
+
+
+def _test_corpus(classifier, rng: random.Random, size: int = 500) -> list:
+    """Reviews drawn from the classifier's own features, plus tokens, categories
+    and counts it never saw in training"""
+    known = _feature_names(classifier)
+    unseen = [f"unseen{i}" for i in range(20)]
+    featuresets = [
+        # Nothing but unseen features
+        dict(count_features(False, "NoSuchCategory", unseen[:3])),
+        dict(count_features(True, "NoSuchCategory", [])),
+    ]
+    for _ in range(size):
+        tokens = rng.choices(known, k=rng.randint(0, 15))
+        tokens += rng.choices(unseen, k=rng.randint(0, 3))
+        if known and rng.random() < 0.2:
+            # A count far above anything in training is an unseen value for NB
+            tokens += [rng.choice(known)] * 40
+        category = rng.choice(CATEGORIES + ["NoSuchCategory"])
+        featuresets.append(dict(count_features(rng.random() < 0.5, category, tokens)))
+    return featuresets
+
+
+def _naive_bayes() -> NaiveBayesClassifier:
+    if os.path.exists(MODEL_FILE):
+        with open(MODEL_FILE, "rb") as f:
+            return pickle.load(f)
+    return NaiveBayesClassifier.train(_training_corpus(random.Random(1)))
+
+
+def _sklearn(estimator) -> SklearnClassifier:
+    return SklearnClassifier(estimator).train(_training_corpus(random.Random(2)))
+
+
+@pytest.fixture(
+    params=["naive_bayes", "logistic_regression", "multinomial_nb"],
+)
+def classifier(request):
+    if request.param == "naive_bayes":
+        return _naive_bayes()
+    if request.param == "logistic_regression":
+        return _sklearn(LogisticRegression(max_iter=1000))
+    return _sklearn(MultinomialNB())
+
+
+def test_labels_match_classify_many(classifier):
+    featuresets = _test_corpus(classifier, random.Random(3))
+    compiled = compile_classifier(classifier)
+
+    assert compiled.classify_many(featuresets) == list(classifier.classify_many(featuresets))
+
+
+def test_probabilities_match_prob_classify_many(classifier):
+    featuresets = _test_corpus(classifier, random.Random(4))
+    compiled = compile_classifier(classifier)
+
+    expected = np.array([
+        [distribution.prob(label) for label in compiled.labels]
+        for distribution in classifier.prob_classify_many(featuresets)
+    ])
+    actual = compiled.predict_proba(compiled.transform(featuresets))
+    np.testing.assert_allclose(actual, expected, rtol=1e-9, atol=1e-12)
+
+    labels, confidences = compiled.classify_with_confidence(compiled.transform(featuresets))
+    assert labels == [distribution.max() for distribution in classifier.prob_classify_many(featuresets)]
+    np.testing.assert_allclose(confidences, expected.max(axis=1), rtol=1e-9, atol=1e-12)
+
+
+def test_transform_reviews_matches_feature_dicts(classifier):
+    rng = random.Random(5)
+    known = _feature_names(classifier)
+    reviews = [
+        (rng.random() < 0.5, rng.choice(CATEGORIES), rng.choices(known + ["unseen"], k=rng.randint(0, 10)))
+        for _ in range(200)
+    ]
+    compiled = compile_classifier(classifier)
+
+    from_reviews = compiled.transform_reviews(reviews)
+    from_dicts = compiled.transform([dict(count_features(*review)) for review in reviews])
+    assert (from_reviews != from_dicts).nnz == 0
+
+
+def test_empty_batch():
+    compiled = compile_classifier(_naive_bayes())
+
+    assert compiled.classify_many([]) == []
+    assert compiled.classify_with_confidence(compiled.transform([])) == ([], [])
+
+
+def test_artifact_round_trip(classifier, tmp_path):
+    featuresets = _test_corpus(classifier, random.Random(6))
+    compiled = compile_classifier(classifier)
+
+    export_artifact(compiled, str(tmp_path))
+    artifact = load_artifact(str(tmp_path))
+
+    assert isinstance(artifact.weights, np.memmap)
+    assert artifact.vocabulary.get_many(list(compiled.vocabulary)) == list(compiled.vocabulary.values())
+    assert artifact.vocabulary.get(("no such feature", 1)) is None
+    assert (artifact.transform(featuresets) != compiled.transform(featuresets)).nnz == 0
+    assert artifact.classify_many(featuresets) == list(classifier.classify_many(featuresets))
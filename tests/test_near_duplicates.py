@@ -0,0 +1,173 @@
+"""Clustering, eviction and ordering of the MinHash-LSH near-duplicate index"""
+import asyncio
+import threading
+import uuid
+from contextlib import asynccontextmanager
+from types import SimpleNamespace
+
+import pytest
+
+from app.services import near_duplicates
+from app.services.near_duplicates import NearDuplicateIndex
+
+BASE = "the battery died after two days and the seller never answered my emails about a refund"
+
+
+class FakeService:
+    def health_check(self):
+        return True
+
+    def preprocess_batch(self, texts):
+        return [text.split() for text in texts]
+
+
+@pytest.fixture(autouse=True)
+def model(monkeypatch):
+    monkeypatch.setattr(near_duplicates, "model_registry", SimpleNamespace(active=FakeService()))
+
+
+def _index(max_entries: int = 1000) -> NearDuplicateIndex:
+    return NearDuplicateIndex(num_perm=64, bands=16, threshold=0.7, max_entries=max_entries)
+
+
+def _distinct(i: int) -> str:
+    return " ".join(f"w{i}x{j}" for j in range(12))
+
+
+@pytest.mark.asyncio
+async def test_identical_text_joins_the_first_review():
+    index = _index()
+    ids = [uuid.uuid4() for _ in range(5)]
+
+    results = [(await index.add_many([id], [BASE]))[0] for id in ids]
+
+    assert results[0] == (None, 1)
+    assert results[1:] == [(ids[0], n) for n in range(2, 6)]
+
+
+@pytest.mark.asyncio
+async def test_near_duplicate_text_is_clustered():
+    index = _index()
+    first, copy, other = uuid.uuid4(), uuid.uuid4(), uuid.uuid4()
+
+    results = await index.add_many(
+        [first, copy, other],
+        [BASE, BASE.replace("two", "three"), _distinct(0)],
+    )
+
+    assert results == [(None, 1), (first, 2), (None, 1)]
+
+
+@pytest.mark.asyncio
+async def test_empty_text_is_never_a_match():
+    index = _index()
+
+    assert await index.add_many([uuid.uuid4(), uuid.uuid4()], ["", ""]) == [(None, 1), (None, 1)]
+    assert len(index) == 0
+
+
+@pytest.mark.asyncio
+async def test_unclustered_before_the_model_loads(monkeypatch):
+    index = _index()
+    service = FakeService()
+    service.health_check = lambda: False
+    monkeypatch.setattr(near_duplicates, "model_registry", SimpleNamespace(active=service))
+
+    assert await index.add_many([uuid.uuid4()], [BASE]) == [(None, 1)]
+    assert len(index) == 0
+
+
+@pytest.mark.asyncio
+async def test_eviction_at_max_entries():
+    index = _index(max_entries=4)
+    first = uuid.uuid4()
+    await index.add_many([first], [BASE])
+    await index.add_many([uuid.uuid4() for _ in range(3)], [_distinct(i) for i in range(3)])
+    assert len(index) == 4
+
+    # The fifth review pushes the first out, so an identical copy starts afresh
+    await index.add_many([uuid.uuid4()], [_distinct(3)])
+    assert len(index) == 4
+    assert await index.add_many([uuid.uuid4()], [BASE]) == [(None, 1)]
+    assert len(index) == 4
+
+
+@pytest.mark.asyncio
+async def test_cluster_outlives_its_first_review():
+    index = _index(max_entries=3)
+    ids = [uuid.uuid4() for _ in range(4)]
+
+    results = await index.add_many(ids, [BASE] * 4)
+
+    # The fourth evicted the first, so the cluster counts three live members
+    assert results[-1] == (ids[0], 3)
+
+
+@pytest.mark.asyncio
+async def test_buckets_stay_bounded_under_identical_spam():
+    index = _index(max_entries=500)
+
+    await index.add_many([uuid.uuid4() for _ in range(2000)], [BASE] * 2000)
+
+    assert len(index) == 500
+    assert all(isinstance(member, int) for buckets in index._buckets for member in buckets.values())
+    assert len(index._clusters) == 1
+    assert next(iter(index._clusters.values()))[1] == 500
+
+
+@pytest.mark.asyncio
+async def test_concurrent_add_many_is_ordered_by_call(monkeypatch):
+    index = _index()
+    ids = [uuid.uuid4() for _ in range(3)]
+    release = threading.Event()
+    signatures = index.signatures
+
+    def slow_first(texts):
+        # Hold the first call back until the others have finished
+        if texts == ["first " + BASE]:
+            release.wait(5)
+        return signatures([text.removeprefix("first ") for text in texts])
+
+    monkeypatch.setattr(index, "signatures", slow_first)
+    first = asyncio.create_task(index.add_many([ids[0]], ["first " + BASE]))
+    await asyncio.sleep(0)
+    later = await asyncio.gather(index.add_many([ids[1]], [BASE]), index.add_many([ids[2]], [BASE]))
+    release.set()
+    await first
+
+    assert later == [[(None, 1)], [(ids[1], 2)]]
+    # Indexed last but called first, so it becomes the cluster's first review
+    assert await index.add_many([uuid.uuid4()], [BASE]) == [(ids[0], 4)]
+
+
+class FakeSession:
+    def __init__(self, rows):
+        self.rows = rows
+
+    async def stream(self, statement):
+        async def rows():
+            for row in self.rows:
+                yield row
+
+        return rows()
+
+
+@pytest.mark.asyncio
+async def test_build_ranks_stored_reviews_before_live_ones(monkeypatch):
+    index = _index(max_entries=10)
+    stored = [uuid.uuid4() for _ in range(3)]
+    # Newest first, as the query orders them
+    rows = [(stored[2], _distinct(0)), (stored[1], BASE), (stored[0], BASE)]
+
+    @asynccontextmanager
+    async def session():
+        yield FakeSession(rows)
+
+    monkeypatch.setattr(near_duplicates, "AsyncSessionLocal", session)
+    live = uuid.uuid4()
+    assert await index.add_many([live], [BASE]) == [(None, 1)]
+
+    await index.build()
+
+    assert len(index) == 4
+    assert await index.add_many([uuid.uuid4()], [BASE]) == [(stored[0], 4)]
@@ -0,0 +1,84 @@
+"""Keyset pagination over (created_at, id), run against SQLite"""
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import httpx
+import pytest
+from fastapi import FastAPI
+from sqlalchemy import Column, DateTime, Uuid, create_engine, select
+from sqlalchemy.orm import Session, declarative_base
+
+from app.api import deps
+from app.api.v1.endpoints import predictions
+from app.core.security import verify_token
+from app.crud.base import CRUDBase, decode_cursor, encode_cursor
+
+Base = declarative_base()
+
+
+class Row(Base):
+    __tablename__ = "rows"
+
+    id = Column(Uuid, primary_key=True)
+    created_at = Column(DateTime, nullable=False)
+
+
+@pytest.fixture
+def session():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    with Session(engine) as session:
+        yield session
+
+
+def test_cursor_round_trip():
+    created_at = datetime(2024, 3, 1, 12, 30, 15, 123456, tzinfo=timezone.utc)
+    id = uuid.uuid4()
+
+    token = encode_cursor(created_at, id)
+
+    assert "=" not in token
+    assert decode_cursor(token) == (created_at, id)
+
+
+@pytest.mark.parametrize("token", ["", "not a cursor", "bm9waXBl", encode_cursor(datetime(2024, 1, 1), "x")])
+def test_malformed_cursor(token):
+    with pytest.raises(ValueError, match="Invalid cursor"):
+        decode_cursor(token)
+
+
+def test_pages_cover_every_row_once_despite_ties(session):
+    start = datetime(2024, 1, 1)
+    # Several rows share each created_at, so pages must break ties on id
+    rows = [Row(id=uuid.uuid4(), created_at=start + timedelta(seconds=i // 3)) for i in range(11)]
+    session.add_all(rows)
+    session.commit()
+    crud = CRUDBase(Row)
+
+    seen = []
+    after = None
+    while True:
+        statement = crud._paginate(select(Row), skip=0, limit=4, after=after)
+        page = session.execute(statement).scalars().all()
+        seen.extend(row.id for row in page)
+        if len(page) < 4:
+            break
+        after = decode_cursor(encode_cursor(page[-1].created_at, page[-1].id))
+
+    expected = sorted(rows, key=lambda row: (row.created_at, row.id), reverse=True)
+    assert seen == [row.id for row in expected]
+
+
+@pytest.mark.asyncio
+async def test_malformed_cursor_is_a_400():
+    app = FastAPI()
+    app.include_router(predictions.router, prefix="/predictions")
+    app.dependency_overrides[deps.get_db] = lambda: None
+    app.dependency_overrides[verify_token] = lambda: None
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        response = await client.get("/predictions/", params={"cursor": "not a cursor"})
+
+    assert response.status_code == 400
+    assert response.json() == {"detail": "Invalid cursor"}
@@ -0,0 +1,110 @@
+"""The prediction_stats upserts must add up to what a full rebuild computes.
+
+Runs the real CRUD code on SQLite, whose INSERT ... ON CONFLICT matches
+the Postgres statement the rollup uses.
+"""
+import importlib
+import random
+import uuid
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import TextClause, create_engine, select
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import Session
+from sqlalchemy.schema import CreateTable
+
+from app.api.v1.schemas.prediction import PredictionCreate
+from app.crud import prediction as crud_prediction
+from app.models.prediction import Prediction
+from app.models.prediction_stat import PredictionStat
+from app.models.review import Review
+
+# app.crud re-exports the CRUD object under the module's name
+crud_module = importlib.import_module("app.crud.prediction")
+
+
+@compiles(UUID, "sqlite")
+def _uuid_as_text(type_, compiler, **kw):
+    return "CHAR(32)"
+
+
+class SyncSession:
+    """The AsyncSession calls the CRUD code makes, run on a sync SQLite session"""
+
+    def __init__(self, session: Session):
+        self.session = session
+
+    async def execute(self, statement, params=None):
+        if isinstance(statement, TextClause) and statement.text.startswith("LOCK TABLE"):
+            return None  # SQLite has no table locks; the test is single-writer
+        return self.session.execute(statement, params)
+
+    async def commit(self):
+        self.session.commit()
+
+
+@pytest.fixture
+def db(monkeypatch):
+    monkeypatch.setattr(crud_module, "pg_insert", sqlite_insert)
+    engine = create_engine("sqlite://")
+    with Session(engine) as session:
+        # Tables only: the Postgres-specific indexes are not needed here
+        for model in (Review, Prediction, PredictionStat):
+            session.execute(CreateTable(model.__table__))
+        yield SyncSession(session)
+
+
+def _rows(rng: random.Random, count: int) -> list:
+    users = [None, uuid.uuid4(), uuid.uuid4()]
+    start = datetime(2024, 5, 30, 22)
+    rows = []
+    for i in range(count):
+        row = crud_prediction.build_row(
+            PredictionCreate(
+                review_text=rng.choice(["great", "awful", "meh"]) + str(rng.randint(0, 5)),
+                rating=rng.randint(1, 5),
+                verified_purchase=rng.random() < 0.5,
+                category=rng.choice(["Books", "Home"]),
+            ),
+            user_id=rng.choice(users),
+            prediction_result=rng.choice(["real", "fake", "abstain"]),
+            confidence_score=rng.choice([None, rng.random()]),
+            model_version=rng.choice([None, "1.0.0", "2.0.0"]),
+        )
+        # Spread over several days, across a month boundary
+        row["created_at"] = start + timedelta(hours=rng.randint(0, 96))
+        rows.append(row)
+    return rows
+
+
+def _stats(db: SyncSession) -> dict:
+    return {
+        (stat.user_id, stat.day, stat.category, stat.model_version): (
+            stat.total,
+            stat.real_count,
+            stat.fake_count,
+            round(stat.confidence_sum, 9),
+            stat.confidence_count,
+        )
+        for stat in db.session.execute(select(PredictionStat)).scalars()
+    }
+
+
+@pytest.mark.asyncio
+async def test_incremental_stats_match_a_rebuild(db):
+    rng = random.Random(7)
+    rows = _rows(rng, 300)
+    while rows:
+        size = rng.randint(1, 40)
+        batch, rows = rows[:size], rows[size:]
+        await crud_prediction.insert_rows(db, rows=batch)
+    incremental = _stats(db)
+    db.session.expunge_all()
+
+    await crud_prediction.rebuild_stats(db)
+
+    assert incremental
+    assert _stats(db) == incremental
@@ -0,0 +1,160 @@
+"""The NDJSON streaming endpoint, with scoring and storage replaced by fakes"""
+import json
+from contextlib import asynccontextmanager
+
+import httpx
+import pytest
+from fastapi import FastAPI
+from starlette.requests import ClientDisconnect
+
+from app.api.v1.endpoints import predictions
+from app.core.config import settings
+from app.core.security import verify_token
+
+MAX_LINE = 200
+
+
+class FakeSession:
+    def __init__(self):
+        self.rollbacks = 0
+
+    async def rollback(self):
+        self.rollbacks += 1
+
+
+class FakeResponse:
+    def __init__(self, review_text: str):
+        self.review_text = review_text
+
+    def model_dump(self, mode=None):
+        return {"review_text": self.review_text, "prediction_result": "OR"}
+
+
+@pytest.fixture
+def scored(monkeypatch):
+    """Review texts of every batch that reached storage"""
+    batches = []
+
+    async def score(reviews):
+        return [("OR", 0.9, "test")] * len(reviews)
+
+    async def store(db, items, results, user_id):
+        batches.append([item.review_text for item in items])
+        return [FakeResponse(item.review_text) for item in items]
+
+    @asynccontextmanager
+    async def session():
+        yield FakeSession()
+
+    monkeypatch.setattr(predictions, "_score_with_backoff", score)
+    monkeypatch.setattr(predictions, "_store_batch", store)
+    monkeypatch.setattr(predictions, "AsyncSessionLocal", session)
+    monkeypatch.setattr(settings, "PREDICTION_STREAM_BATCH_SIZE", 2)
+    monkeypatch.setattr(settings, "PREDICTION_STREAM_MAX_LINE_BYTES", MAX_LINE)
+    return batches
+
+
+def _review(text: str) -> bytes:
+    return json.dumps(
+        {"review_text": text, "rating": 5, "verified_purchase": True, "category": "Books"}
+    ).encode()
+
+
+async def _post(chunks) -> list:
+    app = FastAPI()
+    app.include_router(predictions.router, prefix="/predictions")
+    app.dependency_overrides[verify_token] = lambda: None
+
+    async def body():
+        for chunk in chunks:
+            yield chunk
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        response = await client.post("/predictions/stream", content=body())
+    assert response.status_code == 200
+    return [json.loads(line) for line in response.text.splitlines()]
+
+
+@pytest.mark.asyncio
+async def test_lines_split_across_chunks(scored):
+    upload = b"\n".join(_review(f"review {i}") for i in range(5))
+
+    results = await _post([upload[i:i + 7] for i in range(0, len(upload), 7)])
+
+    assert [result["line"] for result in results] == [1, 2, 3, 4, 5]
+    assert [result["review_text"] for result in results] == [f"review {i}" for i in range(5)]
+    assert scored == [["review 0", "review 1"], ["review 2", "review 3"], ["review 4"]]
+
+
+@pytest.mark.asyncio
+async def test_blank_malformed_and_invalid_lines(scored):
+    upload = b"\n".join([_review("fine"), b"", b"{not json", b'{"rating": 5}', _review("also fine"), b""])
+
+    results = await _post([upload])
+
+    assert [result["line"] for result in results] == [1, 3, 4, 5]
+    assert "error" not in results[0] and "error" not in results[3]
+    assert "error" in results[1]
+    assert "review_text" in results[2]["error"]
+
+
+@pytest.mark.asyncio
+async def test_complete_long_line_in_one_chunk(scored):
+    upload = b"\n".join([_review("first"), _review("x" * MAX_LINE), _review("never read")]) + b"\n"
+
+    results = await _post([upload])
+
+    # The line before it is still answered, and the error names the right line
+    assert results[0]["review_text"] == "first"
+    assert results[1] == {"line": 2, "error": f"Line longer than {MAX_LINE} bytes"}
+    assert len(results) == 2
+
+
+@pytest.mark.asyncio
+async def test_long_trailing_line(scored):
+    results = await _post([_review("first") + b"\n" + _review("second") + b"\n" + _review("x" * MAX_LINE)])
+
+    assert [result.get("review_text") for result in results[:2]] == ["first", "second"]
+    assert results[2] == {"line": 3, "error": f"Line longer than {MAX_LINE} bytes"}
+
+
+@pytest.mark.asyncio
+async def test_store_failure_rolls_back_and_continues(monkeypatch, scored):
+    sessions = []
+    calls = 0
+    store = predictions._store_batch
+
+    async def flaky_store(db, items, results, user_id):
+        nonlocal calls
+        calls += 1
+        if calls == 1:
+            raise RuntimeError("insert failed")
+        return await store(db, items, results, user_id)
+
+    @asynccontextmanager
+    async def session():
+        sessions.append(FakeSession())
+        yield sessions[-1]
+
+    monkeypatch.setattr(predictions, "_store_batch", flaky_store)
+    monkeypatch.setattr(predictions, "AsyncSessionLocal", session)
+
+    results = await _post([b"\n".join(_review(f"review {i}") for i in range(3))])
+
+    assert [result.get("error") for result in results] == ["insert failed", "insert failed", None]
+    assert sessions[0].rollbacks == 1
+
+
+class DisconnectingRequest:
+    async def stream(self):
+        yield _review("answered") + b"\n" + _review("sent")
+        raise ClientDisconnect()
+
+
+@pytest.mark.asyncio
+async def test_client_disconnect_ends_the_stream(scored):
+    messages = [message async for message in predictions._ndjson_predictions(DisconnectingRequest(), None)]
+
+    assert messages == []
+    assert scored == []
@@ -0,0 +1,134 @@
+"""Write-behind persistence, with the database insert replaced by a fake"""
+import asyncio
+from contextlib import asynccontextmanager
+
+import pytest
+from prometheus_client import REGISTRY
+
+from app.services import prediction_writer as writer_module
+from app.services.prediction_writer import PredictionWriter
+
+
+def _dropped(reason: str) -> float:
+    return REGISTRY.get_sample_value("prediction_write_behind_dropped_total", {"reason": reason}) or 0.0
+
+
+class FakeInserts:
+    """Records inserted batches; optionally blocks or fails them"""
+
+    def __init__(self):
+        self.batches = []
+        self.active = 0
+        self.peak = 0
+        self.release = asyncio.Event()
+        self.release.set()
+        self.fail = False
+
+    async def insert_rows(self, db, *, rows):
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        try:
+            await self.release.wait()
+            if self.fail:
+                raise RuntimeError("connection reset")
+            self.batches.append([row["n"] for row in rows])
+        finally:
+            self.active -= 1
+
+
+@pytest.fixture
+def inserts(monkeypatch):
+    fake = FakeInserts()
+
+    @asynccontextmanager
+    async def session():
+        yield None
+
+    monkeypatch.setattr(writer_module, "AsyncSessionLocal", session)
+    monkeypatch.setattr(writer_module.crud_prediction, "insert_rows", fake.insert_rows)
+    return fake
+
+
+def _rows(start: int, count: int) -> list:
+    return [{"n": n} for n in range(start, start + count)]
+
+
+@pytest.mark.asyncio
+async def test_stop_flushes_everything_queued(inserts):
+    writer = PredictionWriter(max_batch_size=4, max_wait_ms=60000, max_queue=100, max_concurrency=2)
+    writer.start()
+
+    assert writer.submit(_rows(0, 10)) == 10
+    await writer.stop()
+
+    assert not writer.running
+    assert sorted(n for batch in inserts.batches for n in batch) == list(range(10))
+    assert all(len(batch) <= 4 for batch in inserts.batches)
+
+
+@pytest.mark.asyncio
+async def test_partial_batch_is_written_after_max_wait(inserts):
+    writer = PredictionWriter(max_batch_size=100, max_wait_ms=10, max_queue=100, max_concurrency=2)
+    writer.start()
+    try:
+        writer.submit(_rows(0, 3))
+        for _ in range(100):
+            if inserts.batches:
+                break
+            await asyncio.sleep(0.01)
+        assert inserts.batches == [[0, 1, 2]]
+    finally:
+        await writer.stop()
+
+
+@pytest.mark.asyncio
+async def test_concurrent_inserts_are_bounded(inserts):
+    inserts.release.clear()
+    writer = PredictionWriter(max_batch_size=2, max_wait_ms=1000, max_queue=100, max_concurrency=2)
+    writer.start()
+    writer.submit(_rows(0, 10))
+    for _ in range(20):
+        await asyncio.sleep(0)
+
+    # Two inserts hold both slots; the rest wait in the queue, not as tasks
+    assert inserts.active == 2
+    assert len(writer._inflight) == 2
+    assert writer._queue.qsize() == 6
+
+    inserts.release.set()
+    await writer.stop()
+    assert inserts.peak == 2
+    assert sorted(n for batch in inserts.batches for n in batch) == list(range(10))
+
+
+@pytest.mark.asyncio
+async def test_full_queue_drops_and_counts(inserts):
+    inserts.release.clear()
+    writer = PredictionWriter(max_batch_size=1, max_wait_ms=0, max_queue=3, max_concurrency=1)
+    before = _dropped("queue_full")
+    writer.start()
+
+    accepted = writer.submit(_rows(0, 5))
+
+    assert accepted == 3
+    assert _dropped("queue_full") - before == 2
+    inserts.release.set()
+    await writer.stop()
+    assert sorted(n for batch in inserts.batches for n in batch) == [0, 1, 2]
+
+
+@pytest.mark.asyncio
+async def test_failed_insert_drops_the_batch_and_frees_its_slot(inserts):
+    inserts.fail = True
+    writer = PredictionWriter(max_batch_size=5, max_wait_ms=1000, max_queue=100, max_concurrency=1)
+    before = _dropped("error")
+    writer.start()
+    writer.submit(_rows(0, 5))
+    await asyncio.sleep(0.05)
+    assert _dropped("error") - before == 5
+
+    # The failed batch gave its slot back, so later batches still go through
+    inserts.fail = False
+    writer.submit(_rows(5, 2))
+    await writer.stop()
+    assert inserts.batches == [[5, 6]]
@@ -0,0 +1,119 @@
+"""Batch tokenization against the per-review tokenizer it replaced.
+
+WordNet and the stopword corpus are swapped for small stand-ins so the
+tests run offline; both tokenizers call the same ones, so only the
+splitting, punctuation and de-duplication logic is being compared.
+"""
+import random
+import string
+
+import nltk
+from nltk.classify import NaiveBayesClassifier
+
+from app.services.features import compile_classifier
+from app.services.ml_service import MLService
+
+STOP_WORDS = {"the", "a", "and", "it", "is", "was", "to", "of", "i", "this", "for", "my"}
+WORDS = [
+    "battery", "works", "great", "Broke", "after", "days", "seller", "never", "replied",
+    "colors", "pictures", "AMAZING", "quality", "stars", "refund", "café", "naïve", "boxes",
+] + sorted(STOP_WORDS)
+PUNCTUATION = ["", "", "", ",", ".", "!!!", "'s", "?", ")"]
+
+
+class StubLemmatizer:
+    def lemmatize(self, word: str) -> str:
+        return word[:-1] if len(word) > 3 and word.endswith("s") else word
+
+
+def _service() -> MLService:
+    service = MLService()
+    service.stop_words = set(STOP_WORDS)
+    service.lemmatizer = StubLemmatizer()
+    service._normalize_token.cache_clear()
+    return service
+
+
+def _previous_tokens(service: MLService, text: str) -> list:
+    """The tokenizer before batch preprocessing, verbatim apart from the cache"""
+    text = text.rstrip().translate(str.maketrans({key: None for key in string.punctuation}))
+    lemmatized_tokens = []
+    for w in text.split(" "):
+        if w.lower() not in service.stop_words:
+            lemmatized_tokens.append(service.lemmatizer.lemmatize(w.lower()))
+    return [' '.join(l) for l in nltk.bigrams(lemmatized_tokens)] + lemmatized_tokens
+
+
+def _review(rng: random.Random) -> str:
+    """Single-spaced text with punctuation attached to words, like the training data"""
+    words = [rng.choice(WORDS) + rng.choice(PUNCTUATION) for _ in range(rng.randint(1, 30))]
+    return " ".join(words) + rng.choice(["", " ", "\n"])
+
+
+def test_single_spaced_text_tokenizes_as_before():
+    service = _service()
+    texts = [_review(random.Random(seed)) for seed in range(2000)]
+
+    assert service.preprocess_batch(texts) == [_previous_tokens(service, text) for text in texts]
+
+
+def test_single_review_matches_its_batch():
+    service = _service()
+    texts = [_review(random.Random(seed)) for seed in range(50)]
+    batch = service.preprocess_batch(texts)
+
+    assert [service._preprocess_text(text) for text in texts] == batch
+    assert service.preprocess_batch(texts[::-1]) == batch[::-1]
+
+
+def test_irregular_whitespace_no_longer_yields_empty_or_glued_tokens():
+    service = _service()
+
+    # These are the inputs whose tokens, and so scores, changed
+    assert _previous_tokens(service, "great  battery") == ["great ", " battery", "great", "", "battery"]
+    assert service._preprocess_text("great  battery") == ["great battery", "great", "battery"]
+    assert _previous_tokens(service, "great\tbattery\nworks") == ["great\tbattery\nwork"]
+    assert service._preprocess_text("great\tbattery\nworks") == [
+        "great battery", "battery work", "great", "battery", "work",
+    ]
+    # A word that is all punctuation used to leave an empty token behind
+    assert _previous_tokens(service, "great - battery") == ["great ", " battery", "great", "", "battery"]
+    assert service._preprocess_text("great - battery") == ["great battery", "great", "battery"]
+    assert service._preprocess_text(" \t\n") == []
+
+
+def test_predictions_unchanged_on_the_training_distribution():
+    service = _service()
+    rng = random.Random(1)
+    reviews = [
+        {
+            "review_text": _review(rng),
+            "rating": rng.randint(1, 5),
+            "verified_purchase": rng.random() < 0.5,
+            "category": rng.choice(["Books", "Home", "Beauty"]),
+        }
+        for _ in range(600)
+    ]
+
+    def previous_features(review: dict) -> dict:
+        return service._create_feature_vector(
+            str(review["rating"]),
+            review["verified_purchase"],
+            review["category"],
+            _previous_tokens(service, review["review_text"]),
+        )
+
+    training = [
+        (previous_features(review), int("refund" not in review["review_text"] and review["rating"] > 2))
+        for review in reviews[:400]
+    ]
+    service.classifier = NaiveBayesClassifier.train(training)
+    held_out = reviews[400:]
+    expected = [
+        "real" if label == 1 else "fake"
+        for label in service.classifier.classify_many([previous_features(review) for review in held_out])
+    ]
+
+    assert [result for result, _, _ in service.predict_batch(held_out)] == expected
+    service.compiled = compile_classifier(service.classifier)
+    assert [result for result, _, _ in service.predict_batch(held_out)] == expected
@@ -0,0 +1,143 @@
+"""Per-client concurrency limits, alone and on the login endpoint"""
+import asyncio
+
+import httpx
+import pytest
+from fastapi import FastAPI
+from prometheus_client import REGISTRY
+
+from app.api import deps
+from app.api.v1.endpoints import auth
+from app.core.rate_limit import ConcurrencyLimiter, TooManyConcurrent
+
+
+def test_slots_are_limited_per_key():
+    limiter = ConcurrencyLimiter(2)
+
+    with limiter.slot("a"), limiter.slot("a"):
+        with pytest.raises(TooManyConcurrent):
+            with limiter.slot("a"):
+                pass
+        # Other clients have their own slots
+        with limiter.slot("b"):
+            assert limiter.in_flight("b") == 1
+        assert limiter.in_flight("a") == 2
+
+    assert limiter.in_flight("a") == 0
+    assert limiter._in_flight == {}
+
+
+def test_slot_is_released_when_the_call_raises():
+    limiter = ConcurrencyLimiter(1)
+
+    with pytest.raises(RuntimeError):
+        with limiter.slot("a"):
+            raise RuntimeError("hash failed")
+
+    assert limiter.in_flight("a") == 0
+    with limiter.slot("a"):
+        pass
+
+
+def test_rejected_call_does_not_take_a_slot():
+    limiter = ConcurrencyLimiter(1)
+
+    with limiter.slot("a"):
+        with pytest.raises(TooManyConcurrent):
+            with limiter.slot("a"):
+                pass
+        assert limiter.in_flight("a") == 1
+    assert limiter.in_flight("a") == 0
+
+
+def test_zero_disables_the_limit():
+    limiter = ConcurrencyLimiter(0)
+
+    with limiter.slot("a"), limiter.slot("a"), limiter.slot("a"):
+        assert limiter.in_flight("a") == 0
+
+
+class FakeAuthenticate:
+    """Stands in for the password check; blocks until released"""
+
+    def __init__(self):
+        self.started = 0
+        self.release = asyncio.Event()
+        self.fail = False
+
+    async def __call__(self, db, *, email, password):
+        self.started += 1
+        await self.release.wait()
+        if self.fail:
+            raise RuntimeError("hash executor gone")
+        return None
+
+
+@pytest.fixture
+def authenticate(monkeypatch):
+    fake = FakeAuthenticate()
+    monkeypatch.setattr(deps, "login_limiter", ConcurrencyLimiter(2))
+    monkeypatch.setattr(auth.crud_user, "authenticate", fake)
+    return fake
+
+
+@pytest.fixture
+def app(authenticate):
+    app = FastAPI()
+    app.include_router(auth.router, prefix="/auth")
+    app.dependency_overrides[deps.get_db] = lambda: None
+    return app
+
+
+def _client(app: FastAPI) -> httpx.AsyncClient:
+    transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+    return httpx.AsyncClient(transport=transport, base_url="http://test")
+
+
+def _login(client: httpx.AsyncClient):
+    return client.post("/auth/login", data={"username": "user@example.com", "password": "secret"})
+
+
+def _rejected() -> float:
+    return REGISTRY.get_sample_value("auth_requests_rejected_total") or 0.0
+
+
+async def _until(condition):
+    for _ in range(200):
+        if condition():
+            return
+        await asyncio.sleep(0.005)
+    raise AssertionError("condition never became true")
+
+
+@pytest.mark.asyncio
+async def test_login_over_the_limit_is_a_429(app, authenticate):
+    before = _rejected()
+    async with _client(app) as client:
+        first = [asyncio.create_task(_login(client)) for _ in range(2)]
+        await _until(lambda: authenticate.started == 2)
+
+        response = await _login(client)
+
+        assert response.status_code == 429
+        assert response.headers["Retry-After"] == "1"
+        assert authenticate.started == 2
+        assert _rejected() - before == 1
+
+        authenticate.release.set()
+        assert [r.status_code for r in await asyncio.gather(*first)] == [401, 401]
+        assert deps.login_limiter.in_flight("127.0.0.1") == 0
+        assert (await _login(client)).status_code == 401
+
+
+@pytest.mark.asyncio
+async def test_failed_login_frees_its_slot(app, authenticate):
+    authenticate.release.set()
+    authenticate.fail = True
+
+    async with _client(app) as client:
+        for _ in range(3):
+            response = await _login(client)
+            assert response.status_code == 500
+
+    assert deps.login_limiter.in_flight("127.0.0.1") == 0